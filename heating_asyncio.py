@@ -0,0 +1,227 @@
+# ---------------------------------------------------------------------------
+# Varianta asyncio a task-urilor T / P / S / SW
+# ---------------------------------------------------------------------------
+# Aceeasi logica (pas_t, pas_p, pas_s, proceseaza_evenimente_sw), dar ca corutine pe o singura bucla de evenimente,
+# fara cate un thread per task. Asa un singur proces poate gazdui sute de controlere de camera.
+# asyncio.Event are is_set()/set() ca threading.Event, deci poate fi dat direct ca stop_event functiilor pas_*.
+# StarePartajata functioneaza la fel: citirile nu iau niciun lock, iar lock-ul scriitorilor nu e niciodata disputat.
+import asyncio
+import os
+import queue
+import random
+import sys
+
+from heating_control import (
+    CEAS_REAL, CutiePostala, StarePartajata, comenzi_sw, formateaza_afisare, interpreteaza_comanda_sw, memorie_initiala_p,
+    memorie_initiala_s, memorie_initiala_t, pas_p, pas_s, pas_t, proceseaza_evenimente_sw,
+    programeaza_urmatoarea_activare, scrie_profil,
+)
+from heating_server import CameraControlata, server_control
+
+
+class TrezireAsync:
+    # acelasi rol ca Trezire, pentru corutine (semnaleaza() se apeleaza din bucla de evenimente)
+    __slots__ = ("generatie", "_eveniment")
+
+    def __init__(self):
+        self.generatie = 0
+        self._eveniment = asyncio.Event()
+
+    def semnaleaza(self):
+        self.generatie += 1
+        self._eveniment.set()
+
+    async def asteapta(self, generatie_vazuta, timeout=None):
+        if self.generatie == generatie_vazuta:
+            self._eveniment.clear()
+            try:
+                await asyncio.wait_for(self._eveniment.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.generatie
+
+
+async def asteapta_pana_la_urmatoarea_activare_async(next_release, stop_event, ceas=CEAS_REAL):
+    # ca asteapta_pana_la_urmatoarea_activare: dormim pana la next_release sau pana la oprire
+    timp_ramas = next_release - ceas.acum()
+    if timp_ramas > 0:
+        try:
+            await asyncio.wait_for(stop_event.wait(), timp_ramas)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def task_t_async(configurare, stare, q_temperaturi, stop_event, ceas=CEAS_REAL, rng=random, statistici=None, telemetrie=None):
+    # task_t ca si corutina; next_release += perioada compenseaza derapajul (ca in varianta cu thread-uri)
+    memorie = memorie_initiala_t(configurare, telemetrie)
+    next_release = ceas.acum()
+
+    while not stop_event.is_set():
+        inceput = ceas.acum()
+        pas_t(configurare, memorie, stare, q_temperaturi, ceas, rng)
+        next_release = programeaza_urmatoarea_activare(next_release, configurare["perioada_T"], inceput, ceas.acum(),
+                                                       configurare["politica_depasire"], statistici)
+        await asteapta_pana_la_urmatoarea_activare_async(next_release, stop_event, ceas)
+
+
+async def task_p_async(configurare, stare, q_comenzi_automat, q_presiune, stop_event, ceas=CEAS_REAL, rng=random, statistici=None, telemetrie=None):
+    # task_p ca si corutina; golirea comenzilor automate la trecerea in manual se face in pas_p, la fel ca in task_p
+    memorie = memorie_initiala_p(configurare, telemetrie)
+    next_release = ceas.acum()
+
+    while not stop_event.is_set():
+        inceput = ceas.acum()
+        pas_p(configurare, memorie, stare, q_comenzi_automat, q_presiune, ceas, rng)
+        next_release = programeaza_urmatoarea_activare(next_release, memorie["perioada"], inceput, ceas.acum(),
+                                                       configurare["politica_depasire"], statistici)
+        await asteapta_pana_la_urmatoarea_activare_async(next_release, stop_event, ceas)
+
+
+async def task_s_async(configurare, stare, q_evenimente_sw, q_temperaturi, q_comenzi_automat, q_presiune, stop_event, trezire, ceas=CEAS_REAL, afiseaza=print, telemetrie=None, memorie=None):
+    # task_s condus de evenimente (ca varianta cu Trezire din task_s), pe o TrezireAsync
+    # afiseaza - functia care primeste linia de stare (None = fara afisare, util cand sunt multe controlere)
+    # memorie - optional, dict-ul intern al lui S (vezi memorie_initiala_s), ca sa poata fi inspectat din afara
+    if memorie is None:
+        memorie = memorie_initiala_s(ceas, telemetrie)
+
+    while not stop_event.is_set():
+        memorie["treziri"] += 1
+        generatie = trezire.generatie
+
+        comenzi_sw = proceseaza_evenimente_sw(q_evenimente_sw, stare, stop_event)
+
+        if stop_event.is_set():
+            break
+
+        afisare = pas_s(configurare, memorie, stare, q_temperaturi, q_comenzi_automat, q_presiune, ceas, doar_la_schimbare=not comenzi_sw)
+
+        if afisare is not None and afiseaza is not None:
+            afiseaza(formateaza_afisare(afisare))
+
+        await trezire.asteapta(generatie, max(0.0, memorie["next_afisare"] - ceas.acum()))
+
+
+async def citeste_linii_stdin(linii):
+    # citire asincrona de la tastatura: bucla de evenimente ne anunta cand stdin are date (add_reader),
+    # iar liniile ajung in asyncio.Queue "linii". Citim direct descriptorul (os.read), nu sys.stdin,
+    # ca liniile venite odata sa nu ramana in bufferul lui sys.stdin fara sa mai fim anuntati.
+    # Unde add_reader nu merge (ex: Windows), citim intr-un executor. La EOF punem None.
+    bucla = asyncio.get_running_loop()
+    fd = sys.stdin.fileno()
+    rest = b""
+
+    def la_date():
+        nonlocal rest
+        date = os.read(fd, 4096)
+        if not date:
+            bucla.remove_reader(fd)
+            if rest:
+                linii.put_nowait(rest.decode(errors="replace"))
+            linii.put_nowait(None)
+            return
+        *complete, rest = (rest + date).split(b"\n")
+        for linie in complete:
+            linii.put_nowait(linie.decode(errors="replace"))
+
+    try:
+        bucla.add_reader(fd, la_date)
+    except (NotImplementedError, ValueError, OSError):
+        while True:
+            linie = await bucla.run_in_executor(None, sys.stdin.readline)
+            await linii.put(linie or None)
+            if not linie:
+                return
+
+
+async def task_sw_async(q_evenimente_sw, stop_event, trezire):
+    # task_sw ca si corutina, cu citire asincrona de la stdin (nu blocheaza bucla de evenimente)
+    print(f"\n[SW] Introdu comenzi: {comenzi_sw(False)}\n")
+
+    linii = asyncio.Queue()
+    cititor = asyncio.ensure_future(citeste_linii_stdin(linii))
+
+    try:
+        while not stop_event.is_set():
+            print("[SW] > ", end="", flush=True)
+            oprire = asyncio.ensure_future(stop_event.wait())
+            urmatoarea = asyncio.ensure_future(linii.get())
+            await asyncio.wait((oprire, urmatoarea), return_when=asyncio.FIRST_COMPLETED)
+            oprire.cancel()
+            if not urmatoarea.done():
+                urmatoarea.cancel()
+                break
+
+            linie = urmatoarea.result()
+            linie = "q" if linie is None else linie.strip()
+            if not linie:
+                continue
+
+            eveniment, eroare = interpreteaza_comanda_sw(linie, cu_profil=False)
+            if eveniment is None:
+                print(f"[SW] {eroare}")
+                continue
+
+            if eveniment["tip"] == "profil":
+                print(f"[SW] {scrie_profil(None, eveniment['cale'])}")
+                continue
+
+            q_evenimente_sw.put(eveniment)
+
+            if eveniment["tip"] == "oprire":
+                stop_event.set()
+
+            trezire.semnaleaza()
+    finally:
+        cititor.cancel()
+        try:
+            asyncio.get_running_loop().remove_reader(sys.stdin.fileno())
+        except (NotImplementedError, ValueError, OSError):
+            pass
+
+
+def creeaza_controler_async(configurare, stop_event, afiseaza=print, rng=random, statistici=None, telemetrie=None):
+    # un controler de camera complet (T / P / S) pe bucla de evenimente curenta
+    # intoarce (corutinele task-urilor, CameraControlata), ca SW sau serverul de control sa poata trimite comenzi
+    # si citi starea
+    # statistici - optional, dict-ul de la creeaza_statistici() pentru T si P
+    # telemetrie - optional, un InregistratorTelemetrie comun pentru T, P si S
+    stare = StarePartajata()
+    trezire_s = TrezireAsync()
+    q_evenimente_sw = queue.Queue()
+    q_temperaturi = CutiePostala(trezire_s)
+    q_comenzi_automat = CutiePostala()
+    q_presiune = CutiePostala()
+    memorie_s = memorie_initiala_s(CEAS_REAL, telemetrie)
+
+    corutine = [
+        task_t_async(configurare, stare, q_temperaturi, stop_event, rng=rng, statistici=(statistici or {}).get("T"), telemetrie=telemetrie),
+        task_p_async(configurare, stare, q_comenzi_automat, q_presiune, stop_event, rng=rng, statistici=(statistici or {}).get("P"), telemetrie=telemetrie),
+        task_s_async(configurare, stare, q_evenimente_sw, q_temperaturi, q_comenzi_automat, q_presiune, stop_event, trezire_s, afiseaza=afiseaza, telemetrie=telemetrie, memorie=memorie_s),
+    ]
+    return corutine, CameraControlata(stare, q_evenimente_sw, trezire_s, memorie_s)
+
+
+async def main_async(configurare, statistici=None, telemetrie=None, control=None, numar_camere=1):
+    # echivalentul lui main() pe asyncio: controlere + SW de la tastatura
+    # control - optional, adresa serverului de control (vezi server_control)
+    # numar_camere - cate controlere ruleaza pe bucla; doar camera 0 afiseaza, are statistici si telemetrie
+    stop_event = asyncio.Event()
+    corutine, camera = creeaza_controler_async(configurare, stop_event, statistici=statistici, telemetrie=telemetrie)
+    camere = [camera]
+    for _ in range(numar_camere - 1):
+        corutine_camera, camera_noua = creeaza_controler_async(configurare, stop_event, afiseaza=None)
+        corutine.extend(corutine_camera)
+        camere.append(camera_noua)
+    corutine.append(task_sw_async(camera.q_evenimente_sw, stop_event, camera.trezire))
+    if control:
+        corutine.append(server_control(configurare, camere, stop_event, control))
+
+    task_uri = [asyncio.ensure_future(c) for c in corutine]
+    try:
+        await asyncio.gather(*task_uri)
+    finally:
+        stop_event.set()
+        for c in camere:
+            c.trezire.semnaleaza()
+        for t in task_uri:
+            t.cancel()
@@ -0,0 +1,958 @@
+# ---------------------------------------------------------------------------
+# Benchmark-uri (python heating_control.py --benchmark <nume>)
+# ---------------------------------------------------------------------------
+# Fiecare benchmark masoara una dintre optimizarile controlerului (cutii, evenimente in S, cadre, fuziune, MPC,
+# backend-uri, pornire, profilare, ...) si afiseaza un tabel. Controlerul nu importa modulul decat pentru --benchmark.
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import py_compile
+import queue
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+
+from heating_control import (
+    CEAS_REAL, CadruSenzori, CeasVirtual, ControlerMPC, CutiePostala, FuziuneSenzori, Profilator, StarePartajata,
+    Trezire, calcul_confort, calcul_putere_mod_automat, coeficienti_model_mpc, configurare_implicita,
+    creeaza_statistici, formateaza_profil, incarca_configurare, limiteaza, matrici_predictie_mpc, mediana,
+    memorie_initiala_p, memorie_initiala_s, memorie_initiala_t, opreste, pas_p, salveaza_configurare,
+    simuleaza_virtual, task_p, task_s, task_t, ultimul_mesaj, umple_cadru,
+)
+from heating_asyncio import creeaza_controler_async
+from heating_multiprocess import CoadaEvenimenteMP, inchide_procese, ocupa_cpu, porneste_procese
+from heating_rooms import creeaza_camere, cuplaj_cladire, pas_camere
+from heating_server import server_control
+from heating_sweep import EvaluatorRulare, combinatii_aleatoare, ruleaza_sweep
+
+
+def benchmark_evenimente_s(configurare=None, durata=5.0, perioada_comenzi=0.25):
+    # S cu polling la 20 ms vs S condus de evenimente (Trezire):
+    #   treziri/s ale buclei lui S
+    #   latenta comanda -> actionare: de la punerea unui "set_putere_manual" in q_evenimente_sw
+    #   pana cand puterea curenta din stare are valoarea noua (masurata cu verificare la ~0.2 ms)
+    configurare = dict(configurare or configurare_implicita())
+
+    def ruleaza(condus_de_evenimente):
+        stare = StarePartajata(mod="manual", putere_manual=30.0, putere_curenta=30.0)
+        lock_consola = threading.Lock()
+        stop_event = threading.Event()
+        trezire = Trezire() if condus_de_evenimente else None
+        q_evenimente_sw = queue.Queue()
+        q_temperaturi = CutiePostala(trezire)
+        q_comenzi_automat = CutiePostala()
+        q_presiune = CutiePostala()
+        memorie_s = memorie_initiala_s()
+
+        fire = [
+            threading.Thread(target=task_t, args=(configurare, stare, q_temperaturi, stop_event), daemon=True),
+            threading.Thread(target=task_p, args=(configurare, stare, q_comenzi_automat, q_presiune, stop_event), daemon=True),
+            threading.Thread(target=task_s, args=(configurare, stare, q_evenimente_sw, q_temperaturi, q_comenzi_automat,
+                                                  q_presiune, stop_event, lock_consola, CEAS_REAL, trezire, memorie_s), daemon=True),
+        ]
+        latente = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for th in fire:
+                th.start()
+            t0 = time.perf_counter()
+            putere = 30.0
+            while time.perf_counter() - t0 < durata:
+                time.sleep(perioada_comenzi)
+                putere = 40.0 if putere != 40.0 else 60.0
+                trimis = time.perf_counter()
+                q_evenimente_sw.put({"tip": "set_putere_manual", "putere": putere})
+                if trezire is not None:
+                    trezire.semnaleaza()
+                while stare.citeste().putere_curenta != putere:
+                    time.sleep(0.0002)
+                latente.append(time.perf_counter() - trimis)
+            durata_reala = time.perf_counter() - t0
+            opreste(stop_event, trezire)
+            for th in fire:
+                th.join(timeout=1.0)
+
+        latente.sort()
+        return memorie_s["treziri"] / durata_reala, latente[len(latente) // 2], latente[-1]
+
+    print(f"{'S':12s} | {'treziri/s':>9s} | {'latenta mediana [ms]':>20s} | {'latenta max [ms]':>16s}")
+    for nume, condus in (("polling", False), ("evenimente", True)):
+        treziri, mediana, maxim = ruleaza(condus)
+        print(f"{nume:12s} | {treziri:9.1f} | {mediana * 1e3:20.2f} | {maxim * 1e3:16.2f}")
+
+
+def benchmark_cadre(configurare=None, dimensiuni=(4, 1_000, 100_000), cicluri=None):
+    # cost per ciclu T (+ media citita de S) si memoria alocata temporar per ciclu:
+    #   lista - varianta veche: lista noua de random.uniform, dict nou, sum()/len() in S
+    #   cadru - CadruSenzori reutilizat (double buffer), statistici calculate de T; cu NumPy peste prag_zgomot_numpy
+    # memoria alocata = varful de memorie urmarit de tracemalloc peste nivelul de dinainte, pe ciclu
+    configurare = dict(configurare or configurare_implicita())
+
+    def ciclu_lista(numar_TC, q_temperaturi):
+        temperaturi = []
+        for _ in range(numar_TC):
+            temperaturi.append(20.0 + random.uniform(-0.15, 0.15))
+        q_temperaturi.publica({"timestamp": time.monotonic(), "temperaturi": temperaturi})
+        mesaj = q_temperaturi.citeste_ultimul()[1]
+        return sum(mesaj["temperaturi"]) / len(mesaj["temperaturi"])
+
+    def masoara(functie, numar):
+        functie()  # incalzire (creeaza generatorul NumPy, importuri)
+        t0 = time.perf_counter()
+        for _ in range(numar):
+            functie()
+        timp = (time.perf_counter() - t0) / numar
+        tracemalloc.start()
+        inainte = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        functie()
+        varf = tracemalloc.get_traced_memory()[1] - inainte
+        tracemalloc.stop()
+        return timp, varf
+
+    print(f"{'numar_TC':>8s} | {'lista [us/ciclu]':>16s} | {'cadru [us/ciclu]':>16s} | {'lista [octeti]':>14s} | {'cadru [octeti]':>14s}")
+    for numar_TC in dimensiuni:
+        numar = cicluri or max(10, 200_000 // numar_TC)
+        configurare["numar_TC"] = numar_TC
+        q_temperaturi = CutiePostala()
+        memorie = memorie_initiala_t(configurare)
+        if memorie["cu_numpy"]:
+            import numpy as np
+
+            memorie["generator_np"] = np.random.default_rng(0)
+
+        # aceeasi munca din pas_t ca in varianta cu lista: termocupluri + publicare, apoi media citita de S
+        def ciclu_cadru():
+            memorie["index_cadru"] ^= 1
+            cadru = memorie["cadre"][memorie["index_cadru"]]
+            umple_cadru(cadru, 20.0, random, memorie["generator_np"])
+            cadru.timestamp = time.monotonic()
+            q_temperaturi.publica(cadru)
+            return q_temperaturi.citeste_ultimul()[1].medie
+
+        timp_lista, memorie_lista = masoara(lambda: ciclu_lista(numar_TC, q_temperaturi), numar)
+        timp_cadru, memorie_cadru = masoara(ciclu_cadru, numar)
+        print(f"{numar_TC:8d} | {timp_lista * 1e6:16.1f} | {timp_cadru * 1e6:16.1f} | {memorie_lista:14d} | {memorie_cadru:14d}")
+
+
+def benchmark_fuziune(dimensiuni=(4, 100, 1_000), fereastra=50, cadre=None):
+    # esantioane de senzor procesate pe secunda: FuziuneSenzori (incremental) vs recalcularea completa
+    # a mediei / variantei / medianei pe toata fereastra, pentru fiecare senzor, la fiecare cadru
+    rng = random.Random(0)
+
+    def recalculare_completa(ferestre, valori):
+        consens = statistics.median(valori)
+        suma = 0.0
+        acceptate = 0
+        for istoric, valoare in zip(ferestre, valori):
+            abatere = valoare - consens
+            if len(istoric) >= 3:
+                sigma = max(statistics.stdev(istoric), 0.05)
+                varf = abs(abatere - statistics.median(istoric)) > 4.0 * sigma
+            else:
+                varf = False
+            istoric.append(abatere)
+            if len(istoric) > fereastra:
+                istoric.pop(0)
+            if not varf and abs(statistics.median(istoric)) <= 1.0:
+                suma += valoare
+                acceptate += 1
+        return suma / acceptate if acceptate else consens
+
+    print(f"fereastra: {fereastra}")
+    print(f"{'senzori':>8s} | {'incremental [esantioane/s]':>26s} | {'recalculare [esantioane/s]':>26s} | {'accelerare':>10s}")
+    for numar in dimensiuni:
+        numar_cadre = cadre or max(2 * fereastra, 20_000 // numar)
+        date = [[21.0 + rng.uniform(-0.15, 0.15) for _ in range(numar)] for _ in range(numar_cadre)]
+
+        fuziune = FuziuneSenzori(numar, fereastra=fereastra)
+        t0 = time.perf_counter()
+        for valori in date:
+            fuziune.actualizeaza(valori)
+        incremental = numar * numar_cadre / (time.perf_counter() - t0)
+
+        ferestre = [[] for _ in range(numar)]
+        t0 = time.perf_counter()
+        for valori in date:
+            recalculare_completa(ferestre, valori)
+        complet = numar * numar_cadre / (time.perf_counter() - t0)
+
+        print(f"{numar:8d} | {incremental:26.0f} | {complet:26.0f} | {incremental / complet:9.1f}x")
+
+
+def benchmark_mpc(orizonturi=(5, 10, 20, 50, 100, 200), decizii=400, durata_simulata=1800.0):
+    # latenta unei decizii MPC (warm start) pentru fiecare orizont, comparata cu perioada_T,
+    # plus calitatea reglajului in bucla inchisa (simulare pe timp virtual) fata de modul automat
+    configurare = configurare_implicita()
+    perioada_t = configurare["perioada_T"]
+    rng = random.Random(0)
+
+    print(f"perioada_T: {perioada_t * 1000:.0f} ms")
+    print(f"{'orizont':>8s} | {'prima decizie [ms]':>18s} | {'medie [ms]':>10s} | {'p99 [ms]':>9s} | "
+          f"{'iteratii medii':>14s} | {'din perioada_T':>14s}")
+    for orizont in orizonturi:
+        configurare["mpc_orizont"] = orizont
+        (a, b, c), _ = coeficienti_model_mpc(configurare)
+
+        # prima decizie include construirea matricilor (cache gol)
+        matrici_predictie_mpc.cache_clear()
+        t0 = time.perf_counter()
+        controler = ControlerMPC(configurare)
+        controler.decide(configurare["temperatura_ambient"], configurare["presiune_referinta"], 0.0)
+        prima = time.perf_counter() - t0
+
+        # bucla inchisa pe modelul termic, cu zgomot de masurare, ca solutia anterioara sa fie un warm start realist
+        temperatura = configurare["temperatura_ambient"]
+        presiune = configurare["presiune_referinta"]
+        putere = 0.0
+        durate = []
+        iteratii = 0
+        for _ in range(decizii):
+            t0 = time.perf_counter()
+            putere = controler.decide(temperatura + rng.uniform(-0.05, 0.05), presiune, putere)
+            durate.append(time.perf_counter() - t0)
+            iteratii += controler.iteratii
+            temperatura = a * temperatura + b * putere + c
+        durate.sort()
+        medie = sum(durate) / len(durate)
+        p99 = durate[min(len(durate) - 1, int(0.99 * len(durate)))]
+        print(f"{orizont:8d} | {prima * 1000:18.2f} | {medie * 1000:10.3f} | {p99 * 1000:9.3f} | "
+              f"{iteratii / decizii:14.1f} | {p99 / perioada_t:13.2%}")
+
+    # calitatea reglajului: acelasi scenariu (pornire la rece) in modul automat si in modul mpc
+    print(f"\nbucla inchisa, {durata_simulata:.0f} s simulate de la pornire la rece (orizont {configurare_implicita()['mpc_orizont']}):")
+    print(f"{'mod':>8s} | {'stabilizare [s]':>15s} | {'suprareglaj [C]':>15s} | {'in afara benzii [s]':>19s} | "
+          f"{'activari valva':>14s} | {'presiune maxima':>15s} | {'eroare medie regim [C]':>22s}")
+    for mod, comenzi in (("automat", ()), ("mpc", ((0.0, "mpc"),))):
+        configurare = configurare_implicita()
+        evaluator = EvaluatorRulare(configurare, durata_simulata)
+        afisari = simuleaza_virtual(configurare, durata_simulata, comenzi, seed=0, telemetrie=evaluator)
+        scor = evaluator.scor()
+        # eroarea fata de temperatura de referinta in a doua jumatate a rularii (regim stabilizat)
+        regim = [abs(a["t_medie"] - configurare["temperatura_referinta"]) for a in afisari[len(afisari) // 2:]]
+        print(f"{mod:>8s} | {scor['timp_stabilizare']:15.1f} | {scor['suprareglaj']:15.2f} | "
+              f"{scor['timp_in_afara_benzii']:19.1f} | {scor['activari_valva']:14.0f} | {scor['presiune_maxima']:15.2f} | "
+              f"{sum(regim) / len(regim):22.3f}")
+
+
+def benchmark_ceas(configurare=None, durata_simulata=3600.0, seed=0):
+    # secunde simulate pe secunda reala pentru simularea pe timp virtual, plus o verificare de reproductibilitate
+    configurare = configurare or configurare_implicita()
+    comenzi = [(600.0, "m"), (600.0, "p 100"), (1800.0, "a")]
+
+    t0 = time.perf_counter()
+    afisari = simuleaza_virtual(configurare, durata_simulata, comenzi, seed=seed)
+    durata_reala = time.perf_counter() - t0
+
+    # comparam repr-urile, ca NaN-ul de dinainte de prima presiune sa nu strice egalitatea
+    reproductibil = repr(afisari) == repr(simuleaza_virtual(configurare, durata_simulata, comenzi, seed=seed))
+
+    print(f"simulat: {durata_simulata:.0f} s ; real: {durata_reala:.3f} s ; "
+          f"accelerare: {durata_simulata / durata_reala:.0f}x ; afisari S: {len(afisari)} ; "
+          f"reproductibil: {'da' if reproductibil else 'NU'}")
+
+
+def benchmark_profilare(configurare=None, durata_simulata=1200.0, perioade=(0.0, 1.0, 10.0), repetari=15, durata_fire=10.0,
+                        etape_afisate=8):
+    # costul profilarii pe etape
+    #   simulare - simularea pe timp virtual, fara Profilator si cu Profilator la fiecare perioada_esantionare_profil
+    #              (secunde virtuale, 0 = toate activarile). T, P si S ruleaza la fiecare eveniment, fara nicio asteptare
+    #              sau trezire de thread, deci doar calcul: cazul cel mai defavorabil. Se masoara timpul CPU; rularile
+    #              alterneaza, iar pentru fiecare varianta se pastreaza cea mai rapida. De aici iese costul unei etape.
+    #   fire - T, P si S in thread-uri, ca in main() (inclusiv bucla care armeaza esantioanele), cu perioadele din
+    #          configurare: timpul CPU pe secunda fara profilare si etapele marcate pe secunda cu profilarea implicita;
+    #          costul e estimat ca etape * cost pe etapa (diferenta directa de timp CPU e sub zgomotul masurarii)
+    #   fara profilare raman doar verificarile "profilator is not None"; costul lor e estimat din numarul de etape
+    configurare = configurare or configurare_implicita()
+    comenzi = [(300.0, "m"), (300.0, "p 100"), (900.0, "a")]
+
+    variante = (None,) + tuple(perioade)
+    timpi = {perioada: [] for perioada in variante}
+    profilatoare = {}
+    for _ in range(repetari):
+        for perioada in variante:
+            profilator = None if perioada is None else Profilator(toate=perioada <= 0)
+            t0 = time.process_time()
+            simuleaza_virtual(dict(configurare, perioada_esantionare_profil=perioada or 0.0), durata_simulata, comenzi,
+                              profilator=profilator)
+            timpi[perioada].append(time.process_time() - t0)
+            profilatoare[perioada] = profilator
+    timpi = {perioada: min(valori) for perioada, valori in timpi.items()}
+    fara = timpi[None]
+
+    def etape(profilator):
+        return sum(numar for _, numar, _, _ in profilator.instantaneu())
+
+    # cu toate activarile profilate avem numarul total de etape (deci si de verificari None) si costul unei etape
+    complet = Profilator(toate=True)
+    simuleaza_virtual(dict(configurare, perioada_esantionare_profil=0.0), durata_simulata, comenzi, profilator=complet)
+    verificari = etape(complet)
+    cost_etapa = (timpi[0.0] - fara) / verificari if 0.0 in timpi else 0.0
+    verificare_none = min(timeit.repeat("p is not None", globals={"p": None}, number=100_000, repeat=5)) / 100_000
+
+    def fire(profilator):
+        # (timp CPU al procesului pe secunda, etape marcate pe secunda)
+        stare = StarePartajata()
+        lock_consola = threading.Lock()
+        stop_event = threading.Event()
+        trezire = Trezire()
+        q_evenimente_sw = queue.Queue()
+        q_temperaturi = CutiePostala(trezire)
+        q_comenzi_automat = CutiePostala()
+        q_presiune = CutiePostala()
+        memorie_t = memorie_initiala_t(configurare)
+        memorie_p = memorie_initiala_p(configurare)
+        memorie_s = memorie_initiala_s()
+        taskuri = [
+            threading.Thread(target=task_t, args=(configurare, stare, q_temperaturi, stop_event, CEAS_REAL, random, None, None, memorie_t), daemon=True),
+            threading.Thread(target=task_p, args=(configurare, stare, q_comenzi_automat, q_presiune, stop_event, CEAS_REAL, random, None, None, memorie_p), daemon=True),
+            threading.Thread(target=task_s, args=(configurare, stare, q_evenimente_sw, q_temperaturi, q_comenzi_automat,
+                                                  q_presiune, stop_event, lock_consola, CEAS_REAL, trezire, memorie_s), daemon=True),
+        ]
+        if profilator is not None:
+            memorie_t["profilator"] = profilator.task("T")
+            memorie_p["profilator"] = profilator.task("P")
+            memorie_s["profilator"] = profilator.task("S")
+        esantionare = profilator is not None and not profilator.toate
+        with contextlib.redirect_stdout(io.StringIO()):
+            cpu0, t0 = time.process_time(), time.perf_counter()
+            for th in taskuri:
+                th.start()
+            # ca bucla lui main(): se trezeste la fiecare perioada si armeaza esantioanele (fara profilare, la 0.5 s)
+            while time.perf_counter() - t0 < durata_fire:
+                stop_event.wait(timeout=configurare["perioada_esantionare_profil"] if esantionare else 0.5)
+                if esantionare:
+                    profilator.armeaza()
+            opreste(stop_event, trezire)
+            for th in taskuri:
+                th.join(timeout=1.0)
+            durata = time.perf_counter() - t0
+        return (time.process_time() - cpu0) / durata, (etape(profilator) / durata if profilator is not None else 0.0)
+
+    cpu_fara, _ = fire(None)
+    cpu_cu, etape_pe_secunda = fire(Profilator(toate=configurare["perioada_esantionare_profil"] <= 0))
+
+    print(f"simulare: {durata_simulata:.0f} s simulate ; cel mai bun din {repetari} rulari (timp CPU) ; "
+          f"cost pe etapa: {cost_etapa * 1e9:.0f} ns")
+    print(f"{'':24s} | {'timp [ms]':>9s} | {'etape':>7s} | {'cost':>7s}")
+    print(f"{'fara profilare':24s} | {fara * 1e3:9.1f} | {'':7s} | {verificari * verificare_none / fara * 100:6.2f}%  "
+          f"(verificari None, estimat)")
+    for perioada in perioade:
+        nume = "toate activarile" if perioada <= 0 else f"esantionare {perioada:g} s"
+        print(f"{nume:24s} | {timpi[perioada] * 1e3:9.1f} | {etape(profilatoare[perioada]):7d} | "
+              f"{(timpi[perioada] - fara) / fara * 100:6.2f}%")
+
+    print(f"\nfire, {durata_fire:.0f} s, perioada_esantionare_profil={configurare['perioada_esantionare_profil']:g} s: "
+          f"CPU fara profilare {cpu_fara * 1e3:.2f} ms/s ; cu profilare {cpu_cu * 1e3:.2f} ms/s (masurat) ; "
+          f"{etape_pe_secunda:.0f} etape/s -> cost estimat {etape_pe_secunda * cost_etapa / cpu_fara * 100:.2f}%")
+
+    print("\netapele cele mai scumpe (simulare, toate activarile):")
+    randuri = {linie.split()[1]: linie for linie in formateaza_profil(complet)}
+    for stiva, _, _, _ in sorted(complet.instantaneu(), key=lambda rand: -rand[2])[:etape_afisate]:
+        print(randuri[stiva])
+
+
+class MasuratorPresiune:
+    # observator_p pentru benchmark_supervizor: intre doua cicluri P presiunea urca liniar de la valoarea lasata
+    # de ciclul anterior (dupa valva) la presiune_varf, apoi valva o coboara. Pe aceasta traiectorie masuram:
+    #   timp_peste - secunde cu presiunea peste presiune_maxima_siguranta
+    #   timpi_eliberare - pentru fiecare trecere peste prag, cat a durat pana la primul ciclu cu valva la 1.0
+    #                     (0 daca valva era deja complet deschisa)
+    #   comutari - schimbari ale deschiderii valvei
+    def __init__(self, configurare):
+        self.prag = configurare["presiune_maxima_siguranta"]
+        self.timp_anterior = None
+        self.presiune_anterioara = configurare["presiune_referinta"]
+        self.valva_anterioara = 0.0
+        self.activari = 0
+        self.comutari = 0
+        self.varf_maxim = float("-inf")
+        self.timp_peste = 0.0
+        self.trecere = None       # momentul trecerii peste prag care inca asteapta valva la 1.0
+        self.timpi_eliberare = []
+
+    def __call__(self, moment, instantaneu, memorie_p):
+        varf = memorie_p["presiune_varf"]
+        valva = memorie_p["actiune_valva"]
+        self.activari += 1
+        self.varf_maxim = max(self.varf_maxim, varf)
+        if self.timp_anterior is not None:
+            inceput, durata = self.presiune_anterioara, moment - self.timp_anterior
+            if varf > self.prag:
+                # fractiunea din interval petrecuta peste prag, pe segmentul liniar inceput -> varf
+                fractiune = 1.0 if inceput >= self.prag else (varf - self.prag) / (varf - inceput)
+                self.timp_peste += fractiune * durata
+                if inceput < self.prag and self.trecere is None:
+                    self.trecere = self.timp_anterior + (1.0 - fractiune) * durata
+                    if self.valva_anterioara == 1.0:
+                        self.timpi_eliberare.append(0.0)
+                        self.trecere = None
+        if self.trecere is not None and valva == 1.0:
+            self.timpi_eliberare.append(moment - self.trecere)
+            self.trecere = None
+        if valva != self.valva_anterioara:
+            self.comutari += 1
+        self.timp_anterior = moment
+        self.presiune_anterioara = memorie_p["presiune"]
+        self.valva_anterioara = valva
+
+
+def benchmark_supervizor(durata=900.0, seeds=range(5), repetari=7):
+    # pragurile fixe la fiecare perioada_P (inainte) vs SupervizorPresiune (dupa), pe timp virtual:
+    #   stabil - mod automat, presiunea sta langa referinta
+    #   soc p 100 - manual p 100 la t=60 s (pompa la maxim), inapoi in automat dupa 600 s
+    # eliberare - de la trecerea presiunii peste presiune_maxima_siguranta pana la ciclul care deschide valva complet
+    # CPU P - activari pe minut simulat * durata medie a unui pas_p, medie +- abatere standard pe `repetari`
+    #         masuratori ale costului unui pas (diferente mai mici decat abaterea sunt zgomot)
+    scenarii = (("stabil", ()), ("soc p 100", ((60.0, "m"), (60.0, "p 100"), (660.0, "a"))))
+
+    print(f"{'scenariu':>10s} | {'supervizor':>10s} | {'varf [bar]':>10s} | {'peste prag [s]':>14s} | "
+          f"{'eliberare medie/max [ms]':>24s} | {'comutari valva/min':>18s} | {'activari P/min':>14s} | {'CPU P [ms/min]':>16s}")
+    for nume, comenzi in scenarii:
+        for supervizor in (False, True):
+            configurare = configurare_implicita()
+            configurare["supervizor_presiune"] = supervizor
+            masuratori = []
+            for seed in seeds:
+                masurator = MasuratorPresiune(configurare)
+                simuleaza_virtual(configurare, durata, comenzi, seed=seed, observator_p=masurator)
+                masuratori.append(masurator)
+
+            # costul unui pas_p, pe acelasi tip de incarcare (fara T si S), masurat de mai multe ori
+            costuri_pas = []
+            for _ in range(repetari):
+                ceas = CeasVirtual()
+                memorie = memorie_initiala_p(configurare)
+                stare, q_comenzi_automat, q_presiune = StarePartajata(putere_manual=100.0), CutiePostala(), CutiePostala()
+                if comenzi:
+                    stare.seteaza_mod("manual")
+                rng = random.Random(0)
+                pasi = 20_000
+                t0 = time.process_time()
+                for _ in range(pasi):
+                    ceas.timp += memorie["perioada"]
+                    pas_p(configurare, memorie, stare, q_comenzi_automat, q_presiune, ceas, rng)
+                costuri_pas.append((time.process_time() - t0) / pasi)
+
+            minute = durata / 60.0 * len(masuratori)
+            activari = sum(m.activari for m in masuratori) / minute
+            eliberari = [t for m in masuratori for t in m.timpi_eliberare]
+            eliberare = (f"{sum(eliberari) / len(eliberari) * 1e3:9.1f} / {max(eliberari) * 1e3:6.1f}" if eliberari
+                         else f"{'-':>9s} / {'-':>6s}")
+            print(f"{nume:>10s} | {'da' if supervizor else 'nu':>10s} | {max(m.varf_maxim for m in masuratori):10.3f} | "
+                  f"{sum(m.timp_peste for m in masuratori) / len(masuratori):14.3f} | {eliberare:>24s} | "
+                  f"{sum(m.comutari for m in masuratori) / minute:18.1f} | {activari:14.1f} | "
+                  f"{activari * statistics.fmean(costuri_pas) * 1e3:7.3f} +- {activari * statistics.stdev(costuri_pas) * 1e3:5.3f}")
+
+
+def benchmark_stare(dimensiuni=(1, 8, 64), durata=1.0, perioada_scriere=0.001):
+    # N fire cititoare citesc continuu (mod, putere_curenta), ca T / P / serverul de control, iar un scriitor (ca S)
+    # publica o putere noua la fiecare perioada_scriere; dict + lock_stare (varianta veche) vs StarePartajata
+    #   citiri/s - citiri consistente pe secunda, toate firele la un loc
+    #   scrieri/s - cate publicari a reusit scriitorul (cititorii care nu dorm ii iau din timpul de GIL)
+    def ruleaza(numar_cititori, citeste, scrie):
+        start = threading.Event()
+        stop = threading.Event()
+        citiri = [0] * numar_cititori
+        scrieri = [0]
+
+        def cititor(index):
+            numar = 0
+            start.wait()
+            while not stop.is_set():
+                for _ in range(100):
+                    citeste()
+                numar += 100
+            citiri[index] = numar
+
+        def scriitor():
+            putere = 0.0
+            start.wait()
+            while not stop.is_set():
+                putere = 40.0 if putere != 40.0 else 60.0
+                scrie(putere)
+                scrieri[0] += 1
+                time.sleep(perioada_scriere)
+
+        fire = [threading.Thread(target=cititor, args=(i,), daemon=True) for i in range(numar_cititori)]
+        fire.append(threading.Thread(target=scriitor, daemon=True))
+        for th in fire:
+            th.start()
+        t0 = time.perf_counter()
+        start.set()
+        time.sleep(durata)
+        stop.set()
+        for th in fire:
+            th.join()
+        durata_reala = time.perf_counter() - t0
+        return sum(citiri) / durata_reala, scrieri[0] / durata_reala
+
+    def varianta_veche():
+        stare = {"mod": "automat", "putere_manual": 30.0, "putere_curenta": 0.0}
+        lock_stare = threading.Lock()
+
+        def citeste():
+            with lock_stare:
+                return stare["mod"], stare["putere_curenta"]
+
+        def scrie(putere):
+            with lock_stare:
+                stare["putere_curenta"] = putere
+
+        return citeste, scrie
+
+    def varianta_noua():
+        stare = StarePartajata()
+
+        def citeste():
+            instantaneu = stare.citeste()
+            return instantaneu.mod, instantaneu.putere_curenta
+
+        def scrie(putere):
+            stare.seteaza_putere_curenta(putere, "automat")
+
+        return citeste, scrie
+
+    print(f"{'cititori':>8s} | {'stare':>14s} | {'citiri/s':>12s} | {'scrieri/s':>9s}")
+    for numar in dimensiuni:
+        for nume, varianta in (("dict + lock", varianta_veche), ("StarePartajata", varianta_noua)):
+            citiri, scrieri = ruleaza(numar, *varianta())
+            print(f"{numar:8d} | {nume:>14s} | {citiri:12.0f} | {scrieri:9.0f}")
+
+def benchmark_cutie(mesaje=200_000, dus_intors=20_000):
+    # per-mesaj: Queue(maxsize=1) + ultimul_mesaj + golire cu get_nowait (varianta veche) vs CutiePostala
+    #   debit - un producator si un cititor in acelasi thread (costul pur al unui hop)
+    #   latenta - ping-pong intre doua thread-uri, cititorul asteapta blocant; latenta = dus-intors / 2
+
+    def debit_coada():
+        coada = queue.Queue(maxsize=1)
+        t0 = time.perf_counter()
+        for i in range(mesaje):
+            ultimul_mesaj(coada, {"timestamp": 0.0, "valoare": i})
+            try:
+                ultimul = coada.get_nowait()
+                while True:
+                    try:
+                        ultimul = coada.get_nowait()
+                    except queue.Empty:
+                        break
+            except queue.Empty:
+                pass
+        return mesaje / (time.perf_counter() - t0)
+
+    def debit_cutie():
+        cutie = CutiePostala()
+        secventa = 0
+        t0 = time.perf_counter()
+        for i in range(mesaje):
+            cutie.publica({"timestamp": 0.0, "valoare": i})
+            secventa, ultimul = cutie.ia_daca_nou(secventa)
+        return mesaje / (time.perf_counter() - t0)
+
+    def latenta(creeaza, trimite, asteapta):
+        dus, intors = creeaza(), creeaza()
+
+        def ecou():
+            stare_citire = 0
+            for _ in range(dus_intors):
+                stare_citire, mesaj = asteapta(dus, stare_citire)
+                trimite(intors, mesaj)
+
+        th = threading.Thread(target=ecou, daemon=True)
+        th.start()
+        stare_citire = 0
+        t0 = time.perf_counter()
+        for i in range(dus_intors):
+            trimite(dus, i)
+            stare_citire, _ = asteapta(intors, stare_citire)
+        durata = time.perf_counter() - t0
+        th.join()
+        return durata / dus_intors / 2 * 1e6
+
+    def asteapta_coada(coada, _):
+        return 0, coada.get()
+
+    def asteapta_cutie(cutie, secventa):
+        while True:
+            secventa, mesaj = cutie.asteapta_mai_nou(secventa, timeout=1.0)
+            if mesaj is not None:
+                return secventa, mesaj
+
+    debit_vechi, debit_nou = debit_coada(), debit_cutie()
+    latenta_veche = latenta(lambda: queue.Queue(maxsize=1), ultimul_mesaj, asteapta_coada)
+    latenta_noua = latenta(CutiePostala, CutiePostala.publica, asteapta_cutie)
+
+    print(f"{'':22s} | {'debit [mesaje/s]':>16s} | {'latenta [us]':>12s}")
+    print(f"{'Queue + ultimul_mesaj':22s} | {debit_vechi:16.0f} | {latenta_veche:12.1f}")
+    print(f"{'CutiePostala':22s} | {debit_nou:16.0f} | {latenta_noua:12.1f}")
+
+
+def benchmark_izolare(durata=5.0):
+    # cat de tarziu pornesc activarile lui P (release jitter) cand S e incarcat: in S ruleaza un fir care
+    # tine procesorul ocupat cu calcul pur Python. Fire (T / P / S in acelasi interpretor, deci acelasi GIL)
+    # vs multiproces (fiecare task in procesul lui, pe memorie partajata). Afisarea lui S e oprita.
+    # In ambele moduri S e condus de evenimente, ca in main / main_multiproces; "S treziri/s" arata ca S doarme
+    # intre intrari (temperatura de la T de 2 ori pe secunda, afisarea o data pe secunda), fara polling
+    configurare = configurare_implicita()
+
+    def ruleaza_fire(incarcare):
+        stare = StarePartajata()
+        stop_event = threading.Event()
+        trezire_s = Trezire()
+        memorie_s = memorie_initiala_s(CEAS_REAL)
+        q_temperaturi, q_comenzi_automat, q_presiune = CutiePostala(trezire_s), CutiePostala(), CutiePostala()
+        statistici = creeaza_statistici(configurare)
+        fire = [
+            threading.Thread(target=task_t, args=(configurare, stare, q_temperaturi, stop_event, CEAS_REAL, random, statistici["T"]), daemon=True),
+            threading.Thread(target=task_p, args=(configurare, stare, q_comenzi_automat, q_presiune, stop_event, CEAS_REAL, random, statistici["P"]), daemon=True),
+            threading.Thread(target=task_s, args=(configurare, stare, queue.Queue(), q_temperaturi, q_comenzi_automat, q_presiune,
+                                                  stop_event, threading.Lock(), CEAS_REAL, trezire_s, memorie_s), daemon=True),
+        ]
+        if incarcare:
+            fire.append(threading.Thread(target=ocupa_cpu, args=(stop_event,), daemon=True))
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.monotonic()
+            for th in fire:
+                th.start()
+            time.sleep(durata)
+            opreste(stop_event, trezire_s)
+            for th in fire:
+                th.join(timeout=2.0)
+        return statistici["P"].instantaneu(), memorie_s["treziri"] / (time.monotonic() - t0)
+
+    def ruleaza_procese(incarcare):
+        # lock-ul si cozile raman referite aici cat ruleaza procesele (cu "spawn" copiii se ataseaza la ele dupa pornire)
+        stop_event = multiprocessing.Event()
+        lock_consola = multiprocessing.Lock()
+        q_evenimente_sw = CoadaEvenimenteMP()
+        rezultate = multiprocessing.Queue()
+        procese, stare, canale, trezire_s = porneste_procese(configurare, stop_event, lock_consola, q_evenimente_sw,
+                                                             rezultate, incarcare_s=incarcare, afiseaza=False)
+        time.sleep(durata)
+        opreste(stop_event, trezire_s)
+        statistici = inchide_procese(procese, stare, canale, rezultate)
+        return statistici["P"], statistici["S"]["treziri"] / statistici["S"]["durata"]
+
+    print(f"P: perioada {configurare['perioada_P'] * 1e3:.0f} ms, {durata:.0f} s per rulare, {os.cpu_count()} nuclee")
+    print(f"{'mod':>11s} | {'S incarcat':>10s} | {'activari':>8s} | {'intarziere medie':>16s} | {'p99':>8s} | {'max':>8s}"
+          f" | {'termene ratate':>14s} | {'S treziri/s':>11s}")
+    for nume, ruleaza in (("fire", ruleaza_fire), ("multiproces", ruleaza_procese)):
+        for incarcare in (False, True):
+            p, treziri_s = ruleaza(incarcare)
+            print(f"{nume:>11s} | {'da' if incarcare else 'nu':>10s} | {p['activari']:8d} | {p['intarziere_medie'] * 1e3:13.3f} ms"
+                  f" | {p['intarziere_p99'] * 1e3:5.2f} ms | {p['intarziere_max'] * 1e3:5.2f} ms | {p['termene_ratate']:14d}"
+                  f" | {treziri_s:11.1f}")
+
+
+def benchmark_sweep(durata=600.0, lucrari_per_proces=4):
+    # scalarea sweep-ului cu numarul de procese: aceeasi incarcare pe proces, timpul ar trebui sa ramana constant
+    # (sau, pentru acelasi numar total de lucrari, accelerarea ~ numarul de nuclee)
+    nuclee = os.cpu_count() or 1
+    numar_procese = sorted({1, 2, 4, 8, nuclee} & set(range(1, nuclee + 1)))
+    total = lucrari_per_proces * nuclee
+    combinatii = combinatii_aleatoare({"k_automat": (4.0, 30.0), "putere_baza_automat": (10.0, 50.0)}, total)
+
+    print(f"nuclee: {nuclee} ; lucrari: {total} ; durata simulata per lucrare: {durata:.0f} s")
+    print(f"{'procese':>7s} | {'timp [s]':>8s} | {'simulari/s':>10s} | {'accelerare':>10s}")
+    referinta = None
+    for procese in numar_procese:
+        t0 = time.perf_counter()
+        ruleaza_sweep(combinatii, durata=durata, procese=procese)
+        timp = time.perf_counter() - t0
+        referinta = referinta or timp
+        print(f"{procese:7d} | {timp:8.2f} | {total / timp:10.2f} | {referinta / timp:9.2f}x")
+
+
+def benchmark_asyncio(configurare=None, dimensiuni=(1, 100, 500), durata=3.0):
+    # cate controlere (T / P / S fiecare) incap pe o singura bucla asyncio: CPU folosit si numar de thread-uri
+    configurare = configurare or configurare_implicita()
+
+    async def ruleaza(numar):
+        stop_event = asyncio.Event()
+        task_uri = []
+        for _ in range(numar):
+            corutine, _ = creeaza_controler_async(configurare, stop_event, afiseaza=None)
+            task_uri.extend(asyncio.ensure_future(c) for c in corutine)
+        await asyncio.sleep(durata)
+        fire = threading.active_count()
+        stop_event.set()
+        await asyncio.gather(*task_uri)
+        return fire
+
+    print(f"{'controlere':>10s} | {'CPU [%]':>8s} | {'thread-uri':>10s}")
+    for numar in dimensiuni:
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        fire = asyncio.run(ruleaza(numar))
+        cpu = (time.process_time() - cpu0) / (time.perf_counter() - t0) * 100.0
+        print(f"{numar:10d} | {cpu:8.1f} | {fire:10d}")
+
+
+def benchmark_control(dimensiuni=(1, 100, 1000), comenzi_per_client=20, numar_camere=10):
+    # test de incarcare: 1 / 100 / 1000 clienti conectati simultan la serverul de control (socket Unix daca exista, altfel TCP),
+    # fiecare trimite comenzi "camere <i> p <n>" una dupa alta si masoara timpul dus-intors (pana la aplicarea in S)
+    # serverul si controlerele (asyncio) ruleaza pe un thread separat, clientii pe bucla din thread-ul principal
+    configurare = configurare_implicita()
+    director = tempfile.mkdtemp()
+    adresa = os.path.join(director, "control.sock") if hasattr(socket, "AF_UNIX") else "127.0.0.1:0"
+    gata = threading.Event()
+    adresa_efectiva = []
+    bucla_server = []
+
+    async def ruleaza_server():
+        stop_event = asyncio.Event()
+        bucla_server.append((asyncio.get_running_loop(), stop_event))
+        camere = []
+        task_uri = []
+        for _ in range(numar_camere):
+            corutine, camera = creeaza_controler_async(configurare, stop_event, afiseaza=None)
+            camere.append(camera)
+            task_uri.extend(asyncio.ensure_future(c) for c in corutine)
+        pornit = asyncio.get_running_loop().create_future()
+        server = asyncio.ensure_future(server_control(configurare, camere, stop_event, adresa, pornit))
+        adresa_efectiva.append(await pornit)
+        gata.set()
+        await asyncio.gather(server, *task_uri)
+
+    fir_server = threading.Thread(target=asyncio.run, args=(ruleaza_server(),), daemon=True)
+    fir_server.start()
+    gata.wait()
+
+    async def client(indice, durate):
+        if "/" in adresa_efectiva[0]:
+            reader, writer = await asyncio.open_unix_connection(adresa_efectiva[0])
+        else:
+            host, _, port = adresa_efectiva[0].rpartition(":")
+            reader, writer = await asyncio.open_connection(host, int(port))
+        camera = indice % numar_camere
+        for k in range(comenzi_per_client):
+            t0 = time.perf_counter()
+            writer.write(f"camere {camera} p {(indice + k) % 101}\n".encode())
+            raspuns = await reader.readline()
+            durate.append(time.perf_counter() - t0)
+            assert raspuns.startswith(b'{"ok": true'), raspuns
+        writer.close()
+
+    async def ruleaza_clienti(clienti):
+        durate = []
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(i, durate) for i in range(clienti)))
+        return durate, time.perf_counter() - t0
+
+    print(f"camere: {numar_camere} ; comenzi per client: {comenzi_per_client} ; adresa: {'unix' if '/' in adresa else 'tcp'}")
+    print(f"{'clienti':>8s} | {'p50 [ms]':>9s} | {'p99 [ms]':>9s} | {'max [ms]':>9s} | {'debit [comenzi/s]':>17s}")
+    for clienti in dimensiuni:
+        durate, total = asyncio.run(ruleaza_clienti(clienti))
+        durate.sort()
+
+        def procent(p):
+            return durate[min(len(durate) - 1, int(p * len(durate)))] * 1000
+
+        print(f"{clienti:8d} | {procent(0.50):9.2f} | {procent(0.99):9.2f} | {durate[-1] * 1000:9.2f} | "
+              f"{len(durate) / total:17.0f}")
+
+    bucla, stop_event = bucla_server[0]
+    bucla.call_soon_threadsafe(stop_event.set)
+    fir_server.join(timeout=5.0)
+    shutil.rmtree(director, ignore_errors=True)
+
+
+def benchmark_camere(configurare=None, dimensiuni=(1, 100, 10_000, 100_000), durata=1.0, max_camere_fire=1_000):
+    # compara camere-pas pe secunda: motorul vectorizat vs un fir (thread) per camera
+    # in varianta cu fire, fiecare fir face munca unui ciclu T + S + P (StarePartajata, termocupluri, calcul putere,
+    # cozi de ultim mesaj) fara asteptare periodica, ca sa masuram doar costul de calcul si de sincronizare.
+    # Peste max_camere_fire nu mai pornim fire (sute de mii de thread-uri nu sunt realiste), afisam "-".
+    configurare = configurare or configurare_implicita()
+
+    def camera_cu_fir(stare, q_temperaturi, q_comenzi_automat, start, rezultat, index):
+        temperatura_baza = configurare["temperatura_ambient"]
+        presiune = configurare["presiune_referinta"]
+        cadru = CadruSenzori(configurare["numar_TC"])
+        pasi = 0
+        start.wait()
+        sfarsit = time.perf_counter() + durata
+        while time.perf_counter() < sfarsit:
+            putere_curenta = stare.citeste().putere_curenta
+            temperatura_tinta = configurare["temperatura_ambient"] + configurare["delta_max_incalzire"] * (putere_curenta / 100.0)
+            temperatura_baza += configurare["viteza_raspuns_temperatura"] * (temperatura_tinta - temperatura_baza)
+            umple_cadru(cadru, temperatura_baza, random)
+            cadru.timestamp = time.monotonic()
+            q_temperaturi.publica(cadru)
+
+            t_medie = cadru.medie
+            calcul_confort(t_medie, configurare["temperatura_referinta"], configurare["banda_confort"])
+            putere = limiteaza(calcul_putere_mod_automat(t_medie, configurare["temperatura_referinta"],
+                                                         configurare["k_automat"], configurare["putere_baza_automat"]), 0.0, 100.0)
+            stare.seteaza_putere_curenta(putere, "automat")
+            q_comenzi_automat.publica({"timestamp": time.monotonic(), "putere": putere})
+
+            presiune += configurare["crestere_presiune"] * (putere / 100.0) + configurare["revenire_presiune"] * (configurare["presiune_referinta"] - presiune)
+            pasi += 1
+        rezultat[index] = pasi
+
+    def ruleaza_fire(numar_camere):
+        start = threading.Event()
+        rezultat = [0] * numar_camere
+        fire = []
+        for i in range(numar_camere):
+            args = (StarePartajata(), CutiePostala(), CutiePostala(), start, rezultat, i)
+            fire.append(threading.Thread(target=camera_cu_fir, args=args, daemon=True))
+        for th in fire:
+            th.start()
+        t0 = time.perf_counter()
+        start.set()
+        for th in fire:
+            th.join()
+        return sum(rezultat) / (time.perf_counter() - t0)
+
+    def ruleaza_vectorizat(numar_camere):
+        camere = creeaza_camere(configurare, numar_camere, seed=0)
+        pasi = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < durata:
+            pas_camere(configurare, camere)
+            pasi += 1
+        return numar_camere * pasi / (time.perf_counter() - t0)
+
+    print(f"{'camere':>8s} | {'fire [camere-pas/s]':>20s} | {'vectorizat [camere-pas/s]':>26s} | {'accelerare':>10s}")
+    for numar_camere in dimensiuni:
+        vectorizat = ruleaza_vectorizat(numar_camere)
+        if numar_camere <= max_camere_fire:
+            fire = ruleaza_fire(numar_camere)
+            print(f"{numar_camere:8d} | {fire:20.0f} | {vectorizat:26.0f} | {vectorizat / fire:9.1f}x")
+        else:
+            print(f"{numar_camere:8d} | {'-':>20s} | {vectorizat:26.0f} | {'-':>10s}")
+
+
+def benchmark_cladire(dimensiuni=((10, 10, 3), (20, 25, 20), (50, 50, 40)), pasi=50):
+    # cat dureaza un pas pas_camere pentru toata cladirea (T / S / P pe fiecare zona) cu si fara cuplaj termic,
+    # comparat cu perioada_T, plus o verificare a produsului CSR fata de matricea densa (cladirea mica)
+    # si efectul cuplajului asupra zonelor de la margine vs interior (acelasi reglaj automat)
+    import numpy as np
+
+    configurare = configurare_implicita()
+    perioada_t = configurare["perioada_T"]
+
+    cuplaj = cuplaj_cladire(configurare, *dimensiuni[0])
+    numar = cuplaj["matrice"].numar_randuri
+    densa = np.zeros((numar, numar))
+    np.add.at(densa, (cuplaj["matrice"].randuri, cuplaj["matrice"].indici), cuplaj["matrice"].valori)
+    x = np.random.default_rng(0).uniform(15.0, 25.0, numar)
+    eroare = float(np.max(np.abs(densa @ x - cuplaj["matrice"].inmulteste(x))))
+    print(f"verificare CSR vs dens ({numar} zone): eroare maxima {eroare:.2e}")
+
+    print(f"{'zone':>8s} | {'nenule':>8s} | {'construire [ms]':>15s} | {'produs CSR [ms]':>15s} | "
+          f"{'pas izolat [ms]':>15s} | {'pas cuplat [ms]':>15s} | {'din perioada_T':>14s}")
+    for latime, adancime, etaje in dimensiuni:
+        t0 = time.perf_counter()
+        cuplaj = cuplaj_cladire(configurare, latime, adancime, etaje)
+        construire = time.perf_counter() - t0
+        matrice = cuplaj["matrice"]
+        numar = matrice.numar_randuri
+
+        temperaturi = np.full(numar, configurare["temperatura_ambient"])
+        t0 = time.perf_counter()
+        for _ in range(pasi):
+            matrice.inmulteste(temperaturi)
+        produs = (time.perf_counter() - t0) / pasi
+
+        durate = []
+        for cu_cuplaj in (None, cuplaj):
+            camere = creeaza_camere(configurare, numar, seed=0, cuplaj=cu_cuplaj)
+            t0 = time.perf_counter()
+            for _ in range(pasi):
+                pas_camere(configurare, camere)
+            durate.append((time.perf_counter() - t0) / pasi)
+
+        print(f"{numar:8d} | {matrice.valori.shape[0]:8d} | {construire * 1000:15.1f} | {produs * 1000:15.2f} | "
+              f"{durate[0] * 1000:15.2f} | {durate[1] * 1000:15.2f} | {durate[1] / perioada_t:13.1%}")
+
+    # regim stabilizat (2000 pasi T) pe cladirea mica: zonele de la margine pierd caldura spre exterior
+    latime, adancime, etaje = dimensiuni[0]
+    camere = creeaza_camere(configurare, latime * adancime * etaje, seed=0, cuplaj=cuplaj_cladire(configurare, latime, adancime, etaje))
+    for _ in range(2000):
+        pas_camere(configurare, camere)
+    z, y, x = np.meshgrid(np.arange(etaje), np.arange(adancime), np.arange(latime), indexing="ij")
+    margine = ((x == 0) | (x == latime - 1) | (y == 0) | (y == adancime - 1)).ravel()
+    print(f"\nregim stabilizat, {latime}x{adancime}x{etaje} zone, mod automat "
+          f"(temperatura_exterior {configurare['temperatura_exterior']:.0f} C):")
+    print(f"{'zone':>9s} | {'T medie [C]':>11s} | {'putere medie [%]':>16s}")
+    for nume, masca in (("margine", margine), ("interior", ~margine)):
+        print(f"{nume:>9s} | {camere['temperatura_baza'][masca].mean():11.2f} | {camere['putere_curenta'][masca].mean():16.1f}")
+
+
+def benchmark_pornire(repetari=5, durata_simulata=1800.0):
+    # timpul de la pornirea procesului pana la prima linie [S] (prima decizie), rece vs cald:
+    #   rece   - "python heating_control.py": sursa se compileaza la fiecare pornire, configurarea implicita
+    #   -m     - "python -m heating_control" cu modulul precompilat (bytecode din __pycache__)
+    #   cald   - ca -m, plus --configurare (copia compilata) si --instantaneu (T / P pornesc din instantaneu)
+    # si, pe timp virtual, dupa cat timp t_medie ramane la 0.3 C de regimul stabil (media ultimului minut), fara / cu instantaneu
+    director = os.path.dirname(os.path.abspath(__file__))
+    py_compile.compile(os.path.join(director, "heating_control.py"))
+    configurare = configurare_implicita()
+
+    def timp_stabilizare(afisari):
+        regim = sum(a["t_medie"] for a in afisari[-60:]) / len(afisari[-60:])
+        return max((a["timp"] for a in afisari if abs(a["t_medie"] - regim) > 0.3), default=0.0)
+
+    def prima_decizie(argumente):
+        t0 = time.perf_counter()
+        proces = subprocess.Popen([sys.executable, "-u", *argumente], cwd=director, stdin=subprocess.PIPE,
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        linie = ""
+        for linie in proces.stdout:
+            if "[S]" in linie:
+                break
+        durata = time.perf_counter() - t0
+        proces.communicate("q\n")
+        return durata, linie[linie.find("[S]"):].strip()
+
+    with tempfile.TemporaryDirectory() as temporar:
+        cale_configurare = os.path.join(temporar, "configurare.json")
+        cale_instantaneu = os.path.join(temporar, "instantaneu.bin")
+        salveaza_configurare(cale_configurare, configurare)
+        incarca_configurare(cale_configurare)
+
+        # prima rulare porneste rece (nu exista instantaneu) si il salveaza la final; a doua porneste din el
+        rece = timp_stabilizare(simuleaza_virtual(configurare, durata_simulata, instantaneu=cale_instantaneu))
+        cald = timp_stabilizare(simuleaza_virtual(configurare, durata_simulata, instantaneu=cale_instantaneu))
+
+        variante = (
+            ("rece", ["heating_control.py"]),
+            ("-m", ["-m", "heating_control"]),
+            ("cald", ["-m", "heating_control", "--configurare", cale_configurare, "--instantaneu", cale_instantaneu]),
+        )
+        print(f"{'pornire':>8s} | {'prima decizie min/median [ms]':>29s} | prima linie [S]")
+        for nume, argumente in variante:
+            rezultate = sorted(prima_decizie(argumente) for _ in range(repetari))
+            print(f"{nume:>8s} | {rezultate[0][0] * 1e3:13.1f} / {rezultate[len(rezultate) // 2][0] * 1e3:13.1f} | {rezultate[0][1]}")
+
+    print(f"timp simulat pana la regim stabil: rece {rece:.1f} s ; cu instantaneu {cald:.1f} s")
+
+# benchmark-uri disponibile din linia de comanda: python heating_control.py --benchmark <nume>
+BENCHMARKURI = {
+    "camere": benchmark_camere,
+    "ceas": benchmark_ceas,
+    "cutie": benchmark_cutie,
+    "evenimente_s": benchmark_evenimente_s,
+    "asyncio": benchmark_asyncio,
+    "sweep": benchmark_sweep,
+    "cadre": benchmark_cadre,
+    "fuziune": benchmark_fuziune,
+    "mpc": benchmark_mpc,
+    "control": benchmark_control,
+    "stare": benchmark_stare,
+    "cladire": benchmark_cladire,
+    "izolare": benchmark_izolare,
+    "supervizor": benchmark_supervizor,
+    "pornire": benchmark_pornire,
+    "profilare": benchmark_profilare,
+}
@@ -16,10 +16,18 @@
 # cand un ask ia lock ul doar el poate citi/scrie in zona partajata. celelalte thread-uri asteapta, se previne race condition
 # stop_event - semnal de oprire pentru toate thread-urile. E ca un steag, cat timp nu e setat, thread-urile ruleaza, dupa ce e setat se opresc
 # time - time.monotonic(), este un ceas care nu se da inapoi (nu e afectat de schimbari de ora sistem), pentru perioade stabile de timp (ex: fac ceva la fiecare 0.5 secunde)
+import collections
+import functools
+import heapq
+import itertools
+import os
 import queue
 import random
+import struct
+import sys
 import threading
 import time
+from array import array
 
 def limiteaza(valoare, minim, maxim):
     # intoarce valoarea in intervalul [minim, maxim]
@@ -49,24 +57,471 @@ def ultimul_mesaj(coada, mesaj):
         # in acel moment coada s-a umplut din nou, renuntam (alt thread a pus ceva intre timp)
         pass
 
-def goleste_coada(coada):
-    # Scoate toate elementele ramase in coada, fara sa blocheze thread-ul
-    # Folositor la comutare de mod: vrem sa aruncam comenzi vechi
-    while True:
-        try:
-            coada.get_nowait()
-        except queue.Empty:
-            break
+class Trezire:
+    # semnal comun pentru toate intrarile unui task (temperatura, presiune, evenimente SW, oprire)
+    # fiecare semnaleaza() creste generatia; cine asteapta tine minte ultima generatie vazuta,
+    # deci un semnal venit cat timp task-ul lucra nu se pierde (urmatoarea asteptare se intoarce imediat)
+    __slots__ = ("_generatii", "generatie", "_conditie", "_asteptatori")
+
+    def __init__(self):
+        self._generatii = itertools.count(1)
+        self.generatie = 0
+        self._conditie = threading.Condition(threading.Lock())
+        self._asteptatori = 0
+
+    def semnaleaza(self):
+        self.generatie = next(self._generatii)
+        if self._asteptatori:
+            with self._conditie:
+                self._conditie.notify_all()
+
+    def asteapta(self, generatie_vazuta, timeout=None):
+        # asteapta (fara busy-wait) un semnal mai nou decat generatie_vazuta, maxim timeout secunde
+        # intoarce generatia curenta
+        if self.generatie == generatie_vazuta:
+            with self._conditie:
+                self._asteptatori += 1
+                try:
+                    self._conditie.wait_for(lambda: self.generatie != generatie_vazuta, timeout)
+                finally:
+                    self._asteptatori -= 1
+        return self.generatie
+
+
+class CutiePostala:
+    # canal "ultimul mesaj castiga" cu un singur loc si numar de secventa (inlocuieste Queue(maxsize=1) + ultimul_mesaj)
+    # publica() doar inlocuieste tuplul (secventa, mesaj): o singura atribuire, atomica sub GIL, fara mutex.
+    # Nu se pierde niciodata mesajul cel mai nou (cu coada, ramura queue.Full putea arunca tocmai mesajul nou).
+    # Cititorul tine minte secventa ultimului mesaj citit si cere doar mesaje mai noi decat ea.
+    # Un singur cititor per cutie (S pentru temperaturi/presiune, P pentru comenzi automate).
+    # Cititorul care asteapta blocant (asteapta_mai_nou) lasa in _asteptator un lock nou, deja luat, si doarme
+    # incercand sa-l ia din nou; publica() il elibereaza. E predarea pe care o face si threading.Condition, dar
+    # fara mutex-ul, coada de asteptatori si predicatul ei: cu un singur cititor nu e nevoie de ele.
+    # trezire - optional, o Trezire semnalata la fiecare publicare (S asteapta pe toate intrarile odata)
+    __slots__ = ("_slot", "_secvente", "_asteptator", "_trezire", "depasite")
+
+    def __init__(self, trezire=None):
+        self._slot = (0, None)              # (secventa, mesaj); secventa 0 = nimic publicat
+        self._secvente = itertools.count(1)
+        self._asteptator = None             # lock-ul cititorului blocat in asteapta_mai_nou, daca exista
+        self._trezire = trezire
+        self.depasite = 0                   # mesaje suprascrise inainte sa fie citite (esantioane vechi)
+
+    @property
+    def secventa(self):
+        return self._slot[0]
+
+    def publica(self, mesaj):
+        secventa = next(self._secvente)
+        self._slot = (secventa, mesaj)
+        # cititorul pune _asteptator inainte sa verifice din nou slotul, deci daca aici citim None,
+        # cititorul va vedea oricum mesajul nou. Doar cititorul sterge _asteptator (la iesirea din asteptare).
+        asteptator = self._asteptator
+        if asteptator is not None:
+            try:
+                asteptator.release()
+            except RuntimeError:
+                # eliberat deja de o publicare anterioara, cititorul nu a apucat inca sa se intoarca
+                pass
+        if self._trezire is not None:
+            self._trezire.semnaleaza()
+        return secventa
+
+    def citeste_ultimul(self):
+        # (secventa, mesaj) pentru ultimul mesaj publicat, fara sa-l marcheze ca citit
+        return self._slot
+
+    def ia_daca_nou(self, secventa_citita):
+        # neblocant: (secventa, mesaj) daca exista un mesaj mai nou decat secventa_citita, altfel (secventa_citita, None)
+        secventa, mesaj = self._slot
+        if secventa <= secventa_citita:
+            return secventa_citita, None
+        self.depasite += secventa - secventa_citita - 1
+        return secventa, mesaj
+
+    def asteapta_mai_nou(self, secventa_citita, timeout=None):
+        # ca ia_daca_nou, dar asteapta (fara busy-wait) maxim timeout secunde sa apara un mesaj mai nou
+        if self._slot[0] <= secventa_citita:
+            termen = None if timeout is None else time.monotonic() + timeout
+            while self._slot[0] <= secventa_citita:
+                ramas = -1 if termen is None else termen - time.monotonic()
+                if termen is not None and ramas <= 0:
+                    break
+                # lock nou la fiecare asteptare: o eliberare intarziata (publicatorul a citit lock-ul vechi) poate
+                # trezi cel mult asteptarea curenta, fara mesaj nou, si atunci bucla asteapta din nou
+                asteptator = threading.Lock()
+                asteptator.acquire()
+                self._asteptator = asteptator
+                if self._slot[0] <= secventa_citita:
+                    asteptator.acquire(timeout=ramas)
+            self._asteptator = None
+        return self.ia_daca_nou(secventa_citita)
+
+    def goleste(self):
+        # secventa pana la care cititorul considera totul consumat: mesajele de pana acum se ignora
+        # (folosit de P la trecerea in manual, ca sa nu aplice comenzi automate vechi)
+        return self._slot[0]
+
+
+class InstantaneuStare:
+    # o versiune imutabila a zonei partajate (mod, putere_manual, putere_curenta)
+    # versiune - creste cu 1 la fiecare publicare; T si P compara doar versiunea ca sa vada daca s-a schimbat ceva
+    __slots__ = ("versiune", "mod", "putere_manual", "putere_curenta")
+
+    def __init__(self, versiune, mod, putere_manual, putere_curenta):
+        object.__setattr__(self, "versiune", versiune)
+        object.__setattr__(self, "mod", mod)
+        object.__setattr__(self, "putere_manual", putere_manual)
+        object.__setattr__(self, "putere_curenta", putere_curenta)
+
+    def __setattr__(self, nume, valoare):
+        raise AttributeError("InstantaneuStare nu se modifica; publica o versiune noua prin StarePartajata")
+
+    def __repr__(self):
+        return (f"InstantaneuStare(versiune={self.versiune}, mod={self.mod!r}, "
+                f"putere_manual={self.putere_manual}, putere_curenta={self.putere_curenta})")
+
+
+class StarePartajata:
+    # zona partajata intre task-uri (inlocuieste dict-ul "stare" + lock_stare)
+    # citeste() intoarce instantaneul curent fara niciun mutex: e o singura citire de referinta, deci modul si
+    # puterile vin mereu din aceeasi versiune (nu se poate vedea o scriere facuta pe jumatate).
+    # Scriitorii construiesc un InstantaneuStare nou si il publica printr-o singura atribuire; intre ei se
+    # serializeaza cu un lock, ca doua modificari simultane sa nu se piarda una pe alta. Cititorii nu il iau niciodata.
+    # Regulile de mod sunt aici, ca sa fie aplicate in aceeasi versiune:
+    #   trecerea in manual -> puterea curenta devine puterea manuala
+    #   puterea manuala setata in manual -> se aplica imediat
+    __slots__ = ("curent", "_lock_scriere")
+
+    def __init__(self, mod="automat", putere_manual=30.0, putere_curenta=0.0):
+        self.curent = InstantaneuStare(0, mod, putere_manual, putere_curenta)
+        self._lock_scriere = threading.Lock()
+
+    def citeste(self):
+        return self.curent
+
+    def _publica(self, vechi, mod, putere_manual, putere_curenta):
+        # apelat cu _lock_scriere luat; nu cream o versiune noua daca nu se schimba nimic
+        if mod == vechi.mod and putere_manual == vechi.putere_manual and putere_curenta == vechi.putere_curenta:
+            return vechi
+        nou = InstantaneuStare(vechi.versiune + 1, mod, putere_manual, putere_curenta)
+        self.curent = nou
+        return nou
+
+    def seteaza_mod(self, mod):
+        with self._lock_scriere:
+            vechi = self.curent
+            putere_curenta = vechi.putere_manual if mod == "manual" else vechi.putere_curenta
+            return self._publica(vechi, mod, vechi.putere_manual, putere_curenta)
+
+    def seteaza_putere_manual(self, putere):
+        with self._lock_scriere:
+            vechi = self.curent
+            putere_curenta = putere if vechi.mod == "manual" else vechi.putere_curenta
+            return self._publica(vechi, vechi.mod, putere, putere_curenta)
+
+    def seteaza_putere_curenta(self, putere, mod):
+        # puterea decisa de S pentru modul "mod"; nu se publica daca intre timp modul s-a schimbat
+        with self._lock_scriere:
+            vechi = self.curent
+            if vechi.mod != mod:
+                return vechi
+            return self._publica(vechi, vechi.mod, vechi.putere_manual, putere)
+
+
+class HistogramaTimp:
+    # histograma cu dimensiune fixa pentru durate: galeata i numara valorile din [2^(i-1), 2^i) microsecunde
+    # (galeata 0 = sub 1 us, ultima galeata = tot ce e peste ~16 s). Inregistrarea doar incrementeaza
+    # un element dintr-un array preallocat, nu creste nicio lista.
+    __slots__ = ("galeti",)
+
+    NUMAR_GALETI = 26
+
+    def __init__(self):
+        self.galeti = array("q", bytes(8 * self.NUMAR_GALETI))
+
+    def adauga(self, secunde):
+        microsecunde = int(secunde * 1e6)
+        index = microsecunde.bit_length() if microsecunde > 0 else 0
+        if index >= self.NUMAR_GALETI:
+            index = self.NUMAR_GALETI - 1
+        self.galeti[index] += 1
+
+    def percentila(self, procent):
+        # limita superioara (in secunde) a galetii in care cade percentila ceruta; 0.0 daca histograma e goala
+        total = sum(self.galeti)
+        if total == 0:
+            return 0.0
+        prag = total * procent / 100.0
+        cumulat = 0
+        for index, numar in enumerate(self.galeti):
+            cumulat += numar
+            if cumulat >= prag:
+                return (1 << index) / 1e6
+        return (1 << (self.NUMAR_GALETI - 1)) / 1e6
+
+
+class StatisticiTask:
+    # masuratori de timp pentru un task periodic (T sau P), actualizate la fiecare activare:
+    #   intarziere - cat de tarziu a pornit activarea fata de momentul planificat (release lateness)
+    #   executie - cat a durat pas_t / pas_p
+    #   depasiri - activari care au durat mai mult decat perioada lor (overrun); cu supervizorul de presiune
+    #              perioada lui P se schimba de la o activare la alta, deci se compara cu perioada activarii
+    #   perioada_min / perioada_max - intervalul perioadelor folosite efectiv (perioada = cea nominala)
+    #   termene_ratate - activari terminate dupa momentul urmatoarei activari (deadline = urmatoarea activare)
+    #   perioade_sarite - activari la care s-a renuntat cu politica "sare"
+    __slots__ = ("nume", "perioada", "perioada_min", "perioada_max", "activari", "depasiri", "termene_ratate", "perioade_sarite",
+                 "intarziere", "executie", "intarziere_totala", "executie_totala", "intarziere_max", "executie_max")
+
+    def __init__(self, nume, perioada):
+        self.nume = nume
+        self.perioada = perioada
+        self.perioada_min = float("inf")
+        self.perioada_max = 0.0
+        self.activari = 0
+        self.depasiri = 0
+        self.termene_ratate = 0
+        self.perioade_sarite = 0
+        self.intarziere = HistogramaTimp()
+        self.executie = HistogramaTimp()
+        self.intarziere_totala = 0.0
+        self.executie_totala = 0.0
+        self.intarziere_max = 0.0
+        self.executie_max = 0.0
+
+    def inregistreaza(self, intarziere, executie, termen_ratat, perioada=None):
+        if perioada is None:
+            perioada = self.perioada
+        self.activari += 1
+        if perioada < self.perioada_min:
+            self.perioada_min = perioada
+        if perioada > self.perioada_max:
+            self.perioada_max = perioada
+        self.intarziere.adauga(intarziere)
+        self.executie.adauga(executie)
+        self.intarziere_totala += intarziere
+        self.executie_totala += executie
+        if intarziere > self.intarziere_max:
+            self.intarziere_max = intarziere
+        if executie > self.executie_max:
+            self.executie_max = executie
+        if executie > perioada:
+            self.depasiri += 1
+        if termen_ratat:
+            self.termene_ratate += 1
+
+    def instantaneu(self):
+        # copie a valorilor curente (secunde), sigura de citit din alt thread
+        activari = max(self.activari, 1)
+        return {
+            "nume": self.nume,
+            "perioada": self.perioada,
+            "perioada_min": self.perioada_min if self.activari else self.perioada,
+            "perioada_max": self.perioada_max if self.activari else self.perioada,
+            "activari": self.activari,
+            "depasiri": self.depasiri,
+            "termene_ratate": self.termene_ratate,
+            "perioade_sarite": self.perioade_sarite,
+            "intarziere_medie": self.intarziere_totala / activari,
+            # percentila vine din limita galetii, deci nu poate depasi maximul real
+            "intarziere_p99": min(self.intarziere.percentila(99.0), self.intarziere_max),
+            "intarziere_max": self.intarziere_max,
+            "executie_medie": self.executie_totala / activari,
+            "executie_p99": min(self.executie.percentila(99.0), self.executie_max),
+            "executie_max": self.executie_max,
+            "histograma_intarziere": list(self.intarziere.galeti),
+            "histograma_executie": list(self.executie.galeti),
+        }
+
+
+def creeaza_statistici(configurare):
+    # cate un StatisticiTask pentru fiecare task periodic
+    return {
+        "T": StatisticiTask("T", configurare["perioada_T"]),
+        "P": StatisticiTask("P", configurare["perioada_P"]),
+    }
+
+
+def formateaza_perioada(instantaneu):
+    # perioada fixa ("200 ms") sau intervalul perioadelor folosite ("50-500 ms") cand perioada e adaptiva
+    minim, maxim = instantaneu["perioada_min"] * 1e3, instantaneu["perioada_max"] * 1e3
+    if round(minim) == round(maxim):
+        return f"{minim:.0f} ms"
+    return f"{minim:.0f}-{maxim:.0f} ms"
+
+
+def formateaza_statistici(instantaneu):
+    # un rand de rezumat pentru un task periodic (timpi in milisecunde)
+    return (
+        f"[{instantaneu['nume']}] perioada={formateaza_perioada(instantaneu)} ; activari={instantaneu['activari']} ; "
+        f"intarziere medie/p99/max={instantaneu['intarziere_medie'] * 1e3:.2f}/{instantaneu['intarziere_p99'] * 1e3:.2f}/"
+        f"{instantaneu['intarziere_max'] * 1e3:.2f} ms ; executie medie/p99/max={instantaneu['executie_medie'] * 1e3:.3f}/"
+        f"{instantaneu['executie_p99'] * 1e3:.3f}/{instantaneu['executie_max'] * 1e3:.3f} ms ; depasiri={instantaneu['depasiri']} ; "
+        f"termene ratate={instantaneu['termene_ratate']} ; perioade sarite={instantaneu['perioade_sarite']}"
+    )
+
+
+class ProfilTask:
+    # profilarea pe etape a unui singur task (T, P sau S); scrie in ea doar thread-ul task-ului
+    # armat - pus de esantionator (Profilator.armeaza): urmatoarea activare a task-ului se profileaza; activarile
+    #         nearmate costa doar citirea lui "armat". Cu toate=True fiecare activare se profileaza.
+    # porneste() incepe activarea esantionata; fiecare marcheaza(etapa) atribuie etapei timpul scurs de la marcajul
+    # anterior (un singur perf_counter_ns per etapa: sfarsitul unei etape e inceputul urmatoarei)
+    # activ - True intre porneste() si incheie(), pentru etapele din functii apelate de task (ex. pas_s din task_s)
+    # etape - "pas_s;calcul_confort" -> [numar, timp total ns, maxim ns], creat la primul marcaj al etapei
+    __slots__ = ("nume", "toate", "armat", "activ", "etape", "_ultim")
+
+    def __init__(self, nume, toate=False):
+        self.nume = nume
+        self.toate = toate
+        self.armat = toate
+        self.activ = False
+        self.etape = {}
+        self._ultim = time.perf_counter_ns()
+
+    def porneste(self):
+        self.armat = self.toate
+        self.activ = True
+        self._ultim = time.perf_counter_ns()
+
+    def incheie(self):
+        self.activ = False
+
+    def marcheaza(self, etapa):
+        acum = time.perf_counter_ns()
+        durata = acum - self._ultim
+        self._ultim = acum
+        contor = self.etape.get(etapa)
+        if contor is None:
+            contor = self.etape[etapa] = [0, 0, 0]
+        contor[0] += 1
+        contor[1] += durata
+        if durata > contor[2]:
+            contor[2] = durata
+
+
+class Profilator:
+    # profilarea optionala a buclei de control (--profil): cate un ProfilTask pentru fiecare task, pus in memoria lui
+    # (memorie["profilator"]); fara profilare memorie["profilator"] e None si fiecare etapa costa doar verificarea lui None
+    # Se profileaza activari esantionate: armeaza() (apelat de bucla lui main() la fiecare perioada_esantionare_profil,
+    # fara un thread in plus, sau de simularea pe timp virtual) marcheaza urmatoarea activare a fiecarui task;
+    # toate=True profileaza fiecare activare.
+    # Numerele si totalurile sunt ale activarilor esantionate; ponderile etapelor raman corecte.
+    # Contoarele se citesc din alt thread (SW, la comanda "prof"): o etapa poate fi prinsa cu un esantion in urma.
+    __slots__ = ("toate", "taskuri")
+
+    def __init__(self, toate=False):
+        self.toate = toate
+        self.taskuri = {}
+
+    def task(self, nume):
+        if nume not in self.taskuri:
+            self.taskuri[nume] = ProfilTask(nume, self.toate)
+        return self.taskuri[nume]
+
+    def armeaza(self):
+        for profil in list(self.taskuri.values()):
+            profil.armat = True
+
+    def instantaneu(self):
+        # lista (stiva, numar, total_ns, maxim_ns), ex. ("S;pas_s;calcul_confort", 120, 9600, 210)
+        randuri = []
+        for nume, profil in list(self.taskuri.items()):
+            for etapa, contor in list(profil.etape.items()):
+                numar, total, maxim = contor
+                randuri.append((f"{nume};{etapa}", numar, total, maxim))
+        randuri.sort()
+        return randuri
+
+    def exporta_stive(self, cale):
+        # format "collapsed stack" (flamegraph.pl, speedscope, inferno): o linie "S;pas_s;calcul_confort <valoare>"
+        # valoarea = timpul total al etapei in microsecunde; etapele sub 1 us in total nu apar
+        linii = [f"{stiva} {total // 1000}" for stiva, _, total, _ in self.instantaneu() if total >= 1000]
+        scrie_atomic(cale, "".join(linie + "\n" for linie in linii).encode())
+        return len(linii)
+
+
+def formateaza_profil(profilator):
+    # cate un rand pentru fiecare etapa profilata (timpi in microsecunde), cu ponderea din timpul task-ului
+    randuri = profilator.instantaneu()
+    total_task = collections.Counter()
+    for stiva, _, total, _ in randuri:
+        total_task[stiva.split(";", 1)[0]] += total
+    linii = []
+    for stiva, numar, total, maxim in randuri:
+        pondere = 100.0 * total / max(total_task[stiva.split(";", 1)[0]], 1)
+        linii.append(f"[profil] {stiva:42s} n={numar:7d} ; medie={total / max(numar, 1) / 1e3:8.2f} us ; "
+                     f"max={maxim / 1e3:9.1f} us ; total={total / 1e6:9.2f} ms ({pondere:5.1f}%)")
+    return linii
+
+
+def scrie_profil(profilator, cale):
+    # comanda SW "prof <fisier>": exporta stivele si intoarce mesajul de afisat
+    if profilator is None:
+        return "profilarea nu e pornita (porneste cu --profil, backend threading)"
+    try:
+        etape = profilator.exporta_stive(cale)
+    except OSError as eroare:
+        return f"nu pot scrie profilul: {eroare}"
+    return f"profil scris in {cale} ({etape} etape)"
+
+
+def programeaza_urmatoarea_activare(next_release, perioada, inceput, sfarsit, politica, statistici=None):
+    # calculeaza momentul urmatoarei activari a unui task periodic si inregistreaza timpii activarii curente
+    # next_release - momentul planificat al activarii care tocmai s-a terminat
+    # inceput / sfarsit - cand a pornit / cand s-a terminat efectiv activarea
+    # politica la depasire (activarea s-a terminat dupa momentul urmatoarei activari):
+    #   "recupereaza" - pastram grila next_release += perioada; activarile ratate ruleaza imediat, una dupa alta
+    #   "sare" - renuntam la activarile ratate si ne aliniem la urmatorul moment din grila aflat in viitor
+    urmator = next_release + perioada
+    termen_ratat = sfarsit > urmator
+
+    if statistici is not None:
+        statistici.inregistreaza(inceput - next_release, sfarsit - inceput, termen_ratat, perioada)
+
+    if termen_ratat and politica == "sare":
+        sarite = int((sfarsit - urmator) // perioada) + 1
+        urmator += sarite * perioada
+        if statistici is not None:
+            statistici.perioade_sarite += sarite
+
+    return urmator
+
+
+class CeasReal:
+    # ceasul implicit: time.monotonic() si asteptare reala pe stop_event
+    # task-urile primesc ceasul ca parametru, ca aceeasi logica sa poata rula si pe timp virtual (vezi CeasVirtual)
+    def acum(self):
+        return time.monotonic()
+
+    def asteapta_pana_la(self, moment, stop_event):
+        timp_ramas = moment - time.monotonic()
+        if timp_ramas > 0:
+            stop_event.wait(timeout=timp_ramas)
+
 
+class CeasVirtual:
+    # ceas pentru simularea mai rapida decat timpul real: timpul avanseaza doar cand planificatorul
+    # (simuleaza_virtual) trece la urmatorul eveniment, deci nu se asteapta niciodata cu adevarat
+    def __init__(self, start=0.0):
+        self.timp = start
 
-def asteapta_pana_la_urmatoarea_activare(next_release, stop_event):
+    def acum(self):
+        return self.timp
+
+    def asteapta_pana_la(self, moment, stop_event):
+        if moment > self.timp:
+            self.timp = moment
+
+
+CEAS_REAL = CeasReal()
+
+
+def asteapta_pana_la_urmatoarea_activare(next_release, stop_event, ceas=CEAS_REAL):
     # temporizarea corecta pentru un task periodic
     # thread-ul intra in asteptare si nu consuma CPU inutil
     # se trezeste fie la timeout (cand a venit timpul urmator), fie daca stop_event se seteaza
-    acum = time.monotonic()
-    timp_ramas = next_release - acum
-    if timp_ramas > 0:
-        stop_event.wait(timeout=timp_ramas)
+    ceas.asteapta_pana_la(next_release, stop_event)
 
 
 def calcul_confort(t_medie, t_ref, banda):
@@ -78,27 +533,80 @@ def calcul_confort(t_medie, t_ref, banda):
     return "confortabil"
 
 
-def calcul_putere_mod_automat(t_medie, t_ref):
+def calcul_putere_mod_automat(t_medie, t_ref, k=12.0, putere_baza=30.0):
     # Daca temperatura medie este < decat temperatura de referinta - vrem putere mai mare
     # Daca temperatura medie este > decat temperatura de referinta - vrem putere mai mica
     # k = cat de rapid reactioneaza controlul
-    k = 12.0
-    putere_baza = 30.0  # puterea de baza (cu ea pornim, ajustam dupa)
+    # putere_baza = puterea de baza (cu ea pornim, ajustam dupa)
+    # (in task-uri vin din configurare: "k_automat", "putere_baza_automat")
 
     eroare = t_ref - t_medie  # daca eroare > 0 - e prea rece
     putere = k * eroare + putere_baza
     return putere
 
-def task_sw(q_evenimente_sw, stop_event, lock_consola):
+def comenzi_sw(cu_profil):
+    # lista comenzilor SW pentru prompt si mesajele de eroare; "prof" apare doar cand exista un profilator
+    return "a / m / mpc / p <0..100> / prof <fisier> / q" if cu_profil else "a / m / mpc / p <0..100> / q"
+
+
+def interpreteaza_comanda_sw(linie, cu_profil=True):
+    # transforma o linie de comanda (a / m / mpc / p <0..100> / prof <fisier> / q) in evenimentul trimis catre S
+    # intoarce (eveniment, None) daca linia e valida sau (None, mesaj_eroare) daca nu
+    # cu_profil - daca "prof" apare in lista de comenzi din mesajul de eroare (comanda e recunoscuta oricum)
+    linie = linie.strip()
+
+    # Comanda "a" - automat
+    if linie.lower() == "a":
+        return {"tip": "set_mod", "mod": "automat"}, None
+
+    # Comanda "m" - manual
+    if linie.lower() == "m":
+        return {"tip": "set_mod", "mod": "manual"}, None
+
+    # Comanda "mpc" - automat cu control predictiv
+    if linie.lower() == "mpc":
+        return {"tip": "set_mod", "mod": "mpc"}, None
+
+    # Comanda "prof <fisier>" - exporta profilul pe etape (inainte de "p", care ar prinde si "prof")
+    if linie.lower().startswith("prof"):
+        parti = linie.split(maxsplit=1)
+        if len(parti) != 2 or parti[0].lower() != "prof":
+            return None, "Format corect: prof <fisier>"
+        return {"tip": "profil", "cale": parti[1]}, None
+
+    # Comanda "p ..." - setare putere manuala
+    if linie.lower().startswith("p"):
+        parti = linie.split()
+        if len(parti) != 2:
+            return None, "Format corect: p <0..100>"
+
+        try:
+            putere = float(parti[1])
+        except ValueError:
+            return None, "Valoare invalida. Exemplu: p 80"
+
+        putere = limiteaza(putere, 0.0, 100.0)
+        return {"tip": "set_putere_manual", "putere": putere}, None
+
+    # Comanda "q" - oprire
+    if linie.lower() == "q":
+        return {"tip": "oprire"}, None
+
+    return None, f"Comanda necunoscuta. Foloseste: {comenzi_sw(cu_profil)}"
+
+
+def task_sw(q_evenimente_sw, stop_event, lock_consola, trezire=None, profilator=None):
     # task SW citeste de la tastatura si trimite "evenimente" catre S.
     # interfata cu utilizatorul
     # input() este blocant, dar nu e busy-wait (nu consuma CPU in bucla)
     # blocant adica programul se opreste aici pana se intampla ceva (utilizatorul apasa Enter in cazul nostru)
     # nu tinem lock-ul pe durata input() fiindca altfel S nu mai poate afisa.
     # lock_consola il folosim doar ca sa nu se amestece print-urile intre ele (S si SW pot afisa in acelasi timp si se amesteca liniile)
+    # trezire - daca S e condus de evenimente (vezi task_s), il trezim dupa fiecare comanda
+    # profilator - optional, Profilatorul task-urilor; "prof <fisier>" il exporta direct din SW, fara sa treaca prin S
 
     with lock_consola:
-        print("\n[SW] Introdu comenzi: a / m / p <0..100> / q\n")
+        print(f"\n[SW] Introdu comenzi: {comenzi_sw(profilator is not None)}\n")
 
     while not stop_event.is_set(): #atata timp cat nu e setat semnalul de oprire
         try:
@@ -109,48 +617,116 @@ def task_sw(q_evenimente_sw, stop_event, lock_consola):
         if not linie:
             continue
 
-        # Comanda "a" - automat
-        if linie.lower() == "a":
-            ultimul_mesaj(q_evenimente_sw, {"tip": "set_mod", "mod": "automat"})
+        eveniment, eroare = interpreteaza_comanda_sw(linie, cu_profil=profilator is not None)
+        if eveniment is None:
+            with lock_consola:
+                print(f"[SW] {eroare}")
             continue
 
-        # Comanda "m" - manual
-        if linie.lower() == "m":
-            ultimul_mesaj(q_evenimente_sw, {"tip": "set_mod", "mod": "manual"})
+        if eveniment["tip"] == "profil":
+            mesaj = scrie_profil(profilator, eveniment["cale"])
+            with lock_consola:
+                print(f"[SW] {mesaj}")
             continue
 
-        # Comanda "p ..." - setare putere manuala
-        if linie.lower().startswith("p"):
-            parti = linie.split()
-            if len(parti) != 2:
-                with lock_consola:
-                    print("[SW] Format corect: p <0..100>")
-                continue
+        q_evenimente_sw.put(eveniment)
 
-            try:
-                putere = float(parti[1])
-            except ValueError:
-                with lock_consola:
-                    print("[SW] Valoare invalida. Exemplu: p 80")
-                continue
+        if eveniment["tip"] == "oprire":
+            stop_event.set()
 
-            putere = limiteaza(putere, 0.0, 100.0)
-            ultimul_mesaj(q_evenimente_sw, {"tip": "set_putere_manual", "putere": putere})
-            continue
+        if trezire is not None:
+            trezire.semnaleaza()
 
-        # Comanda "q" - oprire
-        if linie.lower() == "q":
-            ultimul_mesaj(q_evenimente_sw, {"tip": "oprire"})
-            stop_event.set()
+        if stop_event.is_set():
             break
 
-        with lock_consola:
-            print("[SW] Comanda necunoscuta. Foloseste: a / m / p <0..100> / q")
+class CadruSenzori:
+    # un esantion de la T: temperaturile tuturor termocuplurilor intr-un array('d') preallocat si reutilizat,
+    # plus media / minimul / maximul calculate de T cand produce cadrul (S nu mai parcurge lista)
+    # vedere_np - vedere NumPy peste "valori" (aceeasi memorie), doar cand zgomotul se genereaza cu NumPy
+    __slots__ = ("timestamp", "valori", "vedere_np", "medie", "minim", "maxim")
+
+    def __init__(self, numar_TC, cu_numpy=False):
+        self.timestamp = 0.0
+        self.valori = array("d", bytes(8 * numar_TC))
+        self.vedere_np = None
+        if cu_numpy:
+            import numpy as np
+
+            self.vedere_np = np.frombuffer(self.valori, dtype=np.float64)
+        self.medie = float("nan")
+        self.minim = float("nan")
+        self.maxim = float("nan")
+
+
+def numpy_disponibil():
+    # numpy e optional: il folosim doar daca e instalat
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def umple_cadru(cadru, temperatura_baza, rng, generator_np=None):
+    # scrie in cadru temperaturile termocuplurilor (temperatura_baza + zgomot uniform in [-0.15, 0.15])
+    # si calculeaza media / minimul / maximul, fara sa aloce liste noi
+    # cu generator_np, tot zgomotul cadrului se genereaza odata, direct in memoria cadrului
+    if generator_np is not None:
+        vedere = cadru.vedere_np
+        generator_np.random(out=vedere)
+        vedere *= 0.3
+        vedere += temperatura_baza - 0.15
+        cadru.medie = float(vedere.mean())
+        cadru.minim = float(vedere.min())
+        cadru.maxim = float(vedere.max())
+        return
+
+    valori = cadru.valori
+    uniform = rng.uniform
+    # adaugam zgomot la fiecare termocuplu, senzorii reali nu sunt perfect identici
+    # temperatura finala = temperatura_baza + zgomot
+    # alegem un numar aleator intre -0.15 si +0.15, uniform adica toate valorile din interval au sanse egale
+    valoare = temperatura_baza + uniform(-0.15, 0.15)
+    valori[0] = valoare
+    suma = minim = maxim = valoare
+    for i in range(1, len(valori)):
+        valoare = temperatura_baza + uniform(-0.15, 0.15)
+        valori[i] = valoare
+        suma += valoare
+        if valoare < minim:
+            minim = valoare
+        elif valoare > maxim:
+            maxim = valoare
+    cadru.medie = suma / len(valori)
+    cadru.minim = minim
+    cadru.maxim = maxim
+
+
+def memorie_initiala_t(configurare, telemetrie=None):
+    # variabilele pe care task_t le pastreaza de la un ciclu la altul
+    # telemetrie - optional, un InregistratorTelemetrie care primeste fiecare esantion
+    # cadre - doua cadre de senzori folosite alternativ (double buffer): T scrie in unul cat timp S
+    #         il citeste pe cel publicat anterior; un cadru se rescrie abia dupa doua perioade T
+    # peste prag_zgomot_numpy termocupluri (si daca NumPy e instalat) zgomotul se genereaza vectorizat
+    numar_TC = configurare["numar_TC"]
+    cu_numpy = numar_TC >= configurare["prag_zgomot_numpy"] and numpy_disponibil()
+    return {
+        "temperatura_baza": configurare["temperatura_ambient"],
+        "telemetrie": telemetrie,
+        "versiune_stare": -1,  # versiunea starii din care s-a calculat temperatura_tinta
+        "temperatura_tinta": configurare["temperatura_ambient"],
+        "cadre": (CadruSenzori(numar_TC, cu_numpy), CadruSenzori(numar_TC, cu_numpy)),
+        "index_cadru": 0,
+        "cu_numpy": cu_numpy,
+        "generator_np": None,
+        "profilator": None,  # ProfilTask, doar cu profilarea pornita (vezi Profilator)
+    }
+
+
+def pas_t(configurare, memorie, stare, q_temperaturi, ceas=CEAS_REAL, rng=random):
+    # un ciclu din task_t (folosit si de simularea pe timp virtual)
 
-def task_t(configurare, stare, lock_stare, q_temperaturi, stop_event):
-    # task T este un task periodic, la fiecare perioada_T secunde genereaza TC1...TCn si trimite rezultatul catre S prin q_temperaturi
-    # parametrii sunt stabiliti in "configurare" in main(), pentru usurinta si testare
-    
     # ambient - temperatura din cladire daca nu ar exista incalzirea
     # delta_max - cat se poate urca peste ambient la putere de 100%
     # alpha - cat de repede se apropie temperatura de baza de tinta
@@ -161,39 +737,249 @@ def task_t(configurare, stare, lock_stare, q_temperaturi, stop_event):
     delta_max = configurare["delta_max_incalzire"]      # +10C la 100%
     alpha = configurare["viteza_raspuns_temperatura"]   # 0.08 (mai mare = mai rapid)
 
-    temperatura_baza = ambient
+    profilator = memorie["profilator"]
+    if profilator is not None and profilator.armat:
+        profilator.porneste()
+    else:
+        profilator = None  # fara profilare sau activare neesantionata
+
+    # Citim instantaneul curent al starii (fara mutex); temperatura tinta se recalculeaza doar la o versiune noua
+    instantaneu = stare.citeste()
+    if instantaneu.versiune != memorie["versiune_stare"]:
+        memorie["versiune_stare"] = instantaneu.versiune
+        memorie["temperatura_tinta"] = ambient + delta_max * (instantaneu.putere_curenta / 100.0)
+
+    temperatura_baza = memorie["temperatura_baza"]
+    temperatura_tinta = memorie["temperatura_tinta"]
+    temperatura_baza = temperatura_baza + alpha * (temperatura_tinta - temperatura_baza)
+    memorie["temperatura_baza"] = temperatura_baza
+    if profilator is not None:
+        profilator.marcheaza("pas_t;model_temperatura")
+
+    # generatorul NumPy se creeaza o singura data, cu seed luat din rng (rularile cu seed raman reproductibile)
+    if memorie["cu_numpy"] and memorie["generator_np"] is None:
+        import numpy as np
+
+        memorie["generator_np"] = np.random.default_rng(rng.getrandbits(64))
+
+    # mesajul catre S: cadrul de senzori (timp + temperaturi + medie/minim/maxim), scris in bufferul liber
+    memorie["index_cadru"] ^= 1
+    cadru = memorie["cadre"][memorie["index_cadru"]]
+    umple_cadru(cadru, temperatura_baza, rng, memorie["generator_np"])
+    cadru.timestamp = ceas.acum()
+    if profilator is not None:
+        profilator.marcheaza("pas_t;umple_cadru")
+
+    if memorie["telemetrie"] is not None:
+        memorie["telemetrie"].inregistreaza_t(cadru.timestamp, cadru.valori)
+
+    # pastram doar ultimul mesaj (latest only)
+    q_temperaturi.publica(cadru)
+    if profilator is not None:
+        profilator.marcheaza("pas_t;publica")
+
+
+def task_t(configurare, stare, q_temperaturi, stop_event, ceas=CEAS_REAL, rng=random, statistici=None, telemetrie=None, memorie=None):
+    # task T este un task periodic, la fiecare perioada_T secunde genereaza TC1...TCn si trimite rezultatul catre S prin q_temperaturi
+    # parametrii sunt stabiliti in "configurare" in main(), pentru usurinta si testare
+    # calculul unui ciclu este in pas_t
+    # statistici - optional, un StatisticiTask in care se inregistreaza intarzierea si durata fiecarei activari
+    # telemetrie - optional, un InregistratorTelemetrie pentru fiecare esantion
+    # memorie - optional, dict-ul intern al lui T (vezi memorie_initiala_t), ex. pornit din instantaneul de pornire
+
+    if memorie is None:
+        memorie = memorie_initiala_t(configurare, telemetrie)
 
-    next_release = time.monotonic()
+    next_release = ceas.acum()
 
     while not stop_event.is_set():
-        next_release += configurare["perioada_T"]
+        inceput = ceas.acum()
+
+        pas_t(configurare, memorie, stare, q_temperaturi, ceas, rng)
 
-        # Citim puterea curenta sub mutex, ca sa fie consistenta
-        with lock_stare:
-            putere_curenta = stare["putere_curenta"]
+        next_release = programeaza_urmatoarea_activare(next_release, configurare["perioada_T"], inceput, ceas.acum(),
+                                                       configurare["politica_depasire"], statistici)
+
+        # asteptare periodica fara busy-wait
+        asteapta_pana_la_urmatoarea_activare(next_release, stop_event, ceas)
+
+class SupervizorPresiune:
+    # supravegheaza presiunea in P, incremental, la fiecare esantion:
+    #   predictor - viteza presiunii (bar/s), medie exponentiala a derivatei dintre esantioane; presiunea prezisa
+    #               la urmatorul esantion = presiune + viteza * perioada aleasa pana atunci
+    #   valva cu histerezis - treptele 0.6 / 1.0 se deschid la prag (presiune sau predictie) si se inchid doar
+    #               sub prag - histerezis, ca valva sa nu mai comute la fiecare perioada in jurul pragului
+    #   declansare - daca presiunea (sau predictia) trece de presiune_maxima, valva se deschide complet acum si
+    #               urmatoarea activare vine dupa perioada_minima, in locul activarii din grila
+    #   perioada adaptiva - presiunea are voie sa creasca cel mult pas_presiune_maxim intre doua esantioane; cand e
+    #               stabila sau scade perioada creste pana la perioada_maxima (aproape de presiune_maxima, cel mult perioada_nominala)
+    def __init__(self, presiune_referinta, presiune_maxima, histerezis=0.15, perioada_nominala=0.2, perioada_minima=0.05,
+                 perioada_maxima=0.5, pas_presiune_maxim=0.05, alfa=0.5):
+        self.prag_partial = presiune_referinta + 0.3
+        self.presiune_maxima = presiune_maxima
+        self.histerezis = histerezis
+        self.perioada_nominala = perioada_nominala
+        self.perioada_minima = perioada_minima
+        self.perioada_maxima = perioada_maxima
+        self.pas_presiune_maxim = pas_presiune_maxim
+        self.alfa = alfa
+        self.viteza = 0.0
+        self.timp_anterior = None
+        self.presiune_anterioara = 0.0
+        self.valva = 0.0
+        self.perioada = perioada_nominala   # cat asteapta P pana la urmatorul esantion
+        self.declansari = 0                 # de cate ori valva a sarit direct la 1.0
+
+    @classmethod
+    def din_configurare(cls, configurare):
+        return cls(configurare["presiune_referinta"], configurare["presiune_maxima_siguranta"], configurare["histerezis_valva"],
+                   configurare["perioada_P"], configurare["perioada_P_minima"], configurare["perioada_P_maxima"],
+                   configurare["pas_presiune_maxim"])
+
+    def actualizeaza(self, timp, presiune):
+        # un esantion (presiunea inainte de descarcarea prin valva); intoarce deschiderea valvei
+        if self.timp_anterior is not None and timp > self.timp_anterior:
+            derivata = (presiune - self.presiune_anterioara) / (timp - self.timp_anterior)
+            self.viteza += self.alfa * (derivata - self.viteza)
+        self.timp_anterior = timp
+        self.presiune_anterioara = presiune
+
+        # cat asteptam pana la urmatorul esantion; aproape de presiune_maxima (sau cu valva complet deschisa)
+        # verificam macar la perioada_nominala
+        perioada = self.pas_presiune_maxim / self.viteza if self.viteza > 0.0 else self.perioada_maxima
+        if self.valva == 1.0 or presiune > self.presiune_maxima - 2.0 * self.histerezis:
+            perioada = min(perioada, self.perioada_nominala)
+        perioada = limiteaza(perioada, self.perioada_minima, self.perioada_maxima)
+
+        # presiunea prezisa la urmatorul esantion (doar cresterea conteaza pentru deschidere)
+        varf = presiune + max(self.viteza, 0.0) * perioada
+        declansare = False
+        if varf > self.presiune_maxima:
+            declansare = self.valva < 1.0
+            self.valva = 1.0
+        elif self.valva == 1.0 and varf > self.presiune_maxima - self.histerezis:
+            pass
+        elif varf > self.prag_partial or (self.valva > 0.0 and varf > self.prag_partial - self.histerezis):
+            self.valva = 0.6
+        else:
+            self.valva = 0.0
+
+        if declansare:
+            self.declansari += 1
+            perioada = self.perioada_minima
+        self.perioada = perioada
+        return self.valva
+
+
+def memorie_initiala_p(configurare, telemetrie=None):
+    # variabilele pe care task_p le pastreaza de la un ciclu la altul
+    return {
+        "telemetrie": telemetrie,
+        "presiune": configurare["presiune_referinta"],
+        "actiune_valva": 0.0,
+        "mod_anterior": None,  # ca sa detectam schimbare de mod
+        "versiune_stare": -1,  # ultima versiune a starii vazuta de P
+        "secventa_comenzi": 0,  # ultima comanda automata citita din q_comenzi_automat
+        "comanda_aplicata": None,  # comanda automata preluata in ultimul ciclu (None daca nu a venit una noua)
+        "putere_aplicata": 0.0,  # puterea folosita in ultimul ciclu
+        "presiune_varf": configurare["presiune_referinta"],  # presiunea din ultimul ciclu inainte de descarcarea prin valva
+        "supervizor": SupervizorPresiune.din_configurare(configurare) if configurare["supervizor_presiune"] else None,
+        "perioada": configurare["perioada_P"],  # cat asteapta P pana la urmatorul ciclu (variaza doar cu supervizorul)
+        "timp_ultimul_pas": None,
+        "profilator": None,  # ProfilTask, doar cu profilarea pornita (vezi Profilator)
+    }
 
-        temperatura_tinta = ambient + delta_max * (putere_curenta / 100.0)
-        temperatura_baza = temperatura_baza + alpha * (temperatura_tinta - temperatura_baza)
 
-        temperaturi = []
-        for _ in range(configurare["numar_TC"]):
-            zgomot = random.uniform(-0.15, 0.15)
-            # adaugam zgomot la fiecare termocuplu, senzorii reali nu sunt perfect identici
-            # temperatura finala = temperatura_baza + zgomot
-            # alegem un numar aleator intre -0.15 si +0.15, uniform adica toate valorile din interval au sanse egale
-            temperaturi.append(temperatura_baza + zgomot)
+def pas_p(configurare, memorie, stare, q_comenzi_automat, q_presiune, ceas=CEAS_REAL, rng=random):
+    # un ciclu din task_p (folosit si de simularea pe timp virtual)
 
-        # mesajul catre S: dict (dictionar) cu timp + lista temperaturi
-        mesaj = {"timestamp": time.monotonic(), "temperaturi": temperaturi}
+    profilator = memorie["profilator"]
+    if profilator is not None and profilator.armat:
+        profilator.porneste()
+    else:
+        profilator = None  # fara profilare sau activare neesantionata
 
-        # pastram doar ultimul mesaj (latest only)
-        ultimul_mesaj(q_temperaturi, mesaj)
+    # Citim modul si puterea curenta din zona partajata, folosita de mai multe task uri (un instantaneu consistent, fara mutex)
+    instantaneu = stare.citeste()
+    mod_curent = instantaneu.mod
+    putere_curenta = instantaneu.putere_curenta
 
-        # asteptare periodica fara busy-wait
-        asteapta_pana_la_urmatoarea_activare(next_release, stop_event)
+    # Modul se verifica doar cand s-a publicat o versiune noua a starii
+    if instantaneu.versiune != memorie["versiune_stare"]:
+        memorie["versiune_stare"] = instantaneu.versiune
 
-def task_p(configurare, stare, lock_stare, q_comenzi_automat, q_presiune, stop_event):
-    # ruleaza periodic (perioada_P)
+        # Daca tocmai am intrat in manual, aruncam comenzile automate ramase
+        if mod_curent == "manual" and memorie["mod_anterior"] != "manual":
+            memorie["secventa_comenzi"] = q_comenzi_automat.goleste()
+
+        memorie["mod_anterior"] = mod_curent
+
+    # Daca suntem in modul automat (sau mpc), incercam sa luam ultima comanda automata de la S
+    # ia_daca_nou() = neblocant: intoarce doar o comanda mai noua decat ultima citita, altfel None
+    # Pentru P, vrem sa nu ne blocam mult; P trebuie sa ruleze periodic.
+    ultima_comanda = None
+    if mod_curent in ("automat", "mpc"):
+        memorie["secventa_comenzi"], ultima_comanda = q_comenzi_automat.ia_daca_nou(memorie["secventa_comenzi"])
+
+        if ultima_comanda is not None:
+            # comanda automata e un dict: {"timestamp":..., "putere":...}
+            putere_curenta = ultima_comanda["putere"]
+
+    memorie["comanda_aplicata"] = ultima_comanda
+    memorie["putere_aplicata"] = putere_curenta
+    if profilator is not None:
+        profilator.marcheaza("pas_p;ultimul_mesaj")
+
+    presiune = memorie["presiune"]
+
+    # Modelul presiunii e dat pe o perioada_P; cu supervizorul perioada variaza, deci scalam cu timpul scurs
+    supervizor = memorie["supervizor"]
+    factor = 1.0
+    if supervizor is not None:
+        acum = ceas.acum()
+        if memorie["timp_ultimul_pas"] is not None:
+            factor = max(0.0, acum - memorie["timp_ultimul_pas"]) / configurare["perioada_P"]
+        memorie["timp_ultimul_pas"] = acum
+
+    # Crestere presiune daca puterea e mare + diminuare spre referinta
+    crestere = configurare["crestere_presiune"] * (putere_curenta / 100.0) * factor
+    diminuare = configurare["revenire_presiune"] * (configurare["presiune_referinta"] - presiune) * factor
+    presiune = presiune + crestere + diminuare
+    memorie["presiune_varf"] = presiune
+
+    # Decidem actiunea valvei in functie de presiune
+    if supervizor is not None:
+        # predictor + histerezis; supervizorul alege si cat asteptam pana la urmatorul ciclu
+        actiune_valva = supervizor.actualizeaza(acum, presiune)
+        memorie["perioada"] = supervizor.perioada
+    elif presiune > configurare["presiune_maxima_siguranta"]:
+        actiune_valva = 1.0
+    elif presiune > configurare["presiune_referinta"] + 0.3:
+        actiune_valva = 0.6
+    else:
+        actiune_valva = 0.0
+
+    presiune -= configurare["descarcare_valva"] * actiune_valva * factor
+    presiune += rng.uniform(-0.01, 0.01) * factor
+    # adaugam un zgomot la fiecare presiune
+
+    memorie["presiune"] = presiune
+    memorie["actiune_valva"] = actiune_valva
+    if profilator is not None:
+        profilator.marcheaza("pas_p;actualizare_presiune")
+
+    timestamp = ceas.acum()
+    if memorie["telemetrie"] is not None:
+        memorie["telemetrie"].inregistreaza_p(timestamp, presiune, actiune_valva)
+
+    # Trimitem presiunea catre S pentru afisare
+    q_presiune.publica({"timestamp": timestamp, "presiune": presiune, "valva": actiune_valva})
+    if profilator is not None:
+        profilator.marcheaza("pas_p;publica")
+
+
+def task_p(configurare, stare, q_comenzi_automat, q_presiune, stop_event, ceas=CEAS_REAL, rng=random, statistici=None, telemetrie=None, memorie=None):
+    # ruleaza periodic (perioada_P; cu supervizorul de presiune perioada e aleasa de SupervizorPresiune la fiecare ciclu)
     # citeste presiunea si decide actiunea asupra valvei
     # trebuie sa foloseasca puterea corecta in functie de mod:
     #     in modul automat, puterea vine de la S prin q_comenzi_automat
@@ -202,79 +988,256 @@ def task_p(configurare, stare, lock_stare, q_comenzi_automat, q_presiune, stop_e
     # previne o secventa gresita de funcionare:
     # daca SW trece pe manual, in coada pot ramane comenzi automate vechi, P trebuie sa ignore acele comenzi vechi: 
     # cand detectam mod="manual", golim coada q_comenzi_automat
+    # calculul unui ciclu este in pas_p
+    # statistici - optional, un StatisticiTask in care se inregistreaza intarzierea si durata fiecarei activari
+    # telemetrie - optional, un InregistratorTelemetrie pentru fiecare esantion
+    # memorie - optional, dict-ul intern al lui P (vezi memorie_initiala_p), ex. pornit din instantaneul de pornire
 
-    presiune = configurare["presiune_referinta"]
-    actiune_valva = 0.0
+    if memorie is None:
+        memorie = memorie_initiala_p(configurare, telemetrie)
 
-    mod_anterioar = None  # ca sa detectam schimbare de mod
-
-    next_release = time.monotonic()
+    next_release = ceas.acum()
 
     while not stop_event.is_set():
-        next_release += configurare["perioada_P"]
+        inceput = ceas.acum()
 
-        # Citim modul si puterea curenta din zona partajata, folosita de mai multe task uri (sub mutex)
-        with lock_stare:
-            mod_curent = stare["mod"]
-            putere_curenta = stare["putere_curenta"]
+        pas_p(configurare, memorie, stare, q_comenzi_automat, q_presiune, ceas, rng)
 
-        # Daca tocmai am intrat in manual, aruncam comenzile automate ramase
-        if mod_curent == "manual" and mod_anterioar != "manual":
-            goleste_coada(q_comenzi_automat)
+        next_release = programeaza_urmatoarea_activare(next_release, memorie["perioada"], inceput, ceas.acum(),
+                                                       configurare["politica_depasire"], statistici)
 
-        mod_anterioar = mod_curent
+        # asteptare periodica fara busy-wait
+        asteapta_pana_la_urmatoarea_activare(next_release, stop_event, ceas)
 
-        # Daca suntem in modul automat, incercam sa luam ultima comanda automata de la S
-        # get_nowait() = neblocant: daca nu exista mesaj, arunca exceptie imediat, nu asteapta deloc
-        # get(timeout=...) = blocant: asteapta pana la timeout sa apara un mesaj
-        # Pentru P, vrem sa nu ne blocam mult; P trebuie sa ruleze periodic.
-        if mod_curent == "automat":
-            ultima_comanda = None
-            try:
-                # luam ce e disponibil acum, fara asteptare
-                ultima_comanda = q_comenzi_automat.get_nowait()
-                # folosim get_nowait() ca sa nu blocam P daca nu e nimic in coada
-                # daca sunt mai multe, o pastram pe ultima (cea mai noua)
-                while True:
-                    try:
-                        ultima_comanda = q_comenzi_automat.get_nowait()
-                    except queue.Empty:
-                        break
-            except queue.Empty:
-                ultima_comanda = None
-
-            if ultima_comanda is not None:
-                # comanda automata e un dict: {"timestamp":..., "putere":...}
-                putere_curenta = ultima_comanda["putere"]
-
-        # Crestere presiune daca puterea e mare + diminuare spre referinta
-        crestere = 0.08* (putere_curenta / 100.0)
-        diminuare = 0.01 * (configurare["presiune_referinta"] - presiune)
-        presiune = presiune + crestere + diminuare
-
-        # Decidem actiunea valvei in functie de presiune
-        if presiune > configurare["presiune_maxima_siguranta"]:
-            actiune_valva = 1.0
-        elif presiune > configurare["presiune_referinta"] + 0.3:
-            actiune_valva = 0.6
+def proceseaza_evenimente_sw(q_evenimente_sw, stare, stop_event):
+    # procam toate evenimentele SW disponibile acum (neblocant), in ordinea in care au venit
+    # intoarce cate evenimente au fost procesate
+    # un eveniment poate avea "confirmare" - functie apelata dupa ce a fost aplicat (serverul de control)
+    procesate = 0
+    while True:
+        try:
+            ev = q_evenimente_sw.get_nowait()
+        except queue.Empty:
+            break
+
+        procesate += 1
+
+        tip = ev.get("tip")
+        confirmare = ev.get("confirmare")
+
+        if tip == "oprire":
+            stop_event.set()
+            if confirmare is not None:
+                confirmare()
+            break
+
+        if tip == "set_mod":
+            mod_nou = ev.get("mod")
+            if mod_nou in ("manual", "automat", "mpc"):
+                # Daca am trecut in manual, punerea puterii curente devine exclusiva SW (vezi StarePartajata)
+                stare.seteaza_mod(mod_nou)
+
+        if tip == "set_putere_manual":
+            putere = ev.get("putere")
+            if putere is not None:
+                putere = limiteaza(float(putere), 0.0, 100.0)
+                # daca suntem in manual, puterea se aplica imediat
+                stare.seteaza_putere_manual(putere)
+
+        if confirmare is not None:
+            confirmare()
+
+    return procesate
+
+
+def memorie_initiala_s(ceas=CEAS_REAL, telemetrie=None):
+    # variabilele pe care task_s le pastreaza de la o iteratie la alta
+    return {
+        "telemetrie": telemetrie,
+        "fuziune": None,  # FuziuneSenzori, creata la primul cadru (daca fuziune_senzori e activa)
+        "mpc": None,  # ControlerMPC, creat la prima decizie in modul mpc
+        "putere_mpc": 0.0,  # ultima putere decisa de ControlerMPC
+        "t_medie": float("nan"),  # temperatura calculata din ultimul cadru
+        "ultima_temperatura": None,
+        "ultima_presiune": None,
+        "secventa_temperatura": 0,  # secventele ultimelor mesaje citite din cutiile postale
+        "secventa_presiune": 0,
+        "next_afisare": ceas.acum(),
+        "treziri": 0,  # de cate ori s-a trezit bucla lui task_s (pentru masurarea consumului)
+        "profilator": None,  # ProfilTask, doar cu profilarea pornita (vezi Profilator); task_s porneste trezirile esantionate
+    }
+
+
+def pas_s(configurare, memorie, stare, q_temperaturi, q_comenzi_automat, q_presiune, ceas=CEAS_REAL, timeout_temperatura=0.0, doar_la_schimbare=False):
+    # o iteratie din task_s, fara evenimentele SW (vezi proceseaza_evenimente_sw)
+    # intoarce un dict cu valorile de afisat cand a venit momentul afisarii, altfel None
+    # doar_la_schimbare - nu recalculam daca nu a venit nicio temperatura/presiune noua si nu e momentul afisarii
+    #                     (apelantul forteaza recalcularea cu False dupa un eveniment SW)
+
+    # citim temperatura cea mai recenta de la T 
+    # asteapta_mai_nou(..., timeout=0.1) inseamna: "astept maxim 0.1 sec sa apara un mesaj nou; daca nu apare, merg mai departe"
+    # asta reduce consumul CPU; cutia pastreaza oricum doar ultimul mesaj, nu mai trebuie golita
+    if timeout_temperatura > 0:
+        secventa, msg = q_temperaturi.asteapta_mai_nou(memorie["secventa_temperatura"], timeout_temperatura)
+    else:
+        secventa, msg = q_temperaturi.ia_daca_nou(memorie["secventa_temperatura"])
+    memorie["secventa_temperatura"] = secventa
+    nou_temperatura = msg is not None
+    if nou_temperatura:
+        memorie["ultima_temperatura"] = msg
+
+    # citim presiunea cea mai recenta de la P
+    secventa, msg = q_presiune.ia_daca_nou(memorie["secventa_presiune"])
+    memorie["secventa_presiune"] = secventa
+    if msg is not None:
+        memorie["ultima_presiune"] = msg
+
+    # (cu timeout_temperatura > 0 etapa include si asteptarea temperaturii)
+    # (porneste() / incheie() sunt apelate de task_s, deci pas_s doar urmeaza decizia de esantionare)
+    profilator = memorie["profilator"]
+    if profilator is not None and not profilator.activ:
+        profilator = None
+    if profilator is not None:
+        profilator.marcheaza("pas_s;ultimul_mesaj")
+
+    # presiunea intra doar in afisare, deci doar o temperatura noua schimba decizia
+    if doar_la_schimbare and not nou_temperatura and ceas.acum() < memorie["next_afisare"]:
+        return None
+
+    ultima_temperatura = memorie["ultima_temperatura"]
+    ultima_presiune = memorie["ultima_presiune"]
+
+    # calulam temperatura medie si confortul
+    if nou_temperatura:
+        if configurare["fuziune_senzori"]:
+            # fuziunea pastreaza istoricul fiecarui senzor, deci vede fiecare cadru o singura data
+            if memorie["fuziune"] is None:
+                memorie["fuziune"] = FuziuneSenzori.din_configurare(configurare)
+            memorie["t_medie"] = memorie["fuziune"].actualizeaza(ultima_temperatura.valori)
         else:
-            actiune_valva = 0.0
+            # media e calculata de T cand produce cadrul (CadruSenzori)
+            memorie["t_medie"] = ultima_temperatura.medie
+        if profilator is not None:
+            profilator.marcheaza("pas_s;temperatura_medie")
+
+    if ultima_temperatura is not None:
+        t_medie = memorie["t_medie"]
+        confort = calcul_confort(t_medie, configurare["temperatura_referinta"], configurare["banda_confort"])
+    else:
+        t_medie = float("nan")
+        confort = "necunoscut"
+    if profilator is not None:
+        profilator.marcheaza("pas_s;calcul_confort")
+
+    # stabilim puterea curenta in functie de modul de functionare (din acelasi instantaneu al starii)
+    instantaneu = stare.citeste()
+    mod_curent = instantaneu.mod
+    putere_manual = instantaneu.putere_manual
+
+    if mod_curent in ("automat", "mpc") and ultima_temperatura is not None:
+        # mod automat: S calculeaza puterea (lege proportionala sau, in modul mpc, control predictiv)
+        if mod_curent == "mpc":
+            # optimizarea ruleaza doar la o temperatura noua; intre cadre pastram ultima decizie
+            if memorie["mpc"] is None:
+                memorie["mpc"] = ControlerMPC.din_configurare(configurare)
+            if nou_temperatura or memorie["mpc"].solutie is None:
+                presiune = ultima_presiune["presiune"] if ultima_presiune is not None else float("nan")
+                memorie["putere_mpc"] = memorie["mpc"].decide(t_medie, presiune, instantaneu.putere_curenta)
+            putere_calc = memorie["putere_mpc"]
+            if profilator is not None:
+                profilator.marcheaza("pas_s;mpc")
+        else:
+            putere_calc = calcul_putere_mod_automat(t_medie, configurare["temperatura_referinta"],
+                                                    configurare["k_automat"], configurare["putere_baza_automat"])
+            if profilator is not None:
+                profilator.marcheaza("pas_s;calcul_putere_mod_automat")
+        putere_calc = limiteaza(putere_calc, 0.0, 100.0)
+        putere_decisa = putere_calc
+
+        # Publicam o versiune noua a starii (doar daca modul e tot cel pentru care am decis)
+        stare.seteaza_putere_curenta(putere_calc, mod_curent)
+        if profilator is not None:
+            profilator.marcheaza("pas_s;scriere_stare")
+
+        # Trimitem comanda automata catre P 
+        q_comenzi_automat.publica({"timestamp": ceas.acum(), "putere": putere_calc})
+        if profilator is not None:
+            profilator.marcheaza("pas_s;comanda_p")
+
+    else:
+        # mod manual: S nu calculeaza puterea si nu trimite comenzi catre P.
+        # puterea curenta este stabilita de SW (prin putere_manual).
+        stare.seteaza_putere_curenta(putere_manual, mod_curent)
+        putere_decisa = putere_manual
+        if profilator is not None:
+            profilator.marcheaza("pas_s;scriere_stare")
+
+        # nu trimitem nimic pe q_comenzi_automat in manual
+
+    if memorie["telemetrie"] is not None:
+        memorie["telemetrie"].inregistreaza_s(ceas.acum(), mod_curent, t_medie, putere_decisa, confort)
+        if profilator is not None:
+            profilator.marcheaza("pas_s;telemetrie")
+
+    # Afisam starea o data la perioada_afisare_S secunde
+    acum = ceas.acum()
+    if acum < memorie["next_afisare"]:
+        return None
+    memorie["next_afisare"] = acum + configurare["perioada_afisare_S"]
+
+    instantaneu = stare.citeste()
+    mod_afis = instantaneu.mod
+    putere_afis = instantaneu.putere_curenta
+
+    pres = ultima_presiune["presiune"] if ultima_presiune is not None else float("nan")
+
+    valva = ultima_presiune.get("valva", float("nan")) if ultima_presiune is not None else float("nan")
+
+    # termocuplurile ignorate de fuziune in ultimul cadru
+    suspecti = []
+    if memorie["fuziune"] is not None:
+        suspecti = [(r["senzor"], r["sanatate"]) for r in memorie["fuziune"].raport_sanatate() if r["sanatate"] != "ok"]
+
+    if profilator is not None:
+        profilator.marcheaza("pas_s;pregatire_afisare")
+    return {
+        "timp": acum,
+        "mod": mod_afis,
+        "t_medie": t_medie,
+        "confort": confort,
+        "presiune": pres,
+        "putere": putere_afis,
+        "valva": valva,
+        "senzori_suspecti": suspecti,
+    }
 
-        presiune -= 0.08 * actiune_valva
-        presiune += random.uniform(-0.01, 0.01)
-        # adaugam un zgomot la fiecare presiune
 
-        # Trimitem presiunea catre S pentru afisare
-        ultimul_mesaj(
-    q_presiune,
-    {"timestamp": time.monotonic(), "presiune": presiune, "valva": actiune_valva}
-)
+def formateaza_afisare(afisare):
+    # linia afisata de S o data la perioada_afisare_S
+    linie = (
+        f"[S] mod={afisare['mod']:7s} ; T_medie={afisare['t_medie']:5.2f} C ; confort={afisare['confort']:12s} ; "
+        f"presiune={afisare['presiune']:4.2f} ; putere={afisare['putere']:5.1f}% ; valva={afisare['valva']:3.1f}"
+    )
+    if afisare.get("senzori_suspecti"):
+        linie += " ; ignorati: " + ", ".join(f"{senzor}({sanatate})" for senzor, sanatate in afisare["senzori_suspecti"])
+    return linie
 
 
-        # asteptare periodica fara busy-wait
-        asteapta_pana_la_urmatoarea_activare(next_release, stop_event)
+def afiseaza_s(afisare, lock_consola, profilator=None):
+    # print-ul lui S; linia se formateaza inainte de lock, ca lock_consola sa fie tinut doar cat dureaza print-ul
+    # cu profilare, asteptarea lock-ului (cand SW afiseaza) si print-ul sunt etape separate
+    linie = formateaza_afisare(afisare)
+    if profilator is not None:
+        profilator.marcheaza("afisare;formateaza")
+    with lock_consola:
+        if profilator is not None:
+            profilator.marcheaza("afisare;lock_consola")
+        print(linie)
+    if profilator is not None:
+        profilator.marcheaza("afisare;print")
+
 
-def task_s(configurare, stare, lock_stare, q_evenimente_sw, q_temperaturi, q_comenzi_automat, q_presiune, stop_event, lock_consola):
+def task_s(configurare, stare, q_evenimente_sw, q_temperaturi, q_comenzi_automat, q_presiune, stop_event, lock_consola, ceas=CEAS_REAL, trezire=None, memorie=None, telemetrie=None):
     # proceseaza evenimentele SW (manual/automat, setare putere manuala)
     # citeste temperatura cea mai recenta de la T
     # citeste presiunea cea mai recenta de la P
@@ -284,168 +1247,973 @@ def task_s(configurare, stare, lock_stare, q_evenimente_sw, q_temperaturi, q_com
     # previne o secventa gresita de functionare:
     # daca SW e pe manual, S nu are voie sa calculeze/trimita comenzi de putere. In modul manual, S nu pune nimic in q_comenzi_automat
     
-    # previne race condition: orice update la stare["mod"], stare["putere_*"] se face sub lock_stare
-
-    ultima_temperatura = None
-    ultima_presiune = None
+    # previne race condition: starea se citeste ca instantaneu consistent si se modifica doar prin StarePartajata
+
+    # trezire - daca e data, S e condus de evenimente: doarme pe o singura asteptare comuna pentru
+    #           temperatura, comenzi SW si oprire (q_temperaturi, SW si opreste() o semnaleaza),
+    #           pana la urmatoarea afisare. Presiunea se citeste la fiecare trezire, dar nu trezeste S:
+    #           intra doar in afisare, iar P publica de 2.5 ori mai des decat T.
+    #           Fara trezire, S verifica intrarile la fiecare 20 ms (polling).
+    # memorie - optional, dict-ul intern al lui S (vezi memorie_initiala_s), ca sa poata fi inspectat din afara
+    # telemetrie - optional, un InregistratorTelemetrie pentru fiecare decizie
+    # profilarea (memorie["profilator"]) acopera o trezire esantionata: golirea cozii SW, etapele din pas_s, afisarea
+
+    if memorie is None:
+        memorie = memorie_initiala_s(ceas, telemetrie)
+    profilator = memorie["profilator"]
+
+    if trezire is None:
+        while not stop_event.is_set():
+            memorie["treziri"] += 1
+            esantion = profilator is not None and profilator.armat
+            if esantion:
+                profilator.porneste()
+            proceseaza_evenimente_sw(q_evenimente_sw, stare, stop_event)
+            if esantion:
+                profilator.marcheaza("proceseaza_evenimente_sw")
+
+            if stop_event.is_set():
+                break
 
-    next_afisare = time.monotonic()
+            afisare = pas_s(configurare, memorie, stare, q_temperaturi, q_comenzi_automat, q_presiune, ceas, timeout_temperatura=0.1)
 
-    while not stop_event.is_set():
-        # procam toate evenimentele SW disponibile acum (neblocant)
-        while True:
-            try:
-                ev = q_evenimente_sw.get_nowait()
-            except queue.Empty:
-                break
+            if afisare is not None:
+                afiseaza_s(afisare, lock_consola, profilator if esantion else None)
+            if esantion:
+                profilator.incheie()
 
-            tip = ev.get("tip")
+            # eliberam CPU-ul fara busy-wait
+            stop_event.wait(timeout=0.02)
+        return
 
-            if tip == "oprire":
-                stop_event.set()
-                break
+    generatie = trezire.generatie
+    while not stop_event.is_set():
+        memorie["treziri"] += 1
+        # orice semnal venit de aici incolo face ca urmatoarea asteptare sa se intoarca imediat
+        generatie = trezire.generatie
 
-            if tip == "set_mod":
-                mod_nou = ev.get("mod")
-                if mod_nou in ("manual", "automat"):
-                    with lock_stare:
-                        stare["mod"] = mod_nou
-
-                        # Daca am trecut in manual, punerea puterii curente devine exclusiva SW
-                        if mod_nou == "manual":
-                            stare["putere_curenta"] = stare["putere_manual"]
-
-            if tip == "set_putere_manual":
-                putere = ev.get("putere")
-                if putere is not None:
-                    putere = limiteaza(float(putere), 0.0, 100.0)
-                    with lock_stare:
-                        stare["putere_manual"] = putere
-                        # daca suntem in manual, aplicam imediat puterea
-                        if stare["mod"] == "manual":
-                            stare["putere_curenta"] = stare["putere_manual"]
+        esantion = profilator is not None and profilator.armat
+        if esantion:
+            profilator.porneste()
+        comenzi_sw = proceseaza_evenimente_sw(q_evenimente_sw, stare, stop_event)
+        if esantion:
+            profilator.marcheaza("proceseaza_evenimente_sw")
 
         if stop_event.is_set():
             break
 
-        # citim temperatura cea mai recenta de la T 
-        # q_temperaturi.get(timeout=0.1) inseamna: "astept maxim 0.1 sec sa apara un mesaj; daca nu apare, merg mai departe"
-        # asta reduce consumul CPU 
-        try:
-            msg = q_temperaturi.get(timeout=0.1)
-            ultima_temperatura = msg
-
-            # Daca au venit mai multe, pastram ultimul (cel mai recent)
-            while True:
-                try:
-                    ultima_temperatura = q_temperaturi.get_nowait()
-                except queue.Empty:
-                    break
-        except queue.Empty:
-            pass
-
-        # citim presiunea cea mai recenta de la P
-        try:
-            ultima_presiune = q_presiune.get_nowait()
-            while True:
-                try:
-                    ultima_presiune = q_presiune.get_nowait()
-                except queue.Empty:
-                    break
-        except queue.Empty:
-            pass
-
-        # calulam temperatura medie si confortul
-        if ultima_temperatura is not None:
-            temperaturi = ultima_temperatura["temperaturi"]
-            t_medie = sum(temperaturi) / len(temperaturi)
-            confort = calcul_confort(t_medie, configurare["temperatura_referinta"], configurare["banda_confort"])
+        # dupa o comanda SW recalculam oricum (modul sau puterea manuala s-au schimbat)
+        afisare = pas_s(configurare, memorie, stare, q_temperaturi, q_comenzi_automat, q_presiune, ceas, doar_la_schimbare=not comenzi_sw)
+
+        if afisare is not None:
+            afiseaza_s(afisare, lock_consola, profilator if esantion else None)
+        if esantion:
+            profilator.incheie()
+
+        # dormim pana la un semnal nou sau pana la urmatoarea afisare
+        trezire.asteapta(generatie, max(0.0, memorie["next_afisare"] - ceas.acum()))
+
+
+def opreste(stop_event, trezire=None):
+    # seteaza semnalul de oprire si trezeste S daca asteapta evenimente
+    stop_event.set()
+    if trezire is not None:
+        trezire.semnaleaza()
+
+
+# ---------------------------------------------------------------------------
+# Fuziunea senzorilor (intre T si S)
+# ---------------------------------------------------------------------------
+# Media simpla a termocuplurilor e trasa dupa ea de un singur senzor defect (blocat, cu varfuri, deconectat).
+# Pentru fiecare termocuplu pastram o fereastra glisanta cu abaterea lui fata de consensul cadrului
+# (mediana tuturor termocuplurilor din acelasi cadru), cu statistici incrementale:
+#   medie / varianta Welford (adaugare + scoatere din fereastra, O(1))
+#   mediana glisanta cu doua heap-uri si stergere lenesa (O(log w))
+# Abaterea fata de consens (nu valoarea bruta) face detectia independenta de cresterea/scaderea temperaturii:
+# cand camera se incalzeste, toti senzorii urca impreuna si abaterile raman mici.
+
+def mediana(valori):
+    # ca statistics.median (aceeasi formula), fara importul modulului statistics (fractions, decimal) la pornire
+    ordonate = sorted(valori)
+    mijloc = len(ordonate) // 2
+    if len(ordonate) % 2:
+        return ordonate[mijloc]
+    return (ordonate[mijloc - 1] + ordonate[mijloc]) / 2
+
+
+class MedianaGlisanta:
+    # mediana unei ferestre glisante: "mici" = jumatatea de jos (max-heap, valori negate), "mari" = jumatatea de sus
+    # valorile scoase din fereastra se sterg lenes (doar cand ajung in varful unui heap); cand cele ingropate
+    # ajung sa fie mai multe decat cele valide, heap-urile se reconstruiesc, ca memoria sa ramana O(fereastra)
+    __slots__ = ("mici", "mari", "numar_mici", "numar_mari", "de_sters")
+
+    def __init__(self):
+        self.mici = []
+        self.mari = []
+        self.numar_mici = 0
+        self.numar_mari = 0
+        self.de_sters = {}
+
+    def adauga(self, valoare):
+        if not self.mici or valoare <= -self.mici[0]:
+            heapq.heappush(self.mici, -valoare)
+            self.numar_mici += 1
+        else:
+            heapq.heappush(self.mari, valoare)
+            self.numar_mari += 1
+        self._echilibreaza()
+
+    def scoate(self, valoare):
+        self.de_sters[valoare] = self.de_sters.get(valoare, 0) + 1
+        if valoare <= -self.mici[0]:
+            self.numar_mici -= 1
+            if valoare == -self.mici[0]:
+                self._curata(self.mici, -1.0)
         else:
-            t_medie = float("nan")
-            confort = "necunoscut"
+            self.numar_mari -= 1
+            if self.mari and valoare == self.mari[0]:
+                self._curata(self.mari, 1.0)
+        self._echilibreaza()
+        if len(self.mici) + len(self.mari) > 2 * (self.numar_mici + self.numar_mari) + 16:
+            self._compacteaza()
+
+    def mediana(self):
+        if self.numar_mici == 0:
+            return float("nan")
+        if self.numar_mici > self.numar_mari:
+            return -self.mici[0]
+        return (-self.mici[0] + self.mari[0]) / 2.0
+
+    def _curata(self, heap, semn):
+        # scoate din varful heap-ului valorile marcate pentru stergere
+        while heap:
+            valoare = semn * heap[0]
+            numar = self.de_sters.get(valoare, 0)
+            if numar == 0:
+                break
+            if numar == 1:
+                del self.de_sters[valoare]
+            else:
+                self.de_sters[valoare] = numar - 1
+            heapq.heappop(heap)
+
+    def _echilibreaza(self):
+        # "mici" are fie acelasi numar de valori valide ca "mari", fie una in plus
+        if self.numar_mici > self.numar_mari + 1:
+            heapq.heappush(self.mari, -heapq.heappop(self.mici))
+            self.numar_mici -= 1
+            self.numar_mari += 1
+            self._curata(self.mici, -1.0)
+        elif self.numar_mici < self.numar_mari:
+            heapq.heappush(self.mici, -heapq.heappop(self.mari))
+            self.numar_mari -= 1
+            self.numar_mici += 1
+            self._curata(self.mari, 1.0)
+
+    def _compacteaza(self):
+        # reconstruieste cele doua jumatati doar din valorile inca in fereastra
+        valori = sorted([-v for v in self.mici] + self.mari)
+        pastrate = []
+        for valoare in valori:
+            numar = self.de_sters.get(valoare, 0)
+            if numar:
+                self.de_sters[valoare] = numar - 1
+            else:
+                pastrate.append(valoare)
+        self.de_sters = {}
+        self.numar_mici = (len(pastrate) + 1) // 2
+        self.numar_mari = len(pastrate) - self.numar_mici
+        self.mici = [-v for v in reversed(pastrate[:self.numar_mici])]
+        self.mari = pastrate[self.numar_mici:]
+
+
+class WelfordGlisant:
+    # medie si varianta pe o fereastra glisanta, actualizate incremental (Welford, cu scoatere)
+    __slots__ = ("numar", "medie", "m2")
+
+    def __init__(self):
+        self.numar = 0
+        self.medie = 0.0
+        self.m2 = 0.0
+
+    def adauga(self, valoare):
+        self.numar += 1
+        delta = valoare - self.medie
+        self.medie += delta / self.numar
+        self.m2 += delta * (valoare - self.medie)
+
+    def scoate(self, valoare):
+        self.numar -= 1
+        if self.numar == 0:
+            self.medie = 0.0
+            self.m2 = 0.0
+            return
+        delta = valoare - self.medie
+        self.medie -= delta / self.numar
+        # cu o singura valoare ramasa m2 e exact 0; nu pastram erorile de rotunjire acumulate
+        self.m2 = self.m2 - delta * (valoare - self.medie) if self.numar > 1 else 0.0
+
+    def varianta(self):
+        # varianta esantionului; m2 poate deveni usor negativ din erori de rotunjire
+        return max(self.m2, 0.0) / (self.numar - 1) if self.numar > 1 else 0.0
+
+
+# starile de sanatate raportate pentru fiecare termocuplu
+SANATATE_SENZORI = ("ok", "varf", "deviat", "blocat", "deconectat")
+
+
+class StatisticiSenzor:
+    # fereastra glisanta a unui termocuplu: valorile brute (pentru "blocat") si abaterile fata de consens
+    __slots__ = ("brute", "abateri", "istoric_brute", "istoric_abateri", "mediana_abateri", "sanatate", "respinse")
+
+    def __init__(self):
+        self.brute = WelfordGlisant()
+        self.abateri = WelfordGlisant()
+        self.istoric_brute = collections.deque()
+        self.istoric_abateri = collections.deque()
+        self.mediana_abateri = MedianaGlisanta()
+        self.sanatate = "ok"
+        self.respinse = 0
+
+    def adauga(self, valoare, abatere, fereastra):
+        if len(self.istoric_brute) == fereastra:
+            vechi = self.istoric_brute.popleft()
+            self.brute.scoate(vechi)
+            vechi = self.istoric_abateri.popleft()
+            self.abateri.scoate(vechi)
+            self.mediana_abateri.scoate(vechi)
+        self.istoric_brute.append(valoare)
+        self.brute.adauga(valoare)
+        self.istoric_abateri.append(abatere)
+        self.abateri.adauga(abatere)
+        self.mediana_abateri.adauga(abatere)
+
+
+class FuziuneSenzori:
+    # combina temperaturile unui cadru intr-o singura valoare, ignorand senzorii suspecti:
+    #   deconectat - valoare NaN sau in afara intervalului fizic [temperatura_min_senzor, temperatura_max_senzor]
+    #   blocat     - fereastra plina si valoarea bruta nu s-a mai schimbat (varianta ~0)
+    #   deviat     - mediana abaterilor fata de consens e mai mare decat prag_deviatie (senzor decalibrat)
+    #   varf       - abaterea curenta iese cu mai mult de prag_outlier deviatii standard fata de mediana ei
+    # Valoarea fuzionata e media senzorilor "ok" din cadru; daca nu e niciunul, consensul (mediana cadrului).
+    def __init__(self, numar_TC, fereastra=20, prag_outlier=4.0, prag_deviatie=1.0, sigma_minim=0.05,
+                 temperatura_min=-40.0, temperatura_max=150.0):
+        self.fereastra = fereastra
+        self.prag_outlier = prag_outlier
+        self.prag_deviatie = prag_deviatie
+        self.sigma_minim = sigma_minim
+        self.temperatura_min = temperatura_min
+        self.temperatura_max = temperatura_max
+        self.senzori = [StatisticiSenzor() for _ in range(numar_TC)]
+
+    @classmethod
+    def din_configurare(cls, configurare):
+        return cls(configurare["numar_TC"], configurare["fereastra_fuziune"], configurare["prag_outlier_fuziune"],
+                   configurare["prag_deviatie_fuziune"])
+
+    def actualizeaza(self, valori):
+        # proceseaza un cadru (o valoare per termocuplu) si intoarce temperatura fuzionata
+        valide = [v for v in valori if self.temperatura_min <= v <= self.temperatura_max]
+        if not valide:
+            for senzor in self.senzori:
+                senzor.sanatate = "deconectat"
+                senzor.respinse += 1
+            return float("nan")
+        consens = mediana(valide)
+
+        suma = 0.0
+        acceptate = 0
+        for senzor, valoare in zip(self.senzori, valori):
+            if not (self.temperatura_min <= valoare <= self.temperatura_max):  # include NaN
+                senzor.sanatate = "deconectat"
+                senzor.respinse += 1
+                continue
 
-        # stabilim puterea curenta in functie de modul de functionare
-        with lock_stare:
-            mod_curent = stare["mod"]
-            putere_manual = stare["putere_manual"]
+            abatere = valoare - consens
+            # comparam cu fereastra de dinainte de esantionul curent, ca un varf sa nu-si mute singur pragul
+            if senzor.abateri.numar >= 3:
+                sigma = max(senzor.abateri.varianta() ** 0.5, self.sigma_minim)
+                varf = abs(abatere - senzor.mediana_abateri.mediana()) > self.prag_outlier * sigma
+            else:
+                varf = False
+            senzor.adauga(valoare, abatere, self.fereastra)
+
+            if senzor.brute.numar == self.fereastra and senzor.brute.varianta() < 1e-12:
+                senzor.sanatate = "blocat"
+            elif abs(senzor.mediana_abateri.mediana()) > self.prag_deviatie:
+                senzor.sanatate = "deviat"
+            elif varf:
+                senzor.sanatate = "varf"
+            else:
+                senzor.sanatate = "ok"
+                suma += valoare
+                acceptate += 1
+                continue
+            senzor.respinse += 1
+
+        return suma / acceptate if acceptate else consens
+
+    def raport_sanatate(self):
+        # starea fiecarui termocuplu: sanatate, esantioane respinse, abaterea mediana fata de consens, zgomot
+        return [
+            {
+                "senzor": f"TC{i + 1}",
+                "sanatate": senzor.sanatate,
+                "respinse": senzor.respinse,
+                "abatere_mediana": senzor.mediana_abateri.mediana(),
+                "zgomot": senzor.abateri.varianta() ** 0.5,
+            }
+            for i, senzor in enumerate(self.senzori)
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Control predictiv (modul "mpc")
+# ---------------------------------------------------------------------------
+# In locul legii proportionale din calcul_putere_mod_automat, S alege puterea optimizand pe un orizont de
+# mpc_orizont perioade T, cu modelul procesului din pas_t si pas_p, liniarizat:
+#   temperatura (un pas T):  x[k+1] = a*x[k] + b*u[k] + c     a = 1-alpha, b = alpha*delta_max/100, c = alpha*ambient
+#   presiune (perioada_T / perioada_P pasi P, valva tinuta la valva_liniarizare_mpc):
+#                            p[k+1] = a_p*p[k] + b_p*u[k] + c_p
+# Cost: sum (x - t_ref)^2 + mpc_pondere_miscare * sum (u[k] - u[k-1])^2
+#       + mpc_penalizare_presiune * sum max(0, p - presiune_maxima_siguranta)^2 (constrangere "moale")
+# cu 0 <= u <= 100, rezolvat cu gradient proiectat accelerat (FISTA).
+# Matricile de predictie depind doar de configurare si se calculeaza o singura data (lru_cache); fiecare
+# decizie porneste de la solutia anterioara deplasata cu un pas (warm start).
+# numpy se importa doar aici, ca in motorul multi-camera.
+
+def coeficienti_model_mpc(configurare):
+    # coeficientii (a, b, c) ai temperaturii si (a_p, b_p, c_p) ai presiunii pentru un pas T
+    alpha = configurare["viteza_raspuns_temperatura"]
+    a = 1.0 - alpha
+    b = alpha * configurare["delta_max_incalzire"] / 100.0
+    c = alpha * configurare["temperatura_ambient"]
+
+    # un pas P: p <- (1-r)*p + g*u/100 + r*p_ref - d*valva ; aplicat de m = perioada_T / perioada_P ori
+    r = configurare["revenire_presiune"]
+    m = configurare["perioada_T"] / configurare["perioada_P"]
+    a_p = (1.0 - r) ** m
+    castig = (1.0 - a_p) / r if r > 0 else m  # suma seriei geometrice 1 + (1-r) + ... (m termeni)
+    b_p = castig * configurare["crestere_presiune"] / 100.0
+    c_p = castig * (r * configurare["presiune_referinta"]
+                    - configurare["descarcare_valva"] * configurare["valva_liniarizare_mpc"])
+    return (a, b, c), (a_p, b_p, c_p)
+
+
+@functools.lru_cache(maxsize=32)
+def matrici_predictie_mpc(orizont, a, b, a_p, b_p, pondere_miscare, penalizare_presiune):
+    # predictia pe orizont: x = G @ u + liber * x0 + suma * c (la fel pentru presiune)
+    # G[i, j] = b * a^(i-j) pentru j <= i ; liber[i] = a^(i+1) ; suma[i] = 1 + a + ... + a^i
+    # pas - 1 / constanta Lipschitz a gradientului costului (marginita superior, cu penalizarea mereu activa)
+    import numpy as np
+
+    indici = np.arange(orizont)
+    diferenta = indici[:, None] - indici[None, :]
+    inferior = diferenta >= 0
+
+    def predictie(a_, b_):
+        g = np.where(inferior, b_ * a_ ** np.maximum(diferenta, 0), 0.0)
+        liber = a_ ** (indici + 1.0)
+        suma = np.cumsum(a_ ** indici.astype(np.float64))
+        return g, liber, suma
+
+    g, liber, suma = predictie(a, b)
+    g_p, liber_p, suma_p = predictie(a_p, b_p)
+
+    # D @ u = diferentele succesive (u[0] - u_anterior se adauga separat)
+    d = np.eye(orizont) - np.eye(orizont, k=-1)
+    hessian = g.T @ g + pondere_miscare * d.T @ d + penalizare_presiune * g_p.T @ g_p
+    pas = 1.0 / (2.0 * np.linalg.eigvalsh(hessian)[-1])
+
+    matrici = {"g": g, "liber": liber, "suma": suma, "g_p": g_p, "liber_p": liber_p, "suma_p": suma_p,
+               "g_t": np.ascontiguousarray(g.T), "g_p_t": np.ascontiguousarray(g_p.T), "pas": pas}
+    for valoare in matrici.values():
+        if isinstance(valoare, np.ndarray):
+            valoare.flags.writeable = False  # matricile sunt partajate prin cache
+    return matrici
+
+
+class ControlerMPC:
+    # pastreaza solutia anterioara (warm start) intre deciziile lui S
+    def __init__(self, configurare):
+        (self.a, self.b, self.c), (self.a_p, self.b_p, self.c_p) = coeficienti_model_mpc(configurare)
+        self.orizont = configurare["mpc_orizont"]
+        self.pondere_miscare = configurare["mpc_pondere_miscare"]
+        self.penalizare_presiune = configurare["mpc_penalizare_presiune"]
+        self.iteratii_max = configurare["mpc_iteratii"]
+        self.toleranta = configurare["mpc_toleranta"]
+        self.t_ref = configurare["temperatura_referinta"]
+        self.presiune_maxima = configurare["presiune_maxima_siguranta"]
+        self.presiune_referinta = configurare["presiune_referinta"]
+        self.matrici = matrici_predictie_mpc(self.orizont, self.a, self.b, self.a_p, self.b_p,
+                                             self.pondere_miscare, self.penalizare_presiune)
+        self.solutie = None
+        self.iteratii = 0  # iteratiile folosite la ultima decizie
+
+    @classmethod
+    def din_configurare(cls, configurare):
+        return cls(configurare)
+
+    def decide(self, t_medie, presiune, putere_anterioara):
+        # intoarce puterea de aplicat acum (primul element al planului optim)
+        # presiune - ultima presiune de la P (NaN inainte de primul mesaj: folosim referinta)
+        import numpy as np
+
+        m = self.matrici
+        if presiune != presiune:
+            presiune = self.presiune_referinta
+        eroare_libera = m["liber"] * t_medie + m["suma"] * self.c - self.t_ref
+        presiune_libera = m["liber_p"] * presiune + m["suma_p"] * self.c_p - self.presiune_maxima
+
+        if self.solutie is None:
+            u = np.full(self.orizont, limiteaza(putere_anterioara, 0.0, 100.0))
+        else:
+            u = np.empty(self.orizont)
+            u[:-1] = self.solutie[1:]
+            u[-1] = self.solutie[-1]
+
+        y = u.copy()
+        t = 1.0
+        pas = m["pas"]
+        iteratii = 0
+        for iteratii in range(1, self.iteratii_max + 1):
+            eroare = m["g"] @ y + eroare_libera
+            depasire = np.maximum(m["g_p"] @ y + presiune_libera, 0.0)
+            miscare = np.diff(y, prepend=putere_anterioara)
+            miscare[:-1] -= miscare[1:]
+            gradient = 2.0 * (m["g_t"] @ eroare + self.pondere_miscare * miscare
+                              + self.penalizare_presiune * (m["g_p_t"] @ depasire))
+
+            u_nou = np.clip(y - pas * gradient, 0.0, 100.0)
+            t_nou = 0.5 * (1.0 + (1.0 + 4.0 * t * t) ** 0.5)
+            y = u_nou + ((t - 1.0) / t_nou) * (u_nou - u)
+            schimbare = float(np.max(np.abs(u_nou - u)))
+            u = u_nou
+            t = t_nou
+            if schimbare < self.toleranta:
+                break
 
-        if mod_curent == "automat" and ultima_temperatura is not None:
-            # mod automat: S calculeaza puterea
-            putere_calc = calcul_putere_mod_automat(t_medie, configurare["temperatura_referinta"])
-            putere_calc = limiteaza(putere_calc, 0.0, 100.0)
+        self.solutie = u
+        self.iteratii = iteratii
+        return float(u[0])
+
+
+# coduri numerice pentru mod si confort, folosite cand starea e tinuta in vectori sau in fisiere binare
+# (telemetria, memoria partajata a backend-ului multiproces, motorul multi-camera)
+MODURI = ("automat", "manual", "mpc")
+CONFORTURI = ("rece", "confortabil", "cald")
+CONFORT_NECUNOSCUT = -1
+
+
+# ---------------------------------------------------------------------------
+# Telemetrie binara
+# ---------------------------------------------------------------------------
+# Fiecare esantion T (toate cele numar_TC temperaturi), fiecare esantion P (presiune, valva) si fiecare decizie S
+# (mod, putere, confort) se scrie ca inregistrare de lungime fixa intr-un inel preallocat (pack_into, fara alocari).
+# Un thread separat muta periodic inregistrarile din inele in fisiere (cate unul pe flux: <prefix>.t.bin,
+# <prefix>.p.bin, <prefix>.s.bin), deci task-urile de control nu fac niciodata I/O.
+# citeste_telemetrie() mapeaza fisierele in memorie si intoarce vectori NumPy peste ele, fara copiere.
+
+# antet de 16 octeti la inceputul fiecarui fisier: magic, versiune, numar_TC, dimensiunea unei inregistrari
+ANTET_TELEMETRIE = struct.Struct("<4sHHI4x")
+MAGIC_TELEMETRIE = b"HCTL"
+VERSIUNE_TELEMETRIE = 1
+
+# formatul inregistrarilor P si S (T depinde de numar_TC)
+FORMAT_TELEMETRIE_P = "<ddd"        # timestamp, presiune, valva
+FORMAT_TELEMETRIE_S = "<dddbb6x"    # timestamp, t_medie, putere, mod (index MODURI), confort (index CONFORTURI / -1)
+
+
+def format_telemetrie_t(numar_TC):
+    # timestamp + cate un double pentru fiecare termocuplu
+    return f"<d{numar_TC}d"
+
+
+class InelInregistrari:
+    # inel preallocat de inregistrari de lungime fixa, cu un singur producator (task-ul de control)
+    # si un singur consumator (thread-ul de scriere). Producatorul scrie pe pozitia "scrise", apoi o avanseaza;
+    # consumatorul copiaza intre "citite" si "scrise". Daca inelul e plin, inregistrarea noua se numara in "pierdute".
+    __slots__ = ("format", "capacitate", "tampon", "scrise", "citite", "pierdute")
+
+    def __init__(self, format_struct, capacitate):
+        self.format = struct.Struct(format_struct)
+        self.capacitate = capacitate
+        self.tampon = bytearray(self.format.size * capacitate)
+        self.scrise = 0
+        self.citite = 0
+        self.pierdute = 0
+
+    def adauga(self, *valori):
+        if self.scrise - self.citite >= self.capacitate:
+            self.pierdute += 1
+            return
+        self.format.pack_into(self.tampon, (self.scrise % self.capacitate) * self.format.size, *valori)
+        self.scrise += 1
+
+    def scrie_in(self, fisier):
+        # muta in fisier tot ce s-a adaugat de la ultima scriere (cel mult doua bucati continue din inel)
+        scrise = self.scrise
+        numar = scrise - self.citite
+        if numar <= 0:
+            return 0
+        dimensiune = self.format.size
+        vedere = memoryview(self.tampon)
+        inceput = self.citite % self.capacitate
+        prima = min(numar, self.capacitate - inceput)
+        fisier.write(vedere[inceput * dimensiune:(inceput + prima) * dimensiune])
+        if numar > prima:
+            fisier.write(vedere[:(numar - prima) * dimensiune])
+        self.citite = scrise
+        return numar
+
+
+class InregistratorTelemetrie:
+    # inregistrarile T / P / S ale unei rulari, scrise in fundal in <prefix>.t.bin / .p.bin / .s.bin
+    # inregistreaza_* se apeleaza din task-urile de control si doar copiaza valorile in inel
+    def __init__(self, prefix, numar_TC, capacitate=8192, perioada_scriere=0.2):
+        self.prefix = prefix
+        self.numar_TC = numar_TC
+        self.inele = {
+            "t": InelInregistrari(format_telemetrie_t(numar_TC), capacitate),
+            "p": InelInregistrari(FORMAT_TELEMETRIE_P, capacitate),
+            "s": InelInregistrari(FORMAT_TELEMETRIE_S, capacitate),
+        }
+        self.fisiere = {}
+        for flux, inel in self.inele.items():
+            fisier = open(f"{prefix}.{flux}.bin", "wb")
+            fisier.write(ANTET_TELEMETRIE.pack(MAGIC_TELEMETRIE, VERSIUNE_TELEMETRIE, numar_TC, inel.format.size))
+            self.fisiere[flux] = fisier
+        self._perioada_scriere = perioada_scriere
+        self._stop = threading.Event()
+        self._scriitor = threading.Thread(target=self._scrie_periodic, name="telemetrie", daemon=True)
+        self._scriitor.start()
+
+    def inregistreaza_t(self, timestamp, temperaturi):
+        self.inele["t"].adauga(timestamp, *temperaturi)
+
+    def inregistreaza_p(self, timestamp, presiune, valva):
+        self.inele["p"].adauga(timestamp, presiune, valva)
+
+    def inregistreaza_s(self, timestamp, mod, t_medie, putere, confort):
+        cod_confort = CONFORTURI.index(confort) if confort in CONFORTURI else CONFORT_NECUNOSCUT
+        self.inele["s"].adauga(timestamp, t_medie, putere, MODURI.index(mod), cod_confort)
+
+    def scrie(self):
+        # muta acum in fisiere tot ce e in inele
+        for flux, inel in self.inele.items():
+            if inel.scrie_in(self.fisiere[flux]):
+                self.fisiere[flux].flush()
+
+    def _scrie_periodic(self):
+        while not self._stop.wait(self._perioada_scriere):
+            self.scrie()
+
+    def pierdute(self):
+        return {flux: inel.pierdute for flux, inel in self.inele.items()}
+
+    def inchide(self):
+        self._stop.set()
+        self._scriitor.join()
+        self.scrie()
+        for fisier in self.fisiere.values():
+            fisier.close()
+
+
+def citeste_telemetrie(prefix):
+    # intoarce {"t": ..., "p": ..., "s": ...}, vectori NumPy cu campuri, mapati direct peste fisiere (fara copiere)
+    #   t: timestamp, temperaturi (numar_TC valori)   p: timestamp, presiune, valva
+    #   s: timestamp, t_medie, putere, mod, confort
+    # o inregistrare incompleta la final (scriere intrerupta) se ignora
+    import numpy as np
+
+    rezultat = {}
+    for flux in ("t", "p", "s"):
+        cale = f"{prefix}.{flux}.bin"
+        with open(cale, "rb") as fisier:
+            magic, versiune, numar_TC, dimensiune = ANTET_TELEMETRIE.unpack(fisier.read(ANTET_TELEMETRIE.size))
+        if magic != MAGIC_TELEMETRIE or versiune != VERSIUNE_TELEMETRIE:
+            raise ValueError(f"{cale}: nu este un fisier de telemetrie (versiunea {VERSIUNE_TELEMETRIE})")
+
+        if flux == "t":
+            tip = np.dtype([("timestamp", "<f8"), ("temperaturi", "<f8", (numar_TC,))])
+        elif flux == "p":
+            tip = np.dtype([("timestamp", "<f8"), ("presiune", "<f8"), ("valva", "<f8")])
+        else:
+            tip = np.dtype({"names": ["timestamp", "t_medie", "putere", "mod", "confort"],
+                            "formats": ["<f8", "<f8", "<f8", "i1", "i1"],
+                            "offsets": [0, 8, 16, 24, 25], "itemsize": 32})
+        if tip.itemsize != dimensiune:
+            raise ValueError(f"{cale}: inregistrari de {dimensiune} octeti, asteptat {tip.itemsize}")
+
+        numar = (os.path.getsize(cale) - ANTET_TELEMETRIE.size) // dimensiune
+        if numar == 0:
+            rezultat[flux] = np.zeros(0, dtype=tip)
+        else:
+            rezultat[flux] = np.memmap(cale, dtype=tip, mode="r", offset=ANTET_TELEMETRIE.size, shape=(numar,))
+    return rezultat
+
+
+# ---------------------------------------------------------------------------
+# Simulare pe timp virtual (mai rapida decat timpul real)
+# ---------------------------------------------------------------------------
+# Acelasi cod de T / P / S (pas_t, pas_p, pas_s) ruleaza intr-un singur thread, condus de un planificator
+# cu evenimente discrete: la fiecare pas sarim direct la urmatoarea activare (perioada_T, perioada_P,
+# perioada_afisare_S sau o comanda SW), fara asteptare reala. Cu un seed fix, rularea e reproductibila bit cu bit.
+
+def simuleaza_virtual(configurare, durata, comenzi=(), seed=0, afisare=False, telemetrie=None, observator_p=None, instantaneu=None,
+                      profilator=None):
+    # configurare - aceeasi ca in main()
+    # durata - secunde simulate
+    # comenzi - lista de (moment, linie) cu comenzi SW, ex: [(10.0, "m"), (10.0, "p 80"), (60.0, "a")]
+    # telemetrie - optional, un InregistratorTelemetrie (timestamp-urile sunt in timp virtual)
+    # observator_p - optional, functie apelata dupa fiecare pas_p cu (moment, instantaneul starii, memorie_p)
+    # instantaneu - optional, calea instantaneului de pornire: ca in main(), se porneste din el (daca exista si e valid)
+    #               si se rescrie la sfarsitul simularii
+    # profilator - optional, un Profilator: etapele lui T, P si S se masoara ca in main(--profil), in timp real;
+    #              esantionarea (armeaza) urmeaza timpul virtual, o data la perioada_esantionare_profil
+    # intoarce lista valorilor afisate de S (dict-urile din pas_s), in ordinea timpului
+    ceas = CeasVirtual()
+    rng = random.Random(seed)
+
+    date_pornire = citeste_instantaneu_pornire(instantaneu, configurare["varsta_maxima_instantaneu"]) if instantaneu else None
+    stare = stare_pornire(date_pornire)
+    stop_event = threading.Event()
+    q_evenimente_sw = queue.Queue()
+    q_temperaturi = CutiePostala()
+    q_comenzi_automat = CutiePostala()
+    q_presiune = CutiePostala()
+
+    memorie_t = memorie_initiala_t(configurare, telemetrie)
+    memorie_p = memorie_initiala_p(configurare, telemetrie)
+    memorie_s = memorie_initiala_s(ceas, telemetrie)
+    if date_pornire is not None:
+        aplica_instantaneu_pornire(date_pornire, memorie_t, memorie_p)
+    if profilator is not None:
+        memorie_t["profilator"] = profilator.task("T")
+        memorie_p["profilator"] = profilator.task("P")
+        memorie_s["profilator"] = profilator.task("S")
+
+    # evenimente: (moment, prioritate, ordine, tip, date); la acelasi moment ruleaza T, apoi P, apoi SW, apoi afisarea S
+    # la pornire toate task-urile se activeaza la t=0, ca thread-urile din main()
+    evenimente = [(0.0, 0, 0, "T", None), (0.0, 1, 1, "P", None), (0.0, 3, 2, "S", None)]
+    ordine = 3
+    for moment, linie in comenzi:
+        evenimente.append((float(moment), 2, ordine, "SW", linie))
+        ordine += 1
+    heapq.heapify(evenimente)
+
+    afisari = []
+    urmatorul_esantion = 0.0
+
+    while evenimente and not stop_event.is_set():
+        moment, prioritate, _, tip, date = heapq.heappop(evenimente)
+        if moment > durata:
+            break
+        ceas.timp = moment
+
+        if profilator is not None and moment >= urmatorul_esantion:
+            profilator.armeaza()
+            urmatorul_esantion = moment + configurare["perioada_esantionare_profil"]
+
+        if tip == "T":
+            pas_t(configurare, memorie_t, stare, q_temperaturi, ceas, rng)
+            urmator = moment + configurare["perioada_T"]
+        elif tip == "P":
+            pas_p(configurare, memorie_p, stare, q_comenzi_automat, q_presiune, ceas, rng)
+            if observator_p is not None:
+                observator_p(moment, stare.citeste(), memorie_p)
+            urmator = moment + memorie_p["perioada"]
+        elif tip == "SW":
+            eveniment, _ = interpreteaza_comanda_sw(date)
+            if eveniment is not None:
+                q_evenimente_sw.put(eveniment)
+            urmator = None
+        else:
+            urmator = memorie_s["next_afisare"]
+
+        # S reactioneaza imediat la o temperatura noua sau la o comanda si afiseaza la termen, ca task_s cu Trezire:
+        # presiunea nu trezeste S (e doar afisata), deci dupa un pas P nu ruleaza pas_s
+        if tip != "P":
+            profil_s = memorie_s["profilator"]
+            esantion = profil_s is not None and profil_s.armat
+            if esantion:
+                profil_s.porneste()
+            proceseaza_evenimente_sw(q_evenimente_sw, stare, stop_event)
+            if esantion:
+                profil_s.marcheaza("proceseaza_evenimente_sw")
+            if stop_event.is_set():
+                break
+            rezultat = pas_s(configurare, memorie_s, stare, q_temperaturi, q_comenzi_automat, q_presiune, ceas)
+            if esantion:
+                profil_s.incheie()
+            if rezultat is not None:
+                afisari.append(rezultat)
+                if afisare:
+                    print(formateaza_afisare(rezultat))
+
+        if tip == "S":
+            urmator = memorie_s["next_afisare"]
+        if urmator is not None:
+            heapq.heappush(evenimente, (urmator, prioritate, ordine, tip, None))
+            ordine += 1
+
+    if instantaneu:
+        salveaza_instantaneu_pornire(instantaneu, memorie_t, memorie_p, stare)
+    return afisari
+
+
+# ---------------------------------------------------------------------------
+# Pornire rapida (un proces de controler per camera)
+# ---------------------------------------------------------------------------
+# Timpul pana la prima decizie a lui S e dominat de pornirea interpretorului, de compilarea sursei si de importuri:
+#   - un script rulat direct ("python heating_control.py") se compileaza la fiecare pornire; modulul precompilat
+#     ("python -m compileall heating_control.py", apoi "python -m heating_control") se incarca din __pycache__
+#   - importurile folosite doar de unele moduri (argparse, json, marshal, numpy, asyncio) se fac in functiile care
+#     le folosesc, nu la incarcarea modulului
+#   - subsistemele optionale stau in module separate, importate doar de ramura din main / linia de comanda care le
+#     foloseste: heating_asyncio, heating_multiprocess, heating_server (serverul de control), heating_rooms
+#     (motorul multi-camera si cladirea), heating_sweep, heating_scenarios si heating_benchmarks
+#   - configurarea poate veni dintr-un fisier JSON; langa el se pastreaza o copie compilata (marshal, fara json)
+#   - instantaneul de pornire (temperatura_baza, presiunea, modul) se salveaza periodic si la oprire, ca T si P
+#     sa nu reporneasca de la temperatura_ambient / presiune_referinta
+
+VERSIUNE_CACHE_CONFIGURARE = 2
+VERSIUNE_INSTANTANEU_PORNIRE = 1
+
+
+def scrie_atomic(cale, date):
+    # fisierul nou apare dintr-o data (rename); o oprire la jumatatea scrierii lasa fisierul vechi intreg
+    temporar = f"{cale}.{os.getpid()}.tmp"
+    with open(temporar, "wb") as fisier:
+        fisier.write(date)
+    os.replace(temporar, cale)
+
+
+def salveaza_configurare(cale, configurare):
+    # configurarea ca JSON editabil (ex. punctul de plecare pentru --configurare)
+    import json
+
+    with open(cale, "w") as fisier:
+        json.dump(configurare, fisier, indent=2)
+        fisier.write("\n")
+
+
+def incarca_configurare(cale):
+    # configurare_implicita() suprascrisa cu cheile din fisierul JSON de la cale
+    # copia compilata <cale>.cache pastreaza st_mtime_ns si st_size ale JSON-ului din care a fost facuta si se
+    # foloseste doar daca amandoua se potrivesc exact (ca validarea .pyc): un JSON inlocuit cu unul mai vechi
+    # (cp -p, rsync -t, restaurat din backup) nu mai e mascat de copie. Altfel se citeste JSON-ul si se rescrie
+    # copia (daca directorul nu se poate scrie, citim JSON-ul la fiecare pornire)
+    import marshal
+
+    configurare = configurare_implicita()
+    cache = cale + ".cache"
+    info = os.stat(cale)
+    try:
+        with open(cache, "rb") as fisier:
+            versiune, mtime_ns, marime, valori = marshal.load(fisier)
+        if (versiune, mtime_ns, marime) == (VERSIUNE_CACHE_CONFIGURARE, info.st_mtime_ns, info.st_size):
+            configurare.update(valori)
+            return configurare
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
 
-            # Update stare sub mutex
-            with lock_stare:
-                stare["putere_curenta"] = putere_calc
+    import json
 
-            # Trimitem comanda automata catre P 
-            ultimul_mesaj(q_comenzi_automat, {"timestamp": time.monotonic(), "putere": putere_calc})
+    with open(cale) as fisier:
+        valori = json.load(fisier)
+    necunoscute = set(valori) - set(configurare)
+    if necunoscute:
+        raise ValueError(f"{cale}: chei de configurare necunoscute: {sorted(necunoscute)}")
+    configurare.update(valori)
+    try:
+        scrie_atomic(cache, marshal.dumps((VERSIUNE_CACHE_CONFIGURARE, info.st_mtime_ns, info.st_size, valori)))
+    except OSError:
+        pass
+    return configurare
 
-        else:
-            # mod manual: S nu calculeaza puterea si nu trimite comenzi catre P.
-            # puterea curenta este stabilita de SW (prin stare["putere_manual"]).
-            with lock_stare:
-                stare["putere_curenta"] = putere_manual
 
-            # nu trimitem nimic pe q_comenzi_automat in manual
-        
-        # Afisam starea o data la perioada_afisare_S secunde
-        acum = time.monotonic()
-        if acum >= next_afisare:
-            next_afisare = acum + configurare["perioada_afisare_S"]
+def salveaza_instantaneu_pornire(cale, memorie_t, memorie_p, stare):
+    # ce trebuie ca T, P si modul sa continue de unde au ramas (marshal, scris atomic)
+    import marshal
 
-            with lock_stare:
-                mod_afis = stare["mod"]
-                putere_afis = stare["putere_curenta"]
+    instantaneu = stare.citeste()
+    scrie_atomic(cale, marshal.dumps({
+        "versiune": VERSIUNE_INSTANTANEU_PORNIRE,
+        "salvat_la": time.time(),
+        "temperatura_baza": memorie_t["temperatura_baza"],
+        "presiune": memorie_p["presiune"],
+        "mod": instantaneu.mod,
+        "putere_manual": instantaneu.putere_manual,
+        "putere_curenta": instantaneu.putere_curenta,
+    }))
 
-            pres = ultima_presiune["presiune"] if ultima_presiune is not None else float("nan")
 
-            valva = ultima_presiune.get("valva", float("nan")) if ultima_presiune is not None else float("nan")
+def citeste_instantaneu_pornire(cale, varsta_maxima):
+    # dict-ul salvat de salveaza_instantaneu_pornire, sau None daca lipseste, e stricat sau e mai vechi de
+    # varsta_maxima secunde (camera s-a racit intre timp, pornim rece)
+    import marshal
 
-            with lock_consola:
-                print(
-                    f"[S] mod={mod_afis:7s} ; T_medie={t_medie:5.2f} C ; confort={confort:12s} ; "
-                    f"presiune={pres:4.2f} ; putere={putere_afis:5.1f}% ; valva={valva:3.1f}"
-                )
-
-        # eliberam CPU-ul fara busy-wait
-        stop_event.wait(timeout=0.02)
-        
-def main():
-    # "configurare" contine parametrii sistemului 
-    configurare = {
+    try:
+        with open(cale, "rb") as fisier:
+            date = marshal.load(fisier)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(date, dict) or date.get("versiune") != VERSIUNE_INSTANTANEU_PORNIRE or date.get("mod") not in MODURI:
+        return None
+    if not 0.0 <= time.time() - date["salvat_la"] <= varsta_maxima:
+        return None
+    return date
+
+
+def aplica_instantaneu_pornire(instantaneu, memorie_t, memorie_p):
+    # T si P pornesc din valorile salvate; modul si puterile intra in StarePartajata (vezi stare_pornire)
+    memorie_t["temperatura_baza"] = instantaneu["temperatura_baza"]
+    memorie_p["presiune"] = instantaneu["presiune"]
+    memorie_p["presiune_varf"] = instantaneu["presiune"]
+
+
+def stare_pornire(instantaneu=None):
+    # zona partajata initiala: din instantaneul de pornire, daca exista, altfel automat cu puterile implicite
+    if instantaneu is None:
+        return StarePartajata(mod="automat", putere_manual=30.0, putere_curenta=0.0)
+    return StarePartajata(mod=instantaneu["mod"], putere_manual=instantaneu["putere_manual"],
+                          putere_curenta=instantaneu["putere_curenta"])
+
+
+def configurare_implicita():
+    # "configurare" contine parametrii sistemului
+    return {
         # parametri confort
         "temperatura_referinta": 22.0, # temperatura tinta
         "banda_confort": 1.0, # +/- 1 grad C fata de tinta
 
-        # parametri model temperatura 
+        # parametri model temperatura
         "temperatura_ambient": 18.0, # fara incalzire
         "delta_max_incalzire": 10.0, # cu cate grade urca peste ammbient la putere 100%
         "viteza_raspuns_temperatura": 0.08, # cat de repede urca/scade temperatura
 
+        # cladire multi-zona (cuplaj_cladire): fractiunea din diferenta de temperatura schimbata intr-un pas T
+        "conductanta_perete": 0.02, # intre zone vecine pe acelasi etaj
+        "conductanta_planseu": 0.01, # intre zone suprapuse
+        "conductanta_exterior": 0.01, # pentru fiecare fata spre exterior (pereti de margine, acoperis)
+        "temperatura_exterior": 5.0,
+
+        # instantaneul de pornire (main(instantaneu=...) / --instantaneu)
+        "perioada_instantaneu": 10.0, # cat de des se rescrie instantaneul cat ruleaza controlerul
+        "varsta_maxima_instantaneu": 3600.0, # un instantaneu mai vechi e ignorat (camera s-a racit), pornim rece
+
+        # profilarea pe etape (main(profil=True) / --profil)
+        "perioada_esantionare_profil": 0.5, # cat de des se profileaza urmatoarea activare a fiecarui task (0 = toate)
+
         # parametri presiune
         "presiune_referinta": 3.0, # nivel normal de presiune
         "presiune_maxima_siguranta": 4.0, #prag de siguranta, peste, se deschide valva complet
+        "crestere_presiune": 0.08, # cat creste presiunea pe perioada P la putere 100%
+        "revenire_presiune": 0.01, # cat de repede revine presiunea spre referinta
+        "descarcare_valva": 0.08, # cat scade presiunea pe perioada P cu valva complet deschisa
+        "timp_maxim_peste_siguranta": 1.0, # cat are voie presiunea sa stea continuu peste prag (verificat de scenariile de regresie)
+
+        # supervizorul de presiune din P (SupervizorPresiune), optional; False = pragurile fixe, la fiecare perioada_P
+        "supervizor_presiune": False,
+        "histerezis_valva": 0.15, # cat trebuie sa scada presiunea sub prag ca valva sa coboare o treapta
+        "perioada_P_minima": 0.05, # dupa o declansare sau cand presiunea creste repede
+        "perioada_P_maxima": 0.5, # cand presiunea e stabila
+        "pas_presiune_maxim": 0.05, # cat are voie presiunea sa creasca intre doua cicluri P
+
+        # parametri control automat (calcul_putere_mod_automat)
+        "k_automat": 12.0, # cat de rapid reactioneaza controlul
+        "putere_baza_automat": 30.0, # puterea de baza
 
         # perioade (secunde)
-        "perioada_T": 0.5, # perioada de citire temperatura 
+        "perioada_T": 0.5, # perioada de citire temperatura
         "perioada_P": 0.2, # perioada de reglare presiune
         "perioada_afisare_S": 1.0, # perioada de afisare stare in S
 
+        # ce fac T si P cand o activare intarzie peste urmatoarea: "recupereaza" (ruleaza imediat activarile ratate)
+        # sau "sare" (renunta la ele si se aliniaza la urmatoarea perioada)
+        "politica_depasire": "recupereaza",
+
         # numar termocupluri
         "numar_TC": 4, # cate termocupluri avem
+        "prag_zgomot_numpy": 256, # de la cate termocupluri zgomotul se genereaza vectorizat (daca e instalat NumPy)
+
+        # fuziunea senzorilor in S: termocuplurile suspecte (blocate, cu varfuri, decalibrate, deconectate) sunt ignorate
+        "fuziune_senzori": True,
+        "fereastra_fuziune": 20, # cate esantioane pastram pentru fiecare termocuplu
+        "prag_outlier_fuziune": 4.0, # cate deviatii standard inseamna un varf
+        "prag_deviatie_fuziune": 1.0, # abaterea mediana (grade C) de la care un senzor e considerat decalibrat
+
+        # modul mpc (control predictiv): orizont in perioade T, ponderi, oprirea optimizarii
+        "mpc_orizont": 20,
+        "mpc_pondere_miscare": 1e-3, # penalizeaza schimbarile bruste de putere (oscilatiile)
+        "mpc_penalizare_presiune": 100.0, # cat costa depasirea presiunii maxime de siguranta (constrangere moale)
+        "mpc_iteratii": 100, # iteratii maxime de gradient proiectat pe decizie
+        "mpc_toleranta": 1e-3, # ne oprim cand nicio putere din plan nu se mai schimba cu mai mult (in %)
+        "valva_liniarizare_mpc": 0.6, # deschiderea valvei in modelul de presiune (cea din pas_p peste referinta + 0.3)
     }
 
-    # "stare" este zona partajata intre thread-uri. Orice citire/scriere din stare trebuie facuta sub lock_stare (mutex).
-    # Asta previne secventa gresita "date incorecte intre S si P".
-    stare = {
-        "mod": "automat", 
-        "putere_manual": 30.0, # setata de SW in mod manual
-        "putere_curenta": 0.0, # actualizata de S si folosita de T si P
-    }
 
-    # Mutex (Lock) = excludere mutuala pentru "stare"
-    lock_stare = threading.Lock() # pentru a proteja accesul la "stare"
+def main(backend="threading", telemetrie=None, control=None, numar_camere=1, configurare=None, instantaneu=None, profil=False):
+    # backend - "threading" (cate un thread per task, implicit), "asyncio" (toate task-urile pe o bucla de evenimente)
+    #           sau "multiproces" (T, P si S in procese separate, pe memorie partajata; vezi main_multiproces)
+    # telemetrie - optional, prefixul fisierelor de telemetrie binara (<prefix>.t.bin / .p.bin / .s.bin)
+    # control - optional, adresa serverului de control ("host:port" sau calea unui socket Unix), vezi server_control
+    # numar_camere - cate controlere de camera ruleaza (doar cu backend-ul asyncio)
+    # configurare - optional, parametrii sistemului (ex. din incarca_configurare); implicit configurare_implicita()
+    # instantaneu - optional, calea instantaneului de pornire (doar cu backend-ul threading): T, P si modul pornesc
+    #               din el daca exista si e valid, si se rescrie la fiecare perioada_instantaneu secunde si la oprire
+    # profil - profilarea pe etape a lui T, P si S (doar cu backend-ul threading): "prof <fisier>" in SW exporta
+    #          stivele pentru flamegraph, iar la oprire se afiseaza costul fiecarei etape
+
+    # parametrii sistemului (vezi configurare_implicita)
+    if configurare is None:
+        configurare = configurare_implicita()
+
+    # masuratori de timp pentru T si P, afisate la oprire
+    statistici = creeaza_statistici(configurare)
+
+    inregistrator = InregistratorTelemetrie(telemetrie, configurare["numar_TC"]) if telemetrie else None
+
+    if backend == "asyncio":
+        import asyncio
+
+        from heating_asyncio import main_async
+
+        try:
+            asyncio.run(main_async(configurare, statistici, inregistrator, control, numar_camere))
+        except KeyboardInterrupt:
+            pass
+        if inregistrator is not None:
+            inregistrator.inchide()
+        print("\n Oprire program")
+        for st in statistici.values():
+            print(formateaza_statistici(st.instantaneu()))
+        return
+
+    if backend == "multiproces":
+        from heating_multiprocess import main_multiproces
+
+        statistici_procese = main_multiproces(configurare)
+        print("\n Oprire program")
+        for nume in ("T", "P"):
+            if nume in statistici_procese:
+                print(formateaza_statistici(statistici_procese[nume]))
+        return
+
+    # "stare" este zona partajata intre thread-uri: mod, putere_manual (setata de SW in mod manual),
+    # putere_curenta (actualizata de S si folosita de T si P).
+    # Se citeste ca instantaneu consistent (fara mutex) si se modifica doar prin metodele StarePartajata,
+    # care publica o versiune noua. Asta previne secventa gresita "date incorecte intre S si P".
+    # Cu instantaneu de pornire, modul si puterile vin din el (vezi stare_pornire).
+    date_pornire = citeste_instantaneu_pornire(instantaneu, configurare["varsta_maxima_instantaneu"]) if instantaneu else None
+    stare = stare_pornire(date_pornire)
+
+    # memoriile lui T si P, pastrate aici ca sa putem salva instantaneul de pornire
+    memorie_t = memorie_initiala_t(configurare, inregistrator)
+    memorie_p = memorie_initiala_p(configurare, inregistrator)
+    if date_pornire is not None:
+        aplica_instantaneu_pornire(date_pornire, memorie_t, memorie_p)
 
     # Lock separat pentru print-uri ca sa nu se amestece liniile
     lock_consola = threading.Lock()
@@ -453,44 +2221,151 @@ def main():
     # main seteaza stop_event, celelalte thread-uri verifica stop_event si ies
     stop_event = threading.Event()
 
+    # S asteapta pe o singura Trezire, semnalata de intrarile care ii schimba decizia (temperatura, SW, oprire)
+    trezire_s = Trezire()
+
+    # memoria lui S, citita de serverul de control pentru interogarile de stare
+    memorie_s = memorie_initiala_s(CEAS_REAL, inregistrator)
+
+    profilator = Profilator(toate=configurare["perioada_esantionare_profil"] <= 0) if profil else None
+    if profilator is not None:
+        memorie_t["profilator"] = profilator.task("T")
+        memorie_p["profilator"] = profilator.task("P")
+        memorie_s["profilator"] = profilator.task("S")
+
     # Cozi de mesaje:
-    # maxsize=1 pentru temperaturi/presiune/comenzi automate - pastram doar ultimul mesaj
-    q_evenimente_sw = queue.Queue(maxsize=10) 
-    q_temperaturi = queue.Queue(maxsize=1)
-    q_comenzi_automat = queue.Queue(maxsize=1)
-    q_presiune = queue.Queue(maxsize=1)
+    # comenzile SW (consola si serverul de control) intra intr-o coada nelimitata: se aplica toate, in ordine
+    # pentru temperaturi/presiune/comenzi automate folosim CutiePostala - pastram doar ultimul mesaj
+    q_evenimente_sw = queue.Queue()
+    q_temperaturi = CutiePostala(trezire_s)
+    q_comenzi_automat = CutiePostala()
+    q_presiune = CutiePostala()
 
     # Thread-urile sunt create cu daemon=True.
     # daca thread-ul principal (main) se termina, thread-urile daemon nu mai tin procesul in viata.
     # util sa nu ramana procesul blocat.
     # facem si join(timeout) ca sa fim siguri ca se termina 
-    th_sw = threading.Thread(target=task_sw, name="SW", args=(q_evenimente_sw, stop_event, lock_consola), daemon=True)
-    th_t = threading.Thread(target=task_t, name="T", args=(configurare, stare, lock_stare, q_temperaturi, stop_event), daemon=True)
-    th_p = threading.Thread(target=task_p, name="P", args=(configurare, stare, lock_stare, q_comenzi_automat, q_presiune, stop_event), daemon=True)
-    th_s = threading.Thread(target=task_s, name="S", args=(configurare, stare, lock_stare, q_evenimente_sw, q_temperaturi, q_comenzi_automat, q_presiune, stop_event, lock_consola), daemon=True)
+    th_sw = threading.Thread(target=task_sw, name="SW", args=(q_evenimente_sw, stop_event, lock_consola, trezire_s, profilator), daemon=True)
+    th_t = threading.Thread(target=task_t, name="T", args=(configurare, stare, q_temperaturi, stop_event, CEAS_REAL, random, statistici["T"], inregistrator, memorie_t), daemon=True)
+    th_p = threading.Thread(target=task_p, name="P", args=(configurare, stare, q_comenzi_automat, q_presiune, stop_event, CEAS_REAL, random, statistici["P"], inregistrator, memorie_p), daemon=True)
+    th_s = threading.Thread(target=task_s, name="S", args=(configurare, stare, q_evenimente_sw, q_temperaturi, q_comenzi_automat, q_presiune, stop_event, lock_consola, CEAS_REAL, trezire_s, memorie_s, inregistrator), daemon=True)
+    fire = [th_sw, th_t, th_s, th_p]
+
+    # serverul de control ruleaza pe propria bucla asyncio, intr-un thread separat
+    if control:
+        import asyncio
+
+        from heating_server import CameraControlata, server_control
+
+        camera = CameraControlata(stare, q_evenimente_sw, trezire_s, memorie_s)
+        fire.append(threading.Thread(target=asyncio.run, name="control",
+                                     args=(server_control(configurare, [camera], stop_event, control),), daemon=True))
 
     # Pornim thread-urile
     th_t.start()
     th_p.start()
     th_s.start()
     th_sw.start()
+    for th in fire[4:]:
+        th.start()
 
-    # Main asteapta oprirea fara busy-wait
+    # Main asteapta oprirea fara busy-wait (si salveaza periodic instantaneul de pornire)
+    # cu profilare esantionata, la fiecare trezire armeaza si urmatoarea activare a fiecarui task
+    urmatoarea_salvare = time.monotonic() + configurare["perioada_instantaneu"]
+    esantionare = profilator is not None and not profilator.toate
     try:
         while not stop_event.is_set():
-            stop_event.wait(timeout=0.5)
+            stop_event.wait(timeout=configurare["perioada_esantionare_profil"] if esantionare else 0.5)
+            if esantionare:
+                profilator.armeaza()
+            if instantaneu and time.monotonic() >= urmatoarea_salvare:
+                salveaza_instantaneu_pornire(instantaneu, memorie_t, memorie_p, stare)
+                urmatoarea_salvare += configurare["perioada_instantaneu"]
     except KeyboardInterrupt:
-        stop_event.set()
+        opreste(stop_event, trezire_s)
 
     # Asteptam terminarea thread-urilor cu timeout
-    for th in (th_sw, th_t, th_s, th_p):
+    for th in fire:
         try:
             th.join(timeout=1.0)
         except RuntimeError:
             pass
 
+    if inregistrator is not None:
+        inregistrator.inchide()
+    if instantaneu:
+        salveaza_instantaneu_pornire(instantaneu, memorie_t, memorie_p, stare)
+
     with lock_consola:
         print("\n Oprire program")
+        for st in statistici.values():
+            print(formateaza_statistici(st.instantaneu()))
+        if profilator is not None:
+            for linie in formateaza_profil(profilator):
+                print(linie)
+
+
+def parseaza_argumente(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Smart room heating control (T / P / S / SW)")
+    parser.add_argument("--benchmark", metavar="NUME", help="ruleaza un benchmark in loc de controler (vezi heating_benchmarks.BENCHMARKURI)")
+    parser.add_argument("--telemetrie", metavar="PREFIX", help="inregistreaza telemetria binara in PREFIX.t.bin / .p.bin / .s.bin")
+    parser.add_argument("--sweep", metavar="FISIER", help="ruleaza sweep-ul implicit de parametri si salveaza rezultatele in FISIER")
+    parser.add_argument("--procese", type=int, help="numarul de procese pentru --sweep (implicit: cate nuclee sunt)")
+    parser.add_argument("--scenarii", action="store_true", help="ruleaza scenariile de regresie si metricile de performanta (cod de iesire 1 la esec)")
+    parser.add_argument("--referinta", metavar="FISIER", help="fisierul JSON cu metricile de referinta pentru --scenarii (se creeaza daca nu exista)")
+    parser.add_argument("--marja", type=float, default=0.25, help="regresia de performanta tolerata fata de referinta (fractiune, implicit 0.25)")
+    parser.add_argument("--actualizeaza-referinta", action="store_true", help="rescrie --referinta cu valorile masurate acum")
+    parser.add_argument("--serii", metavar="PREFIX", help="salveaza seriile de timp ale scenariilor in PREFIX.<scenariu>.p.col / .s.col")
+    parser.add_argument("--backend", choices=("threading", "asyncio", "multiproces"), default="threading", help="cum ruleaza task-urile T / P / S / SW")
+    parser.add_argument("--control", metavar="ADRESA", help="porneste serverul de control pe ADRESA (host:port sau calea unui socket Unix)")
+    parser.add_argument("--camere", type=int, default=1, help="cate controlere de camera ruleaza (doar cu --backend asyncio)")
+    parser.add_argument("--configurare", metavar="FISIER", help="citeste parametrii din FISIER (JSON); copia compilata se pastreaza in FISIER.cache")
+    parser.add_argument("--scrie-configurare", metavar="FISIER", help="scrie configurarea implicita in FISIER (JSON) si iese")
+    parser.add_argument("--instantaneu", metavar="FISIER", help="porneste din instantaneul salvat in FISIER si il actualizeaza (doar --backend threading)")
+    parser.add_argument("--profil", action="store_true", help="profileaza etapele lui T / P / S; 'prof <fisier>' in SW exporta stivele (doar --backend threading)")
+    argumente = parser.parse_args(argv)
+    if argumente.benchmark:
+        from heating_benchmarks import BENCHMARKURI
+
+        if argumente.benchmark not in BENCHMARKURI:
+            parser.error(f"benchmark necunoscut: {argumente.benchmark} (disponibile: {', '.join(sorted(BENCHMARKURI))})")
+    if argumente.camere != 1 and argumente.backend != "asyncio":
+        parser.error("--camere cere --backend asyncio")
+    if argumente.instantaneu and argumente.backend != "threading":
+        parser.error("--instantaneu cere --backend threading")
+    if argumente.profil and argumente.backend != "threading":
+        parser.error("--profil cere --backend threading")
+    if argumente.backend == "multiproces":
+        if argumente.control or argumente.telemetrie:
+            parser.error("--control si --telemetrie nu sunt disponibile cu --backend multiproces")
+        if not numpy_disponibil():
+            parser.error("--backend multiproces cere numpy (vederile peste memoria partajata)")
+    return argumente
+
 
 if __name__ == "__main__":
-    main()
+    # rulat ca script, modulul e __main__; modulele optionale fac "from heating_control import ...", asa ca il
+    # inregistram si sub numele lui, altfel s-ar incarca a doua oara (alte clase, alta stare globala)
+    sys.modules.setdefault("heating_control", sys.modules[__name__])
+
+    argumente = parseaza_argumente()
+    if argumente.benchmark:
+        from heating_benchmarks import BENCHMARKURI
+
+        BENCHMARKURI[argumente.benchmark]()
+    elif argumente.scrie_configurare:
+        salveaza_configurare(argumente.scrie_configurare, configurare_implicita())
+    elif argumente.scenarii:
+        from heating_scenarios import ruleaza_regresie
+
+        sys.exit(0 if ruleaza_regresie(argumente.referinta, argumente.marja, argumente.actualizeaza_referinta, argumente.serii) else 1)
+    elif argumente.sweep:
+        from heating_sweep import GRILA_SWEEP_IMPLICITA, afiseaza_sweep, combinatii_grila, ruleaza_sweep
+
+        afiseaza_sweep(ruleaza_sweep(combinatii_grila(GRILA_SWEEP_IMPLICITA), procese=argumente.procese, iesire=argumente.sweep))
+    else:
+        configurare = incarca_configurare(argumente.configurare) if argumente.configurare else None
+        main(backend=argumente.backend, telemetrie=argumente.telemetrie, control=argumente.control, numar_camere=argumente.camere,
+             configurare=configurare, instantaneu=argumente.instantaneu, profil=argumente.profil)
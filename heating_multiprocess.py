@@ -0,0 +1,397 @@
+# ---------------------------------------------------------------------------
+# Rulare pe procese separate (backend "multiproces")
+# ---------------------------------------------------------------------------
+# T, P si S ruleaza fiecare in procesul lui, deci un S lent (afisare, control mai greu) nu mai ia timp de GIL
+# buclei de presiune din P. Cutiile (q_temperaturi / q_presiune / q_comenzi_automat) si zona "stare" sunt
+# inlocuite de blocuri multiprocessing.shared_memory: fiecare bloc are un contor de secventa (seqlock) si
+# valorile ca float64, citite si scrise prin vederi NumPy direct peste memoria partajata (fara pickle, fara cozi).
+# Comenzile SW raman pe o coada intre procese (trebuie aplicate toate, in ordine); SW ramane in procesul principal.
+# S e condus de evenimente ca in main: doarme pe o TrezireMP semnalata de canalul temperaturilor, de SW si la oprire.
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import sys
+import threading
+import time
+from array import array
+from multiprocessing import shared_memory
+
+from heating_control import (
+    CEAS_REAL, CadruSenzori, InstantaneuStare, MODURI, StarePartajata, creeaza_statistici, memorie_initiala_s, opreste,
+    task_p, task_s, task_sw, task_t,
+)
+
+
+# Seqlock-ul fara lock se bazeaza pe ordinea memoriei din x86-64: scrierile (contor impar, valori, contor par)
+# ajung in memorie in ordinea din program si citirile nu sunt reordonate intre ele. NumPy nu pune bariere de memorie,
+# deci pe procesoare cu ordine slaba (ARM, POWER, RISC-V) un cititor ar putea vedea contorul par nou cu valori vechi.
+# Acolo fiecare bloc primeste un multiprocessing.Lock: scriitorul il tine pe toata scrierea, iar cititorul copiaza
+# valorile tot sub el (acquire / release sunt bariere complete).
+ORDINE_MEMORIE_X86 = platform.machine().lower() in ("x86_64", "amd64")
+
+# campurile mesajelor de tip dict, in ordinea in care stau in memoria partajata
+CAMPURI_CANAL = {
+    "presiune": ("timestamp", "presiune", "valva"),
+    "comanda": ("timestamp", "putere"),
+}
+
+
+def deschide_memorie_partajata(nume, dimensiune):
+    # nume None -> bloc nou (plin cu zero-uri), altfel ne atasam la blocul existent creat de procesul principal
+    if nume is None:
+        return shared_memory.SharedMemory(create=True, size=dimensiune)
+    return shared_memory.SharedMemory(name=nume)
+
+
+class TrezireMP:
+    # Trezire intre procese: aceeasi interfata (generatie, semnaleaza, asteapta), deci task_s o foloseste neschimbat.
+    # Generatia sta intr-un multiprocessing.RawValue si se modifica doar cu lock-ul conditiei luat (semnaleaza vine
+    # din mai multe procese: T prin canalul temperaturilor, SW si oprirea din procesul principal).
+    __slots__ = ("_generatie", "_conditie")
+
+    def __init__(self):
+        self._generatie = multiprocessing.RawValue("q", 0)
+        self._conditie = multiprocessing.Condition(multiprocessing.Lock())
+
+    @property
+    def generatie(self):
+        return self._generatie.value
+
+    def semnaleaza(self):
+        with self._conditie:
+            self._generatie.value += 1
+            self._conditie.notify_all()
+
+    def asteapta(self, generatie_vazuta, timeout=None):
+        # asteapta (fara busy-wait) un semnal mai nou decat generatie_vazuta, maxim timeout secunde
+        with self._conditie:
+            self._conditie.wait_for(lambda: self._generatie.value != generatie_vazuta, timeout)
+            return self._generatie.value
+
+
+class CoadaEvenimenteMP:
+    # coada comenzilor SW catre procesul S, cu interfata folosita de task_sw / proceseaza_evenimente_sw
+    # multiprocessing.Queue muta mesajul in pipe dintr-un thread de fundal, deci S, trezit imediat dupa put(),
+    # l-ar putea cauta inainte sa ajunga acolo; SimpleQueue scrie in pipe chiar in put().
+    # Un singur cititor (S), deci empty() urmat de get() nu se blocheaza.
+    __slots__ = ("_coada",)
+
+    def __init__(self):
+        self._coada = multiprocessing.SimpleQueue()
+
+    def put(self, eveniment):
+        self._coada.put(eveniment)
+
+    def get_nowait(self):
+        if self._coada.empty():
+            raise queue.Empty
+        return self._coada.get()
+
+
+class BlocSecvential:
+    # un bloc de memorie partajata [contor int64][valori float64 ...] protejat de un seqlock
+    # contor - impar cat timp scriitorul scrie, par cand valorile sunt complete; a cata scriere = contor // 2
+    # Un singur scriitor per bloc (sau scriitori serializati de un lock). Cititorul copiaza valorile si
+    # reincearca daca intre timp contorul s-a schimbat, deci nu vede niciodata o scriere facuta pe jumatate.
+    # Pe x86-64 scrierile int64/float64 aliniate sunt atomice si raman in ordinea din program.
+    # lock - None pe x86-64; altfel un multiprocessing.Lock (vezi ORDINE_MEMORIE_X86), creat de procesul care
+    #        creeaza blocul si dat mai departe proceselor care se ataseaza
+    __slots__ = ("memorie", "proprietar", "contor", "valori", "lock")
+
+    def __init__(self, numar_valori, nume=None, lock=None):
+        import numpy as np
+
+        self.memorie = deschide_memorie_partajata(nume, 8 * (1 + numar_valori))
+        self.proprietar = nume is None
+        if self.proprietar and lock is None and not ORDINE_MEMORIE_X86:
+            lock = multiprocessing.Lock()
+        self.lock = lock
+        self.contor = np.ndarray((1,), dtype=np.int64, buffer=self.memorie.buf)
+        self.valori = np.ndarray((numar_valori,), dtype=np.float64, buffer=self.memorie.buf, offset=8)
+
+    @property
+    def nume(self):
+        return self.memorie.name
+
+    @property
+    def scrieri(self):
+        # contorul impar (scriere in curs) da tot numarul de scrieri terminate
+        return int(self.contor[0]) // 2
+
+    def incepe_scrierea(self):
+        if self.lock is not None:
+            self.lock.acquire()
+        contor = int(self.contor[0])
+        self.contor[0] = contor + 1
+        return contor
+
+    def termina_scrierea(self, contor):
+        self.contor[0] = contor + 2
+        if self.lock is not None:
+            self.lock.release()
+        return contor // 2 + 1
+
+    def citeste(self):
+        # (numar de scrieri, copie a valorilor) dintr-o singura scriere completa
+        if self.lock is not None:
+            with self.lock:
+                return int(self.contor[0]) // 2, self.valori.copy()
+        while True:
+            contor = int(self.contor[0])
+            if not contor & 1:
+                copie = self.valori.copy()
+                if int(self.contor[0]) == contor:
+                    return contor // 2, copie
+            # scriitorul e la mijlocul scrierii (sau a terminat intre timp); ii lasam procesorul
+            time.sleep(0)
+
+    def inchide(self):
+        # vederile NumPy trebuie eliberate inainte de close(), altfel bufferul ramane exportat
+        self.contor = None
+        self.valori = None
+        self.memorie.close()
+        if self.proprietar:
+            self.memorie.unlink()
+
+
+class CanalPartajat:
+    # CutiePostala intre procese: pastreaza doar ultimul mesaj, intr-un BlocSecvential
+    # secventa mesajului = numarul de scrieri din bloc, deci P / S folosesc canalul exact ca pe o CutiePostala
+    # tip - "cadru" (CadruSenzori de la T), "presiune" (de la P) sau "comanda" (comanda automata de la S)
+    # numar_TC - doar pentru "cadru": cate termocupluri are cadrul
+    # trezire - optional, o TrezireMP semnalata la fiecare publicare (ca la CutiePostala)
+    # Un canal se trimite unui proces copil prin pickle: copilul se ataseaza la acelasi bloc dupa nume.
+    __slots__ = ("tip", "numar_TC", "bloc", "trezire", "depasite")
+
+    def __init__(self, tip, numar_TC=0, nume=None, lock=None, trezire=None):
+        if tip != "cadru" and tip not in CAMPURI_CANAL:
+            raise ValueError(f"tip de canal necunoscut: {tip!r}")
+        self.tip = tip
+        self.numar_TC = numar_TC
+        numar_valori = 4 + numar_TC if tip == "cadru" else len(CAMPURI_CANAL[tip])
+        self.bloc = BlocSecvential(numar_valori, nume, lock)
+        self.trezire = trezire
+        self.depasite = 0
+
+    def __reduce__(self):
+        return (CanalPartajat, (self.tip, self.numar_TC, self.bloc.nume, self.bloc.lock, self.trezire))
+
+    @property
+    def secventa(self):
+        return self.bloc.scrieri
+
+    def publica(self, mesaj):
+        valori = self.bloc.valori
+        contor = self.bloc.incepe_scrierea()
+        if self.tip == "cadru":
+            valori[0] = mesaj.timestamp
+            valori[1] = mesaj.medie
+            valori[2] = mesaj.minim
+            valori[3] = mesaj.maxim
+            valori[4:] = mesaj.valori
+        else:
+            for index, camp in enumerate(CAMPURI_CANAL[self.tip]):
+                valori[index] = mesaj[camp]
+        secventa = self.bloc.termina_scrierea(contor)
+        if self.trezire is not None:
+            self.trezire.semnaleaza()
+        return secventa
+
+    def _mesaj(self, copie):
+        # mesajul reconstruit dintr-o copie a valorilor (obiect nou, cititorul il poate pastra)
+        if self.tip == "cadru":
+            cadru = CadruSenzori(0)
+            cadru.timestamp, cadru.medie, cadru.minim, cadru.maxim = (float(v) for v in copie[:4])
+            cadru.valori = array("d", copie[4:].tobytes())
+            return cadru
+        return dict(zip(CAMPURI_CANAL[self.tip], (float(v) for v in copie)))
+
+    def citeste_ultimul(self):
+        secventa, copie = self.bloc.citeste()
+        return secventa, (self._mesaj(copie) if secventa else None)
+
+    def ia_daca_nou(self, secventa_citita):
+        # verificarea ieftina (doar contorul) inainte de copiere: P o face la fiecare ciclu
+        if self.bloc.scrieri <= secventa_citita:
+            return secventa_citita, None
+        secventa, copie = self.bloc.citeste()
+        self.depasite += secventa - secventa_citita - 1
+        return secventa, self._mesaj(copie)
+
+    def asteapta_mai_nou(self, secventa_citita, timeout=None):
+        # cu trezire, dormim pe ea pana la o publicare noua; fara, verificam contorul la fiecare milisecunda
+        termen = None if timeout is None else time.monotonic() + timeout
+        while self.bloc.scrieri <= secventa_citita:
+            ramas = None if termen is None else termen - time.monotonic()
+            if ramas is not None and ramas <= 0:
+                break
+            if self.trezire is None:
+                time.sleep(0.001)
+                continue
+            generatie = self.trezire.generatie
+            if self.bloc.scrieri <= secventa_citita:
+                self.trezire.asteapta(generatie, ramas)
+        return self.ia_daca_nou(secventa_citita)
+
+    def goleste(self):
+        return self.bloc.scrieri
+
+    def inchide(self):
+        self.bloc.inchide()
+
+
+class StarePartajataMP(StarePartajata):
+    # StarePartajata intre procese: instantaneul curent sta intr-un BlocSecvential
+    # [versiune, mod (index MODURI), putere_manual, putere_curenta]. Cititorii (T, P) nu iau niciun lock;
+    # reconstruiesc InstantaneuStare doar cand s-a scris ceva nou, altfel intorc instantaneul deja citit.
+    # Scriitorii (S) folosesc regulile din StarePartajata, serializati de un multiprocessing.Lock.
+    __slots__ = ("bloc", "_citit")
+
+    def __init__(self, mod="automat", putere_manual=30.0, putere_curenta=0.0, nume=None, lock_scriere=None, lock_bloc=None):
+        self.bloc = BlocSecvential(4, nume, lock_bloc)
+        self._citit = (-1, None)
+        self._lock_scriere = lock_scriere if lock_scriere is not None else multiprocessing.Lock()
+        if nume is None:
+            self.curent = InstantaneuStare(0, mod, putere_manual, putere_curenta)
+
+    def __reduce__(self):
+        return (StarePartajataMP, ("automat", 0.0, 0.0, self.bloc.nume, self._lock_scriere, self.bloc.lock))
+
+    @property
+    def curent(self):
+        scrieri = self.bloc.scrieri
+        if scrieri == self._citit[0]:
+            return self._citit[1]
+        scrieri, (versiune, index_mod, putere_manual, putere_curenta) = self.bloc.citeste()
+        instantaneu = InstantaneuStare(int(versiune), MODURI[int(index_mod)], float(putere_manual), float(putere_curenta))
+        self._citit = (scrieri, instantaneu)
+        return instantaneu
+
+    @curent.setter
+    def curent(self, instantaneu):
+        # apelat doar din _publica / __init__ (cu _lock_scriere luat, sau inainte sa existe alti scriitori)
+        valori = self.bloc.valori
+        contor = self.bloc.incepe_scrierea()
+        valori[0] = instantaneu.versiune
+        valori[1] = MODURI.index(instantaneu.mod)
+        valori[2] = instantaneu.putere_manual
+        valori[3] = instantaneu.putere_curenta
+        self.bloc.termina_scrierea(contor)
+
+    def inchide(self):
+        self.bloc.inchide()
+
+
+def ocupa_cpu(stop_event):
+    # calcul pur Python (tine GIL-ul procesului) pana la oprire; simuleaza un S incarcat in benchmark_izolare
+    x = 0
+    while not stop_event.is_set():
+        for i in range(10_000):
+            x += i * i
+
+
+def proces_task(nume, configurare, stare, canale, q_evenimente_sw, stop_event, lock_consola, trezire_s, rezultate=None,
+                incarcare_cpu=False, afiseaza=True):
+    # corpul unui proces din backend-ul multiproces: ruleaza task-ul "T", "P" sau "S" pana la oprire
+    # canale - dict cu CanalPartajat-urile "temperaturi", "comenzi_automat", "presiune"
+    # trezire_s - TrezireMP pe care doarme S (semnalata de canalul temperaturilor, de SW si la oprire)
+    # rezultate - optional, o multiprocessing.Queue in care T si P pun statisticile de timp la oprire,
+    #             iar S numarul de treziri si durata
+    # incarcare_cpu - porneste si un fir ocupa_cpu in acest proces (benchmark_izolare il pune in S)
+    # afiseaza - False ca S sa nu mai scrie la consola (benchmark)
+
+    # dupa fork, toate procesele ar porni cu aceeasi stare a generatorului de zgomot
+    random.seed()
+    if not afiseaza:
+        sys.stdout = open(os.devnull, "w")
+    if incarcare_cpu:
+        threading.Thread(target=ocupa_cpu, args=(stop_event,), daemon=True).start()
+
+    statistici = creeaza_statistici(configurare)
+    memorie_s = memorie_initiala_s(CEAS_REAL)
+    inceput = time.monotonic()
+    try:
+        if nume == "T":
+            task_t(configurare, stare, canale["temperaturi"], stop_event, CEAS_REAL, random, statistici["T"])
+        elif nume == "P":
+            task_p(configurare, stare, canale["comenzi_automat"], canale["presiune"], stop_event, CEAS_REAL, random, statistici["P"])
+        else:
+            task_s(configurare, stare, q_evenimente_sw, canale["temperaturi"], canale["comenzi_automat"], canale["presiune"],
+                   stop_event, lock_consola, CEAS_REAL, trezire_s, memorie_s)
+    except KeyboardInterrupt:
+        # Ctrl-C ajunge la tot grupul de procese; procesul principal opreste restul prin stop_event
+        opreste(stop_event, trezire_s)
+
+    if rezultate is not None:
+        if nume in statistici:
+            rezultate.put(statistici[nume].instantaneu())
+        else:
+            rezultate.put({"nume": nume, "treziri": memorie_s["treziri"], "durata": time.monotonic() - inceput})
+
+
+def porneste_procese(configurare, stop_event, lock_consola, q_evenimente_sw, rezultate=None, incarcare_s=False, afiseaza=True):
+    # creeaza memoria partajata si porneste procesele T / P / S; intoarce (procese, stare, canale, trezire_s)
+    # q_evenimente_sw - o CoadaEvenimenteMP; dupa fiecare comanda, SW semnaleaza trezire_s
+    # procesul principal e proprietarul blocurilor: le sterge inchide_procese
+    stare = StarePartajataMP(mod="automat", putere_manual=30.0, putere_curenta=0.0)
+    trezire_s = TrezireMP()
+    canale = {
+        "temperaturi": CanalPartajat("cadru", configurare["numar_TC"], trezire=trezire_s),
+        "comenzi_automat": CanalPartajat("comanda"),
+        "presiune": CanalPartajat("presiune"),
+    }
+    procese = []
+    for nume in ("T", "P", "S"):
+        procese.append(multiprocessing.Process(
+            target=proces_task, name=nume, daemon=True,
+            args=(nume, configurare, stare, canale, q_evenimente_sw, stop_event, lock_consola, trezire_s, rezultate,
+                  incarcare_s and nume == "S", afiseaza)))
+    for proces in procese:
+        proces.start()
+    return procese, stare, canale, trezire_s
+
+
+def inchide_procese(procese, stare, canale, rezultate=None, timeout=2.0):
+    # asteapta procesele (dupa opreste), strange statisticile si elibereaza memoria partajata
+    # intoarce {"T": instantaneu, "P": instantaneu, "S": {"treziri", "durata"}} (doar ce a apucat sa trimita fiecare proces)
+    statistici = {}
+    if rezultate is not None:
+        for _ in procese:
+            try:
+                instantaneu = rezultate.get(timeout=timeout)
+            except queue.Empty:
+                break
+            statistici[instantaneu["nume"]] = instantaneu
+    for proces in procese:
+        proces.join(timeout=timeout)
+        if proces.is_alive():
+            proces.terminate()
+            proces.join()
+    for canal in canale.values():
+        canal.inchide()
+    stare.inchide()
+    return statistici
+
+
+def main_multiproces(configurare):
+    # T, P si S in procese separate, SW in procesul principal; intoarce statisticile T / P
+    stop_event = multiprocessing.Event()
+    lock_consola = multiprocessing.Lock()
+    q_evenimente_sw = CoadaEvenimenteMP()
+    rezultate = multiprocessing.Queue()
+
+    procese, stare, canale, trezire_s = porneste_procese(configurare, stop_event, lock_consola, q_evenimente_sw, rezultate)
+
+    # SW intr-un thread daemon, ca input() blocat sa nu tina procesul principal dupa oprire
+    th_sw = threading.Thread(target=task_sw, name="SW", args=(q_evenimente_sw, stop_event, lock_consola, trezire_s), daemon=True)
+    th_sw.start()
+
+    try:
+        while not stop_event.is_set():
+            stop_event.wait(timeout=0.5)
+    except KeyboardInterrupt:
+        opreste(stop_event, trezire_s)
+
+    return inchide_procese(procese, stare, canale, rezultate)
@@ -0,0 +1,201 @@
+# ---------------------------------------------------------------------------
+# Motor vectorizat multi-camera
+# ---------------------------------------------------------------------------
+# Un set de 4 thread-uri per camera nu scaleaza peste cateva zeci de camere (GIL + comutare de context).
+# Motorul tine starea tuturor camerelor in vectori NumPy (un element = o camera) si avanseaza
+# toate camerele odata: actualizarea termica din task_t, decizia din calcul_putere_mod_automat (S)
+# si actualizarea presiune/valva din task_p.
+# numpy se importa doar in functiile motorului, scriptul de baza ramane fara dependinte externe.
+from heating_control import CONFORTURI, CONFORT_NECUNOSCUT, MODURI, calcul_putere_mod_automat
+
+
+def creeaza_camere(configurare, numar_camere, seed=None, cuplaj=None):
+    # starea initiala a tuturor camerelor, la fel ca la pornirea thread-urilor:
+    # temperatura_baza = ambient, presiune = referinta, mod automat, putere 0
+    # cuplaj - optional, cuplajul termic dintre camere (vezi cuplaj_cladire); fara el camerele sunt izolate
+    # P foloseste pragurile fixe din task_p; SupervizorPresiune nu e implementat pe vectori
+    import numpy as np
+
+    if configurare["supervizor_presiune"]:
+        raise ValueError("motorul multi-camera nu suporta supervizor_presiune (doar pragurile fixe)")
+
+    return {
+        "rng": np.random.default_rng(seed),
+        "cuplaj": cuplaj,
+        "temperatura_baza": np.full(numar_camere, configurare["temperatura_ambient"], dtype=np.float64),
+        "presiune": np.full(numar_camere, configurare["presiune_referinta"], dtype=np.float64),
+        "valva": np.zeros(numar_camere, dtype=np.float64),
+        "mod": np.zeros(numar_camere, dtype=np.int8),  # index in MODURI
+        "putere_manual": np.full(numar_camere, 30.0, dtype=np.float64),
+        "putere_curenta": np.zeros(numar_camere, dtype=np.float64),
+        "t_medie": np.full(numar_camere, float("nan"), dtype=np.float64),
+        "confort": np.full(numar_camere, CONFORT_NECUNOSCUT, dtype=np.int8),  # index in CONFORTURI
+        "fractiune_p": 0.0,  # pasi P inca nerulati din perioadele T anterioare (vezi pas_camere)
+    }
+
+
+def seteaza_mod_camere(camere, indici, mod):
+    # echivalentul evenimentului SW "set_mod" pentru un grup de camere (indici = slice, masca sau lista)
+    # la trecerea in manual, puterea curenta devine puterea manuala (ca in task_s)
+    if mod not in ("automat", "manual"):
+        raise ValueError(f"motorul multi-camera nu suporta modul {mod!r} (doar automat / manual)")
+    cod = MODURI.index(mod)
+    camere["mod"][indici] = cod
+    if mod == "manual":
+        camere["putere_curenta"][indici] = camere["putere_manual"][indici]
+
+
+def seteaza_putere_manual_camere(camere, indici, putere):
+    # echivalentul evenimentului SW "set_putere_manual"; in manual puterea se aplica imediat
+    import numpy as np
+
+    camere["putere_manual"][indici] = np.clip(putere, 0.0, 100.0)
+    manual = camere["mod"] == MODURI.index("manual")
+    camere["putere_curenta"][manual] = camere["putere_manual"][manual]
+
+
+def pas_camere(configurare, camere):
+    # un pas pentru toate camerele, de durata perioada_T: T (model termic + termocupluri), S (confort + putere
+    # automata) si pasii P din acest interval (presiune + valva)
+    import numpy as np
+
+    rng = camere["rng"]
+    temperatura_baza = camere["temperatura_baza"]
+    presiune = camere["presiune"]
+    putere_curenta = camere["putere_curenta"]
+    numar_camere = temperatura_baza.shape[0]
+
+    # schimbul de caldura cu vecinii si cu exteriorul, din temperaturile de la inceputul pasului (un produs CSR)
+    cuplaj = camere["cuplaj"]
+    if cuplaj is not None:
+        flux = cuplaj["matrice"].inmulteste(temperatura_baza)
+        flux += cuplaj["aport_exterior"]
+
+    # T: temperatura_baza se apropie de ambient + delta_max*(putere/100)
+    temperatura_tinta = configurare["temperatura_ambient"] + configurare["delta_max_incalzire"] * (putere_curenta / 100.0)
+    temperatura_baza += configurare["viteza_raspuns_temperatura"] * (temperatura_tinta - temperatura_baza)
+    if cuplaj is not None:
+        temperatura_baza += flux
+
+    # S vede doar media termocuplurilor, deci generam zgomotul pe toate odata si il mediem pe camera
+    zgomot = rng.uniform(-0.15, 0.15, size=(numar_camere, configurare["numar_TC"])).mean(axis=1)
+    t_medie = np.add(temperatura_baza, zgomot, out=camere["t_medie"])
+
+    # S: confortul si puterea automata; calcul_putere_mod_automat merge direct pe vectori
+    t_ref = configurare["temperatura_referinta"]
+    banda = configurare["banda_confort"]
+    confort = camere["confort"]
+    confort.fill(CONFORTURI.index("confortabil"))
+    confort[t_medie < (t_ref - banda)] = CONFORTURI.index("rece")
+    confort[t_medie > (t_ref + banda)] = CONFORTURI.index("cald")
+
+    putere_auto = np.clip(calcul_putere_mod_automat(t_medie, t_ref, configurare["k_automat"], configurare["putere_baza_automat"]), 0.0, 100.0)
+    np.copyto(putere_curenta, np.where(camere["mod"] == MODURI.index("automat"), putere_auto, camere["putere_manual"]))
+
+    # P: crestere cu puterea + diminuare spre referinta, apoi valva pe praguri
+    # Constantele presiunii sunt date pe o perioada_P, iar un pas de motor e o perioada_T, deci rulam atatia
+    # pasi P cati incap in perioada_T (ca task_p intre doua activari T), cu puterea fixa pe tot pasul.
+    # Cand raportul nu e intreg (0.5 / 0.2 implicit) restul se reporteaza: 2, 3, 2, 3, ... pasi P, in medie 2.5
+    camere["fractiune_p"] += configurare["perioada_T"] / configurare["perioada_P"]
+    pasi_p = int(camere["fractiune_p"] + 1e-9)
+    camere["fractiune_p"] -= pasi_p
+    valva = camere["valva"]
+    for _ in range(pasi_p):
+        presiune += configurare["crestere_presiune"] * (putere_curenta / 100.0) + configurare["revenire_presiune"] * (configurare["presiune_referinta"] - presiune)
+
+        valva.fill(0.0)
+        valva[presiune > configurare["presiune_referinta"] + 0.3] = 0.6
+        valva[presiune > configurare["presiune_maxima_siguranta"]] = 1.0
+
+        presiune -= configurare["descarcare_valva"] * valva
+        presiune += rng.uniform(-0.01, 0.01, size=numar_camere)
+
+
+# ---------------------------------------------------------------------------
+# Cladire multi-zona (camere cuplate termic)
+# ---------------------------------------------------------------------------
+# In modelul din task_t fiecare camera e izolata. Intr-o cladire, caldura trece prin pereti si plansee
+# intre zonele vecine si spre exterior. Cuplajul e o matrice rara de conductante (CSR), aplicata cu un
+# singur produs matrice-vector pe pas, peste actualizarea termica a fiecarei zone din pas_camere:
+#   T[i] += sum_j g[i, j] * (T[j] - T[i]) + g_ext[i] * (temperatura_exterior - T[i])
+# Fiecare zona isi pastreaza controlul T / S / P din pas_camere (mod, putere manuala, presiune, valva).
+
+class MatriceCSR:
+    # matrice rara in format CSR (randuri comprimate), doar cu NumPy
+    # randuri - randul fiecarei valori nenule (indptr despachetat), pentru produsul cu np.bincount
+    __slots__ = ("indptr", "indici", "valori", "randuri", "numar_randuri")
+
+    def __init__(self, indptr, indici, valori):
+        import numpy as np
+
+        self.indptr = indptr
+        self.indici = indici
+        self.valori = valori
+        self.numar_randuri = indptr.shape[0] - 1
+        self.randuri = np.repeat(np.arange(self.numar_randuri, dtype=np.int32), np.diff(indptr))
+
+    @classmethod
+    def din_coordonate(cls, numar_randuri, randuri, coloane, valori):
+        # construieste matricea din triplete (rand, coloana, valoare); valorile duplicate se aduna
+        import numpy as np
+
+        ordine = np.lexsort((coloane, randuri))
+        randuri, coloane, valori = randuri[ordine], coloane[ordine], valori[ordine]
+        unice = np.ones(randuri.shape[0], dtype=bool)
+        unice[1:] = (randuri[1:] != randuri[:-1]) | (coloane[1:] != coloane[:-1])
+        inceputuri = np.flatnonzero(unice)
+        valori = np.add.reduceat(valori, inceputuri) if inceputuri.size else valori
+        randuri, coloane = randuri[inceputuri], coloane[inceputuri]
+        indptr = np.zeros(numar_randuri + 1, dtype=np.int64)
+        np.cumsum(np.bincount(randuri, minlength=numar_randuri), out=indptr[1:])
+        return cls(indptr, coloane.astype(np.int32), valori.astype(np.float64))
+
+    def inmulteste(self, x):
+        # y = A @ x
+        import numpy as np
+
+        return np.bincount(self.randuri, weights=self.valori * x[self.indici], minlength=self.numar_randuri)
+
+
+def cuplaj_cladire(configurare, latime, adancime, etaje):
+    # cuplajul termic al unei cladiri paralelipipedice de latime x adancime x etaje zone
+    # (zona (etaj, y, x) are indicele (etaj * adancime + y) * latime + x)
+    #   vecinii pe acelasi etaj schimba caldura prin conductanta_perete, cei de pe etaje alaturate prin conductanta_planseu
+    #   fiecare fata spre exterior (pereti de margine, acoperis) adauga conductanta_exterior spre temperatura_exterior
+    # intoarce {"matrice": MatriceCSR cu diagonala -sum(conductante), "aport_exterior": g_ext * temperatura_exterior}
+    import numpy as np
+
+    numar_zone = latime * adancime * etaje
+    grila = np.arange(numar_zone).reshape(etaje, adancime, latime)
+    g_perete = configurare["conductanta_perete"]
+    g_planseu = configurare["conductanta_planseu"]
+    g_exterior = configurare["conductanta_exterior"]
+
+    perechi = [
+        (grila[:, :, :-1].ravel(), grila[:, :, 1:].ravel(), g_perete),
+        (grila[:, :-1, :].ravel(), grila[:, 1:, :].ravel(), g_perete),
+        (grila[:-1, :, :].ravel(), grila[1:, :, :].ravel(), g_planseu),
+    ]
+
+    # fetele spre exterior ale fiecarei zone
+    z, y, x = np.meshgrid(np.arange(etaje), np.arange(adancime), np.arange(latime), indexing="ij")
+    fete = ((x == 0).astype(np.int8) + (x == latime - 1) + (y == 0) + (y == adancime - 1) + (z == etaje - 1)).ravel()
+    conductanta_exterior = g_exterior * fete
+
+    randuri = [np.arange(numar_zone)]
+    coloane = [np.arange(numar_zone)]
+    valori = [-conductanta_exterior]
+    for a, b, g in perechi:
+        for sursa, destinatie in ((a, b), (b, a)):
+            randuri += [sursa, sursa]
+            coloane += [destinatie, sursa]
+            valori += [np.full(sursa.shape[0], g), np.full(sursa.shape[0], -g)]
+    matrice = MatriceCSR.din_coordonate(numar_zone, np.concatenate(randuri), np.concatenate(coloane), np.concatenate(valori))
+
+    # pas explicit: stabil doar daca o zona nu pierde intr-un pas mai mult decat diferenta de temperatura
+    diagonala = matrice.valori[matrice.indici == matrice.randuri]
+    pierdere_maxima = configurare["viteza_raspuns_temperatura"] - float(diagonala.min())
+    if pierdere_maxima >= 1.0:
+        raise ValueError(f"conductantele sunt prea mari pentru un pas T (viteza + suma conductantelor = {pierdere_maxima:.2f} >= 1)")
+
+    return {"matrice": matrice, "aport_exterior": conductanta_exterior * configurare["temperatura_exterior"]}
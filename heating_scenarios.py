@@ -0,0 +1,290 @@
+# ---------------------------------------------------------------------------
+# Scenarii de regresie (fara consola) si referinte de performanta
+# ---------------------------------------------------------------------------
+# Scenariile din README (capturile scenario-1..4) ruleaza ca simulari pe timp virtual: comenzile SW sunt date
+# ca lista (moment, linie) si trec prin interpreteaza_comanda_sw, ca la tastatura. Se pastreaza seria completa
+# de timp (P dupa fiecare pas_p, S la fiecare afisare) si se verifica proprietatile de control.
+# Separat se masoara cateva metrici de viteza si se compara cu un fisier de referinta (JSON), cu o marja.
+import json
+import os
+import random
+import time
+from array import array
+
+from heating_control import (
+    CeasVirtual, CutiePostala, MODURI, StarePartajata, configurare_implicita, memorie_initiala_p, memorie_initiala_s,
+    memorie_initiala_t, pas_p, pas_s, pas_t, simuleaza_virtual,
+)
+from heating_sweep import salveaza_coloane
+
+
+class InregistratorScenariu:
+    # observator_p pentru simuleaza_virtual: seria de timp a lui P (un rand dupa fiecare pas_p) plus
+    # verificarile care trebuie sa tina in orice scenariu:
+    #   presiunea nu sta peste presiune_maxima_siguranta mai mult de timp_maxim_peste_siguranta secunde
+    #   in manual, P aplica exact puterea manuala
+    #   P nu aplica o comanda automata publicata inainte de ultima intrare in manual (golirea din pas_p)
+    def __init__(self, configurare):
+        self.presiune_maxima = configurare["presiune_maxima_siguranta"]
+        self.timp_maxim_peste = configurare["timp_maxim_peste_siguranta"]
+        self.serie = {nume: array("d") for nume in ("timp", "mod", "putere", "presiune", "valva")}
+        self.erori = []
+        self.inceput_peste = None      # momentul din care presiunea e continuu peste prag
+        self.raportat_peste = False    # un singur mesaj de eroare per episod
+        self.intrare_manual = float("-inf")
+        self.mod_anterior = None
+
+    def __call__(self, moment, instantaneu, memorie_p):
+        presiune = memorie_p["presiune"]
+        putere = memorie_p["putere_aplicata"]
+        serie = self.serie
+        serie["timp"].append(moment)
+        serie["mod"].append(MODURI.index(instantaneu.mod))
+        serie["putere"].append(putere)
+        serie["presiune"].append(presiune)
+        serie["valva"].append(memorie_p["actiune_valva"])
+
+        if presiune > self.presiune_maxima:
+            if self.inceput_peste is None:
+                self.inceput_peste = moment
+                self.raportat_peste = False
+            if moment - self.inceput_peste > self.timp_maxim_peste and not self.raportat_peste:
+                self.erori.append(f"t={moment:.1f} s: presiunea sta peste {self.presiune_maxima} de la t={self.inceput_peste:.1f} s")
+                self.raportat_peste = True
+        else:
+            self.inceput_peste = None
+
+        if instantaneu.mod == "manual":
+            if self.mod_anterior != "manual":
+                self.intrare_manual = moment
+            if putere != instantaneu.putere_manual:
+                self.erori.append(f"t={moment:.1f} s: in manual P aplica {putere:.1f}% in loc de {instantaneu.putere_manual:.1f}%")
+        self.mod_anterior = instantaneu.mod
+
+        comanda = memorie_p["comanda_aplicata"]
+        if comanda is not None and comanda["timestamp"] < self.intrare_manual:
+            self.erori.append(f"t={moment:.1f} s: P a aplicat comanda automata veche de la t={comanda['timestamp']:.1f} s "
+                              f"(intrare in manual la t={self.intrare_manual:.1f} s)")
+
+
+def coloane_afisari(afisari):
+    # seria lui S (cate un rand per afisare) pe coloane, ca sa poata fi salvata cu salveaza_coloane
+    coloane = {nume: array("d") for nume in ("timp", "mod", "t_medie", "putere", "presiune", "valva")}
+    for afisare in afisari:
+        coloane["timp"].append(afisare["timp"])
+        coloane["mod"].append(MODURI.index(afisare["mod"]))
+        for nume in ("t_medie", "putere", "presiune", "valva"):
+            coloane[nume].append(afisare[nume])
+    return coloane
+
+
+def verifica_automat(configurare, scenariu, afisari, serie_p):
+    # Scenariul 1: pornind de sub banda, temperatura ajunge in banda de confort si puterea scade
+    erori = []
+    ultima = afisari[-1]
+    if abs(ultima["t_medie"] - configurare["temperatura_referinta"]) > configurare["banda_confort"]:
+        erori.append(f"la final t_medie={ultima['t_medie']:.2f} C, in afara benzii de confort")
+    prima = next(a for a in afisari if a["t_medie"] == a["t_medie"])
+    if ultima["putere"] >= prima["putere"]:
+        erori.append(f"puterea nu a scazut: {prima['putere']:.1f}% -> {ultima['putere']:.1f}%")
+    return erori
+
+
+def verifica_manual(configurare, scenariu, afisari, serie_p):
+    # Scenariul 2: dupa "m" si "p <putere>", S afiseaza mereu modul manual si puterea ceruta
+    moment, linie = scenariu["comenzi"][-1]
+    putere = float(linie.split()[1])
+    gresite = [a for a in afisari if a["timp"] > moment and (a["mod"] != "manual" or a["putere"] != putere)]
+    if gresite:
+        a = gresite[0]
+        return [f"t={a['timp']:.1f} s: afisat mod={a['mod']} putere={a['putere']:.1f}%, asteptat manual {putere:.1f}% "
+                f"({len(gresite)} afisari gresite)"]
+    return []
+
+
+def verifica_presiune(configurare, scenariu, afisari, serie_p):
+    # Scenariul 3: la p 100 in manual temperatura trece de banda, iar P deschide valva complet
+    erori = []
+    if max(serie_p["valva"]) < 1.0:
+        erori.append("valva nu s-a deschis complet")
+    if afisari[-1]["t_medie"] <= configurare["temperatura_referinta"] + configurare["banda_confort"]:
+        erori.append(f"la final t_medie={afisari[-1]['t_medie']:.2f} C, asteptat peste banda de confort")
+    return erori
+
+
+def verifica_revenire_automat(configurare, scenariu, afisari, serie_p):
+    # Scenariul 4: dupa supraincalzire in manual, "a" readuce modul automat, puterea scade si temperatura revine in banda
+    moment = scenariu["comenzi"][-1][0]
+    dupa = [a for a in afisari if a["timp"] > moment]
+    erori = []
+    if any(a["mod"] != "automat" for a in dupa):
+        erori.append("dupa 'a' modul nu a ramas automat")
+    if dupa and dupa[0]["putere"] >= 100.0:
+        erori.append(f"dupa 'a' puterea a ramas {dupa[0]['putere']:.1f}%")
+    if dupa and abs(dupa[-1]["t_medie"] - configurare["temperatura_referinta"]) > configurare["banda_confort"]:
+        erori.append(f"la final t_medie={dupa[-1]['t_medie']:.2f} C, in afara benzii de confort")
+    return erori
+
+
+# scenariile din README: (nume, durata simulata, comenzi SW, verificarea specifica)
+SCENARII = (
+    ("automat", 600.0, (), verifica_automat),
+    ("manual_40", 300.0, ((60.0, "m"), (60.0, "p 40")), verifica_manual),
+    ("presiune_p100", 600.0, ((30.0, "m"), (30.0, "p 100")), verifica_presiune),
+    ("revenire_automat", 900.0, ((30.0, "m"), (30.0, "p 100"), (300.0, "a")), verifica_revenire_automat),
+)
+
+
+def ruleaza_scenariu(configurare, scenariu, seed=0):
+    # intoarce {"nume", "erori", "serie_p", "serie_s"}; erori goala = scenariul a trecut
+    nume, durata, comenzi, verifica = scenariu
+    inregistrator = InregistratorScenariu(configurare)
+    afisari = simuleaza_virtual(configurare, durata, comenzi, seed=seed, observator_p=inregistrator)
+    scenariu_dict = {"nume": nume, "durata": durata, "comenzi": comenzi}
+    erori = inregistrator.erori + verifica(configurare, scenariu_dict, afisari, inregistrator.serie)
+    return {"nume": nume, "erori": erori, "serie_p": inregistrator.serie, "serie_s": coloane_afisari(afisari)}
+
+
+def verifica_golire_comenzi(configurare):
+    # intercalarea pe care simularea nu o produce (acolo S publica imediat dupa orice comanda SW): S a publicat
+    # o comanda automata, SW trece in manual si inapoi in automat, iar P ruleaza inainte ca S sa publice alta.
+    # P nu are voie sa aplice comanda de dinainte de manual; intoarce erorile gasite de InregistratorScenariu
+    ceas = CeasVirtual()
+    stare = StarePartajata()
+    q_comenzi_automat, q_presiune = CutiePostala(), CutiePostala()
+    memorie_p = memorie_initiala_p(configurare)
+    inregistrator = InregistratorScenariu(configurare)
+    rng = random.Random(0)
+
+    def ruleaza_p(moment):
+        ceas.timp = moment
+        pas_p(configurare, memorie_p, stare, q_comenzi_automat, q_presiune, ceas, rng)
+        inregistrator(moment, stare.citeste(), memorie_p)
+
+    ruleaza_p(0.0)
+    q_comenzi_automat.publica({"timestamp": 0.1, "putere": 90.0})
+    stare.seteaza_mod("manual")
+    ruleaza_p(0.2)
+    stare.seteaza_mod("automat")
+    ruleaza_p(0.4)
+    return inregistrator.erori
+
+
+# metrici de performanta: nume -> True daca o valoare mai mare e mai buna
+METRICI_PERFORMANTA = {
+    "simulare_s_pe_s": True,     # secunde simulate pe secunda reala (simuleaza_virtual, scenariul 4)
+    "cutie_mesaje_pe_s": True,   # publica + ia_daca_nou pe CutiePostala, acelasi thread
+    "pas_p_us": False,           # durata medie a unui pas_p
+    "decizie_s_us": False,       # durata medie a unui pas_s cu temperatura noua (mod automat)
+}
+
+
+def masoara_performanta(configurare=None, repetari=5):
+    # cea mai buna valoare din `repetari` masuratori pentru fiecare metrica din METRICI_PERFORMANTA
+    configurare = configurare or configurare_implicita()
+
+    def simulare():
+        _, durata, comenzi, _ = SCENARII[-1]
+        t0 = time.perf_counter()
+        simuleaza_virtual(configurare, durata, comenzi)
+        return durata / (time.perf_counter() - t0)
+
+    def cutie(mesaje=100_000):
+        cutie = CutiePostala()
+        secventa = 0
+        mesaj = {"timestamp": 0.0, "putere": 50.0}
+        t0 = time.perf_counter()
+        for _ in range(mesaje):
+            cutie.publica(mesaj)
+            secventa, _ = cutie.ia_daca_nou(secventa)
+        return mesaje / (time.perf_counter() - t0)
+
+    def pas_p_us(pasi=20_000):
+        ceas = CeasVirtual()
+        memorie = memorie_initiala_p(configurare)
+        stare, q_comenzi_automat, q_presiune = StarePartajata(), CutiePostala(), CutiePostala()
+        rng = random.Random(0)
+        t0 = time.perf_counter()
+        for _ in range(pasi):
+            pas_p(configurare, memorie, stare, q_comenzi_automat, q_presiune, ceas, rng)
+        return (time.perf_counter() - t0) / pasi * 1e6
+
+    def decizie_s_us(pasi=5_000):
+        ceas = CeasVirtual()
+        rng = random.Random(0)
+        stare = StarePartajata()
+        q_temperaturi, q_comenzi_automat, q_presiune = CutiePostala(), CutiePostala(), CutiePostala()
+        memorie_t = memorie_initiala_t(configurare)
+        memorie_s = memorie_initiala_s(ceas)
+        total = 0.0
+        for _ in range(pasi):
+            ceas.timp += configurare["perioada_T"]
+            pas_t(configurare, memorie_t, stare, q_temperaturi, ceas, rng)
+            t0 = time.perf_counter()
+            pas_s(configurare, memorie_s, stare, q_temperaturi, q_comenzi_automat, q_presiune, ceas)
+            total += time.perf_counter() - t0
+        return total / pasi * 1e6
+
+    masuratori = {"simulare_s_pe_s": simulare, "cutie_mesaje_pe_s": cutie, "pas_p_us": pas_p_us, "decizie_s_us": decizie_s_us}
+    rezultat = {}
+    for nume, masoara in masuratori.items():
+        valori = [masoara() for _ in range(repetari)]
+        rezultat[nume] = max(valori) if METRICI_PERFORMANTA[nume] else min(valori)
+    return rezultat
+
+
+def compara_performanta(masurat, referinta, marja):
+    # erorile pentru metricile care au regresat cu mai mult de marja (fractiune, ex. 0.25 = 25%) fata de referinta
+    erori = []
+    for nume, mai_mare_e_mai_bine in METRICI_PERFORMANTA.items():
+        if nume not in referinta or nume not in masurat:
+            continue
+        valoare, baza = masurat[nume], referinta[nume]
+        if mai_mare_e_mai_bine and valoare < baza * (1.0 - marja):
+            erori.append(f"{nume}: {valoare:.4g} < {baza:.4g} - {marja:.0%}")
+        elif not mai_mare_e_mai_bine and valoare > baza * (1.0 + marja):
+            erori.append(f"{nume}: {valoare:.4g} > {baza:.4g} + {marja:.0%}")
+    return erori
+
+
+def ruleaza_regresie(referinta=None, marja=0.25, actualizeaza=False, serii=None, seed=0):
+    # ruleaza toate SCENARII si masoara performanta; intoarce True daca totul a trecut
+    # referinta - fisier JSON cu metricile de referinta; daca nu exista (sau actualizeaza=True) se scrie cu valorile masurate
+    # serii - optional, prefix: seriile fiecarui scenariu se salveaza in <prefix>.<scenariu>.p.col / .s.col
+    configurare = configurare_implicita()
+    rezultate = []
+    for scenariu in SCENARII:
+        rezultat = ruleaza_scenariu(configurare, scenariu, seed)
+        rezultate.append((rezultat["nume"], rezultat["erori"]))
+        if serii:
+            salveaza_coloane(f"{serii}.{rezultat['nume']}.p.col", rezultat["serie_p"])
+            salveaza_coloane(f"{serii}.{rezultat['nume']}.s.col", rezultat["serie_s"])
+    rezultate.append(("golire_comenzi_p", verifica_golire_comenzi(configurare)))
+
+    ok = True
+    for nume, erori in rezultate:
+        print(f"[scenariu] {nume:<18s} {'OK' if not erori else 'ESUAT'}")
+        for eroare in erori:
+            print(f"    {eroare}")
+        ok = ok and not erori
+
+    masurat = masoara_performanta(configurare)
+    valori_referinta = {}
+    if referinta and os.path.exists(referinta) and not actualizeaza:
+        with open(referinta) as fisier:
+            valori_referinta = json.load(fisier)
+
+    for nume, valoare in masurat.items():
+        baza = valori_referinta.get(nume)
+        fata_de = f" (referinta {baza:.4g})" if baza is not None else ""
+        print(f"[performanta] {nume:<18s} {valoare:12.4g}{fata_de}")
+    erori = compara_performanta(masurat, valori_referinta, marja)
+    for eroare in erori:
+        print(f"[performanta] REGRESIE {eroare}")
+    ok = ok and not erori
+
+    if referinta and (actualizeaza or not valori_referinta):
+        with open(referinta, "w") as fisier:
+            json.dump(masurat, fisier, indent=2)
+        print(f"[performanta] referinta scrisa in {referinta}")
+    return ok
@@ -0,0 +1,260 @@
+# ---------------------------------------------------------------------------
+# Server de control (comenzi SW prin socket local)
+# ---------------------------------------------------------------------------
+# Pe langa SW de la tastatura, mai multi clienti pot comanda camerele printr-un socket TCP sau Unix.
+# Protocolul e pe linii de text; o linie contine una sau mai multe parti separate prin ";", executate in ordine:
+#   a | m | mpc | p <0..100> | q          - comenzile SW, trimise tuturor camerelor
+#   camere <lista> <comanda SW>            - comanda doar pentru camerele din lista (ex: "camere 0-9,15 p 40")
+#   stare [lista]                          - starea camerelor (dupa ce partile anterioare din linie au fost aplicate)
+#   abonare <perioada_s> [lista]           - starea camerelor trimisa periodic, pana la "dezabonare"
+#   dezabonare
+# Fiecare linie primeste un singur raspuns JSON, trimis abia dupa ce S a aplicat toate comenzile din linie:
+#   {"ok": true, "aplicate": 3, "stare": [...]}  sau  {"ok": false, "eroare": "..."}
+# iar abonarile primesc linii {"flux": [...], "timp": ...}.
+# Comenzile ajung in q_evenimente_sw (coada nelimitata, nu se pierde nimic) cu o functie "confirmare",
+# apelata de proceseaza_evenimente_sw dupa aplicare.
+import asyncio
+import json
+import os
+import threading
+import time
+
+from heating_control import calcul_confort, interpreteaza_comanda_sw
+
+
+PERIOADA_MINIMA_ABONARE = 0.01
+
+
+class CameraControlata:
+    # ce ii trebuie serverului de control ca sa comande si sa citeasca o camera
+    __slots__ = ("stare", "q_evenimente_sw", "trezire", "memorie_s")
+
+    def __init__(self, stare, q_evenimente_sw, trezire, memorie_s):
+        self.stare = stare  # StarePartajata
+        self.q_evenimente_sw = q_evenimente_sw
+        self.trezire = trezire  # Trezire (S pe thread) sau TrezireAsync (S pe aceeasi bucla cu serverul)
+        self.memorie_s = memorie_s
+
+
+def interpreteaza_lista_camere(text, numar_camere):
+    # "3", "0-9", "0-9,15,20-22" sau "*" -> lista de indici; ValueError daca nu e valida
+    if text == "*":
+        return list(range(numar_camere))
+    indici = []
+    for bucata in text.split(","):
+        inceput, _, sfarsit = bucata.partition("-")
+        inceput = int(inceput)
+        sfarsit = int(sfarsit) if sfarsit else inceput
+        if not 0 <= inceput <= sfarsit < numar_camere:
+            raise ValueError(f"camere in afara intervalului 0..{numar_camere - 1}: {bucata}")
+        indici.extend(range(inceput, sfarsit + 1))
+    return indici
+
+
+def interpreteaza_cerere_control(linie, numar_camere):
+    # transforma o linie de la un client in lista de operatii, fara sa aplice nimic
+    # intoarce (operatii, None) sau (None, mesaj_eroare); operatiile sunt tupluri:
+    #   ("comanda", eveniment, indici) / ("stare", indici) / ("abonare", perioada, indici) / ("dezabonare",)
+    toate = list(range(numar_camere))
+    operatii = []
+    for parte in linie.split(";"):
+        cuvinte = parte.split()
+        if not cuvinte:
+            continue
+        cuvant = cuvinte[0].lower()
+        try:
+            if cuvant == "stare":
+                if len(cuvinte) > 2:
+                    return None, "Format corect: stare [lista]"
+                operatii.append(("stare", interpreteaza_lista_camere(cuvinte[1], numar_camere) if len(cuvinte) == 2 else toate))
+                continue
+            if cuvant == "abonare":
+                if len(cuvinte) not in (2, 3):
+                    return None, "Format corect: abonare <perioada_s> [lista]"
+                perioada = max(float(cuvinte[1]), PERIOADA_MINIMA_ABONARE)
+                indici = interpreteaza_lista_camere(cuvinte[2], numar_camere) if len(cuvinte) == 3 else toate
+                operatii.append(("abonare", perioada, indici))
+                continue
+            if cuvant == "dezabonare":
+                operatii.append(("dezabonare",))
+                continue
+            indici = toate
+            if cuvant == "camere":
+                if len(cuvinte) < 3:
+                    return None, "Format corect: camere <lista> <comanda>"
+                indici = interpreteaza_lista_camere(cuvinte[1], numar_camere)
+                cuvinte = cuvinte[2:]
+        except ValueError as eroare:
+            return None, str(eroare)
+
+        eveniment, eroare = interpreteaza_comanda_sw(" ".join(cuvinte), cu_profil=False)
+        if eveniment is None:
+            return None, eroare
+        if eveniment["tip"] == "profil":
+            return None, "prof se da doar din consola (SW)"
+        operatii.append(("comanda", eveniment, indici))
+    return operatii, None
+
+
+def stare_camera(configurare, camera, indice):
+    # instantaneul unei camere pentru raspunsuri si abonari (NaN devine null in JSON)
+    def numar(valoare):
+        return None if valoare != valoare else round(valoare, 3)
+
+    instantaneu = camera.stare.citeste()
+    t_medie = camera.memorie_s["t_medie"]
+    ultima_presiune = camera.memorie_s["ultima_presiune"] or {}
+    confort = "necunoscut" if t_medie != t_medie else calcul_confort(
+        t_medie, configurare["temperatura_referinta"], configurare["banda_confort"])
+    return {
+        "camera": indice,
+        "mod": instantaneu.mod,
+        "t_medie": numar(t_medie),
+        "confort": confort,
+        "presiune": numar(ultima_presiune.get("presiune", float("nan"))),
+        "valva": ultima_presiune.get("valva"),
+        "putere": numar(instantaneu.putere_curenta),
+        "putere_manual": numar(instantaneu.putere_manual),
+    }
+
+
+async def server_control(configurare, camere, stop_event, adresa, pornit=None):
+    # serveste clientii pana la oprire
+    # camere - lista de CameraControlata (indicele din lista e numarul camerei din protocol)
+    # adresa - "host:port" (TCP) sau calea unui socket Unix (contine "/")
+    # stop_event - threading.Event (controler pe thread-uri) sau asyncio.Event (backend asyncio)
+    # pornit - optional, un asyncio.Future care primeste adresa efectiva (util cu portul 0)
+    bucla = asyncio.get_running_loop()
+    # confirmarile tuturor clientilor care nu au venit inca de la S; la oprire primesc "oprit"
+    in_curs = set()
+    # task-urile clientilor conectati, anulate la oprire
+    clienti = set()
+
+    def confirmare_pentru(viitor):
+        # apelata de S (pe thread-ul lui sau pe bucla) dupa ce a aplicat evenimentul
+        def confirma():
+            if not viitor.done():
+                viitor.set_result(None)
+        return lambda: bucla.call_soon_threadsafe(confirma)
+
+    def trimite_comanda(camera, eveniment):
+        # viitorul primeste None cand S a aplicat comanda, sau motivul pentru care nu o mai aplica
+        viitor = bucla.create_future()
+        if stop_event.is_set():
+            # dupa oprire S nu mai goleste coada
+            viitor.set_result("oprit")
+            return viitor
+        in_curs.add(viitor)
+        viitor.add_done_callback(in_curs.discard)
+        camera.q_evenimente_sw.put(dict(eveniment, confirmare=confirmare_pentru(viitor)))
+        camera.trezire.semnaleaza()
+        return viitor
+
+    async def asteapta_confirmarile(in_asteptare):
+        # None daca S a aplicat toate comenzile, altfel primul motiv de esec (ex: "oprit")
+        for rezultat in await asyncio.gather(*in_asteptare):
+            if rezultat is not None:
+                return rezultat
+        return None
+
+    async def flux(writer, perioada, indici):
+        next_release = bucla.time()
+        while True:
+            writer.write(json.dumps({"flux": [stare_camera(configurare, camere[i], i) for i in indici],
+                                     "timp": time.time()}).encode() + b"\n")
+            await writer.drain()
+            next_release += perioada
+            await asyncio.sleep(max(0.0, next_release - bucla.time()))
+
+    async def opreste_fluxul(abonare):
+        # anuleaza fluxul si asteapta sa se termine; o eroare de conexiune din flux nu mai conteaza
+        abonare.cancel()
+        await asyncio.gather(abonare, return_exceptions=True)
+
+    async def client(reader, writer):
+        abonare = None
+        clienti.add(asyncio.current_task())
+        try:
+            while True:
+                linie = await reader.readline()
+                if not linie:
+                    break
+                operatii, eroare = interpreteaza_cerere_control(linie.decode(errors="replace"), len(camere))
+                if operatii is None:
+                    raspuns = {"ok": False, "eroare": eroare}
+                else:
+                    raspuns = {"ok": True, "aplicate": 0}
+                    in_asteptare = []
+                    eroare = None
+                    for operatie in operatii:
+                        if operatie[0] == "comanda":
+                            _, eveniment, indici = operatie
+                            if eveniment["tip"] == "oprire":
+                                # oprirea e pentru tot programul (stop_event comun); o trimitem unei singure camere,
+                                # celelalte se opresc fara sa-si mai goleasca cozile (comenzile ramase primesc "oprit")
+                                indici = indici[:1]
+                            in_asteptare.extend(trimite_comanda(camere[i], eveniment) for i in indici)
+                            raspuns["aplicate"] += len(indici)
+                            continue
+                        # starea si abonarile vad efectul comenzilor de dinaintea lor din aceeasi linie
+                        eroare = await asteapta_confirmarile(in_asteptare)
+                        in_asteptare = []
+                        if eroare is not None:
+                            break
+                        if abonare is not None and operatie[0] in ("abonare", "dezabonare"):
+                            await opreste_fluxul(abonare)
+                            abonare = None
+                        if operatie[0] == "stare":
+                            raspuns["stare"] = [stare_camera(configurare, camere[i], i) for i in operatie[1]]
+                        elif operatie[0] == "abonare":
+                            abonare = asyncio.ensure_future(flux(writer, operatie[1], operatie[2]))
+                            raspuns["abonare"] = operatie[1]
+                    if eroare is None:
+                        eroare = await asteapta_confirmarile(in_asteptare)
+                    if eroare is not None:
+                        raspuns = {"ok": False, "eroare": eroare}
+                writer.write(json.dumps(raspuns).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # si la anulare (oprirea serverului): CancelledError merge mai departe dupa curatenie
+            clienti.discard(asyncio.current_task())
+            if abonare is not None:
+                await opreste_fluxul(abonare)
+            writer.close()
+
+    if "/" in adresa:
+        server = await asyncio.start_unix_server(client, path=adresa, backlog=4096)
+        efectiva = adresa
+    else:
+        host, _, port = adresa.rpartition(":")
+        server = await asyncio.start_server(client, host or "127.0.0.1", int(port), backlog=4096)
+        host_efectiv, port_efectiv = server.sockets[0].getsockname()[:2]
+        efectiva = f"{host_efectiv}:{port_efectiv}"
+    if pornit is not None:
+        pornit.set_result(efectiva)
+
+    try:
+        if isinstance(stop_event, threading.Event):
+            while not stop_event.is_set():
+                await asyncio.sleep(0.1)
+        else:
+            await stop_event.wait()
+        # lasam S sa confirme ce a apucat sa aplice (ex: "q"); comenzile ramase in cozi nu se mai aplica,
+        # deci confirmarile lor primesc "oprit" (altfel clientii lor ar astepta la nesfarsit)
+        await asyncio.sleep(0.05)
+        for viitor in list(in_curs):
+            if not viitor.done():
+                viitor.set_result("oprit")
+        # lasam raspunsurile sa plece inainte de inchidere
+        await asyncio.sleep(0.05)
+    finally:
+        server.close()
+        # clientii care inca asteapta o linie se deconecteaza (altfel wait_closed i-ar astepta)
+        for task in list(clienti):
+            task.cancel()
+        await asyncio.gather(*clienti, return_exceptions=True)
+        await server.wait_closed()
+        if "/" in adresa and os.path.exists(adresa):
+            os.unlink(adresa)
@@ -0,0 +1,180 @@
+# ---------------------------------------------------------------------------
+# Cautare de parametri (sweep) pentru reglarea controlului
+# ---------------------------------------------------------------------------
+# Fiecare combinatie de parametri ruleaza ca simulare pe timp virtual (fara consola) intr-un proces separat
+# (ProcessPoolExecutor, cate un proces per nucleu) si primeste un scor de calitate. Rezultatele se salveaza
+# intr-un fisier pe coloane (salveaza_coloane / citeste_coloane).
+import itertools
+import json
+import os
+import random
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from heating_control import configurare_implicita, simuleaza_virtual
+
+
+# parametrii care pot varia intr-un sweep (chei din configurare)
+PARAMETRI_SWEEP = (
+    "k_automat",
+    "putere_baza_automat",
+    "viteza_raspuns_temperatura",
+    "delta_max_incalzire",
+    "crestere_presiune",
+    "revenire_presiune",
+    "descarcare_valva",
+)
+
+# grila implicita pentru --sweep
+GRILA_SWEEP_IMPLICITA = {
+    "k_automat": [6.0, 12.0, 18.0, 24.0],
+    "putere_baza_automat": [20.0, 30.0, 40.0],
+    "viteza_raspuns_temperatura": [0.04, 0.08],
+}
+
+
+class EvaluatorRulare:
+    # primeste aceleasi apeluri ca un InregistratorTelemetrie (inregistreaza_t / _p / _s), dar in loc sa scrie
+    # calculeaza direct scorul rularii:
+    #   timp_stabilizare - momentul dupa care t_medie nu mai iese din banda de confort (durata, daca nu se stabilizeaza)
+    #   suprareglaj - cat a depasit t_medie temperatura de referinta (0 daca nu a depasit)
+    #   timp_in_afara_benzii - secunde cu t_medie in afara benzii de confort
+    #   activari_valva - de cate ori s-a deschis valva (trecere de la 0 la > 0)
+    #   presiune_maxima - cea mai mare presiune vazuta de P
+    def __init__(self, configurare, durata):
+        self.t_ref = configurare["temperatura_referinta"]
+        self.banda = configurare["banda_confort"]
+        self.durata = durata
+        self.ultima_iesire = 0.0
+        self.in_banda = False
+        self.suprareglaj = 0.0
+        self.timp_in_afara_benzii = 0.0
+        self.ultimul_timestamp_s = 0.0
+        self.activari_valva = 0
+        self.valva_anterioara = 0.0
+        self.presiune_maxima = float("-inf")
+
+    def inregistreaza_t(self, timestamp, temperaturi):
+        pass
+
+    def inregistreaza_p(self, timestamp, presiune, valva):
+        if valva > 0.0 and self.valva_anterioara == 0.0:
+            self.activari_valva += 1
+        self.valva_anterioara = valva
+        if presiune > self.presiune_maxima:
+            self.presiune_maxima = presiune
+
+    def inregistreaza_s(self, timestamp, mod, t_medie, putere, confort):
+        if t_medie != t_medie:  # NaN, inca nu avem temperatura
+            return
+        if not self.in_banda:
+            self.timp_in_afara_benzii += timestamp - self.ultimul_timestamp_s
+        self.ultimul_timestamp_s = timestamp
+        self.in_banda = abs(t_medie - self.t_ref) <= self.banda
+        if not self.in_banda:
+            self.ultima_iesire = timestamp
+        if t_medie - self.t_ref > self.suprareglaj:
+            self.suprareglaj = t_medie - self.t_ref
+
+    def scor(self):
+        timp_in_afara = self.timp_in_afara_benzii
+        if not self.in_banda:
+            timp_in_afara += self.durata - self.ultimul_timestamp_s
+        return {
+            "timp_stabilizare": self.ultima_iesire if self.in_banda else self.durata,
+            "suprareglaj": self.suprareglaj,
+            "timp_in_afara_benzii": timp_in_afara,
+            "activari_valva": float(self.activari_valva),
+            "presiune_maxima": self.presiune_maxima,
+        }
+
+
+def evalueaza_parametri(lucrare):
+    # ruleaza o simulare cu parametrii dati si intoarce scorul (functie la nivel de modul, ca sa poata fi trimisa
+    # proceselor din ProcessPoolExecutor)
+    parametri, durata, comenzi, seed = lucrare
+    configurare = configurare_implicita()
+    configurare.update(parametri)
+    evaluator = EvaluatorRulare(configurare, durata)
+    simuleaza_virtual(configurare, durata, comenzi, seed=seed, telemetrie=evaluator)
+    return evaluator.scor()
+
+
+def combinatii_grila(grila):
+    # toate combinatiile dintr-o grila {parametru: [valori]}
+    nume = list(grila)
+    return [dict(zip(nume, valori)) for valori in itertools.product(*(grila[n] for n in nume))]
+
+
+def combinatii_aleatoare(intervale, numar, seed=0):
+    # numar de combinatii alese uniform din intervale {parametru: (minim, maxim)}
+    rng = random.Random(seed)
+    return [{n: rng.uniform(minim, maxim) for n, (minim, maxim) in intervale.items()} for _ in range(numar)]
+
+
+def ruleaza_sweep(combinatii, durata=900.0, comenzi=(), seed=0, procese=None, iesire=None):
+    # evalueaza fiecare combinatie de parametri in paralel si intoarce coloanele rezultatului
+    # {parametru sau scor: array('d')}; daca iesire e data, le salveaza si in fisier
+    for parametri in combinatii:
+        necunoscuti = set(parametri) - set(PARAMETRI_SWEEP)
+        if necunoscuti:
+            raise ValueError(f"parametri necunoscuti pentru sweep: {sorted(necunoscuti)}")
+
+    lucrari = [(parametri, durata, tuple(comenzi), seed) for parametri in combinatii]
+    with ProcessPoolExecutor(max_workers=procese) as executor:
+        scoruri = list(executor.map(evalueaza_parametri, lucrari, chunksize=max(1, len(lucrari) // (4 * (procese or os.cpu_count() or 1)))))
+
+    coloane = {}
+    for nume in sorted({n for parametri in combinatii for n in parametri}):
+        coloane[nume] = array("d", (parametri.get(nume, configurare_implicita()[nume]) for parametri in combinatii))
+    for nume in (scoruri[0] if scoruri else {}):
+        coloane[nume] = array("d", (scor[nume] for scor in scoruri))
+
+    if iesire:
+        salveaza_coloane(iesire, coloane)
+    return coloane
+
+
+# fisier pe coloane: o linie magic, o linie JSON cu numele coloanelor si numarul de randuri,
+# apoi fiecare coloana ca bloc continuu de double little-endian (se poate citi si cu numpy.fromfile / frombuffer)
+MAGIC_COLOANE = b"HCCOL1\n"
+
+
+def salveaza_coloane(cale, coloane):
+    randuri = len(next(iter(coloane.values()))) if coloane else 0
+    with open(cale, "wb") as fisier:
+        fisier.write(MAGIC_COLOANE)
+        fisier.write(json.dumps({"coloane": list(coloane), "randuri": randuri}).encode() + b"\n")
+        for nume, valori in coloane.items():
+            if len(valori) != randuri:
+                raise ValueError(f"coloana {nume} are {len(valori)} valori, asteptat {randuri}")
+            valori = array("d", valori)
+            if sys.byteorder != "little":
+                valori.byteswap()
+            valori.tofile(fisier)
+
+
+def citeste_coloane(cale):
+    with open(cale, "rb") as fisier:
+        if fisier.readline() != MAGIC_COLOANE:
+            raise ValueError(f"{cale}: nu este un fisier pe coloane")
+        antet = json.loads(fisier.readline())
+        coloane = {}
+        for nume in antet["coloane"]:
+            valori = array("d")
+            valori.fromfile(fisier, antet["randuri"])
+            if sys.byteorder != "little":
+                valori.byteswap()
+            coloane[nume] = valori
+    return coloane
+
+
+def afiseaza_sweep(coloane, cele_mai_bune=10):
+    # cele mai bune combinatii dupa timpul in afara benzii de confort (apoi suprareglaj)
+    nume = list(coloane)
+    randuri = len(coloane[nume[0]]) if nume else 0
+    ordine = sorted(range(randuri), key=lambda i: (coloane["timp_in_afara_benzii"][i], coloane["suprareglaj"][i]))
+    print(" | ".join(f"{n:>14.14s}" for n in nume))
+    for i in ordine[:cele_mai_bune]:
+        print(" | ".join(f"{coloane[n][i]:14.3f}" for n in nume))
@@ -0,0 +1,5 @@
+# modulele proiectului stau in radacina depozitului (nu e un pachet instalat)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
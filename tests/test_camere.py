@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from heating_control import configurare_implicita
+from heating_rooms import creeaza_camere, pas_camere
+
+
+def test_supervizorul_nu_e_suportat():
+    configurare = dict(configurare_implicita(), supervizor_presiune=True)
+    with pytest.raises(ValueError, match="supervizor_presiune"):
+        creeaza_camere(configurare, 4)
+
+
+def test_pasi_p_pe_perioada_t():
+    # 0.5 s / 0.2 s: pasii de motor ruleaza alternativ 2 si 3 pasi P, restul se reporteaza
+    configurare = configurare_implicita()
+    camere = creeaza_camere(configurare, 4, seed=0)
+    fractiuni = []
+    for _ in range(4):
+        pas_camere(configurare, camere)
+        fractiuni.append(round(camere["fractiune_p"], 9))
+    assert fractiuni == [0.5, 0.0, 0.5, 0.0]
@@ -0,0 +1,41 @@
+import json
+import os
+
+from heating_control import incarca_configurare
+
+
+def scrie_json(cale, valori, mtime_ns):
+    with open(cale, "w") as fisier:
+        json.dump(valori, fisier)
+    os.utime(cale, ns=(mtime_ns, mtime_ns))
+
+
+def test_copia_compilata_e_refolosita(tmp_path):
+    cale = str(tmp_path / "configurare.json")
+    scrie_json(cale, {"temperatura_referinta": 22.0}, 2_000_000_000_000_000_000)
+    assert incarca_configurare(cale)["temperatura_referinta"] == 22.0
+    assert os.path.exists(cale + ".cache")
+    # aceeasi data si aceeasi marime: se foloseste copia, fara sa se citeasca JSON-ul
+    scrie_json(cale, {"temperatura_referinta": 23.0}, 2_000_000_000_000_000_000)
+    assert incarca_configurare(cale)["temperatura_referinta"] == 22.0
+
+
+def test_json_inlocuit_cu_unul_mai_vechi(tmp_path):
+    # cp -p / rsync -t / backup restaurat: JSON-ul nou are mtime mai vechi decat copia compilata
+    cale = str(tmp_path / "configurare.json")
+    scrie_json(cale, {"temperatura_referinta": 22.0}, 2_000_000_000_000_000_000)
+    assert incarca_configurare(cale)["temperatura_referinta"] == 22.0
+
+    scrie_json(cale, {"temperatura_referinta": 19.5}, 1_000_000_000_000_000_000)
+    assert os.stat(cale + ".cache").st_mtime_ns > os.stat(cale).st_mtime_ns
+    assert incarca_configurare(cale)["temperatura_referinta"] == 19.5
+    # copia s-a rescris din JSON-ul nou
+    assert incarca_configurare(cale)["temperatura_referinta"] == 19.5
+
+
+def test_aceeasi_data_alta_marime(tmp_path):
+    cale = str(tmp_path / "configurare.json")
+    scrie_json(cale, {"temperatura_referinta": 22.0}, 1_500_000_000_000_000_000)
+    incarca_configurare(cale)
+    scrie_json(cale, {"temperatura_referinta": 22.0, "banda_confort": 1.5}, 1_500_000_000_000_000_000)
+    assert incarca_configurare(cale)["banda_confort"] == 1.5
@@ -0,0 +1,126 @@
+import random
+import threading
+import time
+
+from heating_control import (
+    CeasVirtual, CutiePostala, StarePartajata, Trezire, configurare_implicita, memorie_initiala_p, pas_p,
+)
+
+
+def test_secventa_creste_la_fiecare_publicare():
+    cutie = CutiePostala()
+    assert cutie.secventa == 0
+    assert cutie.citeste_ultimul() == (0, None)
+    assert [cutie.publica(i) for i in range(5)] == [1, 2, 3, 4, 5]
+    assert cutie.secventa == 5
+    assert cutie.citeste_ultimul() == (5, 4)
+
+
+def test_ia_daca_nou_si_mesajele_depasite():
+    cutie = CutiePostala()
+    assert cutie.ia_daca_nou(0) == (0, None)
+    for i in range(3):
+        cutie.publica(i)
+    # doar ultimul mesaj se pastreaza; primele doua se numara ca depasite
+    assert cutie.ia_daca_nou(0) == (3, 2)
+    assert cutie.depasite == 2
+    # nimic nou: secventa ramane, fara mesaj si fara depasiri
+    assert cutie.ia_daca_nou(3) == (3, None)
+    cutie.publica("nou")
+    assert cutie.ia_daca_nou(3) == (4, "nou")
+    assert cutie.depasite == 2
+    # citeste_ultimul nu marcheaza nimic ca citit si nu numara depasiri
+    cutie.publica("a")
+    cutie.publica("b")
+    assert cutie.citeste_ultimul() == (6, "b")
+    assert cutie.depasite == 2
+
+
+def test_asteapta_mai_nou_expira():
+    cutie = CutiePostala()
+    cutie.publica("vechi")
+    t0 = time.monotonic()
+    assert cutie.asteapta_mai_nou(1, timeout=0.05) == (1, None)
+    assert time.monotonic() - t0 >= 0.05
+
+
+def test_asteapta_mai_nou_intoarce_imediat_daca_exista_mesaj():
+    cutie = CutiePostala()
+    cutie.publica("x")
+    assert cutie.asteapta_mai_nou(0, timeout=0) == (1, "x")
+
+
+def test_asteapta_mai_nou_e_trezit_de_publicare():
+    cutie = CutiePostala()
+    publicator = threading.Timer(0.05, cutie.publica, args=("mesaj",))
+    t0 = time.monotonic()
+    publicator.start()
+    assert cutie.asteapta_mai_nou(0, timeout=5.0) == (1, "mesaj")
+    assert time.monotonic() - t0 < 1.0
+    publicator.join()
+
+
+def test_ping_pong_fara_treziri_pierdute():
+    # doua cutii intre doua thread-uri; o trezire pierduta ar bloca schimbul pana la timeout
+    dus, intors = CutiePostala(), CutiePostala()
+    mesaje = 2000
+
+    def ecou():
+        secventa = 0
+        for _ in range(mesaje):
+            secventa, mesaj = dus.asteapta_mai_nou(secventa, timeout=5.0)
+            assert mesaj is not None
+            intors.publica(mesaj)
+
+    th = threading.Thread(target=ecou, daemon=True)
+    th.start()
+    secventa = 0
+    for i in range(mesaje):
+        dus.publica(i)
+        secventa, mesaj = intors.asteapta_mai_nou(secventa, timeout=5.0)
+        assert mesaj == i
+    th.join(timeout=5.0)
+    assert dus.depasite == 0 and intors.depasite == 0
+
+
+def test_publicarea_semnaleaza_trezirea():
+    trezire = Trezire()
+    cutie = CutiePostala(trezire)
+    generatie = trezire.generatie
+    cutie.publica(1)
+    assert trezire.asteapta(generatie, timeout=0) != generatie
+
+
+def test_p_goleste_comenzile_automate_la_trecerea_in_manual():
+    # comanda publicata inainte de "m" nu se aplica dupa revenirea in automat: P sare peste ea (goleste), iar
+    # saltul de secventa nu se numara ca mesaj depasit
+    configurare = configurare_implicita()
+    ceas, rng = CeasVirtual(), random.Random(0)
+    stare = StarePartajata(mod="automat", putere_manual=30.0, putere_curenta=0.0)
+    q_comenzi_automat, q_presiune = CutiePostala(), CutiePostala()
+    memorie = memorie_initiala_p(configurare)
+
+    def ruleaza_p(moment):
+        ceas.timp = moment
+        pas_p(configurare, memorie, stare, q_comenzi_automat, q_presiune, ceas, rng)
+
+    q_comenzi_automat.publica({"timestamp": 0.0, "putere": 70.0})
+    ruleaza_p(0.0)
+    assert memorie["comanda_aplicata"]["putere"] == 70.0
+
+    q_comenzi_automat.publica({"timestamp": 0.1, "putere": 90.0})
+    stare.seteaza_mod("manual")
+    ruleaza_p(0.2)
+    assert memorie["secventa_comenzi"] == 2
+    assert memorie["comanda_aplicata"] is None
+    assert memorie["putere_aplicata"] == 30.0
+
+    stare.seteaza_mod("automat")
+    ruleaza_p(0.4)
+    assert memorie["comanda_aplicata"] is None
+
+    q_comenzi_automat.publica({"timestamp": 0.5, "putere": 40.0})
+    ruleaza_p(0.6)
+    assert memorie["secventa_comenzi"] == 3
+    assert memorie["comanda_aplicata"]["putere"] == 40.0
+    assert q_comenzi_automat.depasite == 0
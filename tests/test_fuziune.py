@@ -0,0 +1,182 @@
+import collections
+import math
+import random
+import statistics
+
+import pytest
+
+from heating_control import FuziuneSenzori, MedianaGlisanta, WelfordGlisant, mediana
+
+
+def glisare(valori, fereastra):
+    # aplica fereastra glisanta in ordinea din StatisticiSenzor (scoate, apoi adauga) si intoarce ferestrele
+    istoric = collections.deque()
+    med = MedianaGlisanta()
+    welford = WelfordGlisant()
+    for valoare in valori:
+        if len(istoric) == fereastra:
+            vechi = istoric.popleft()
+            med.scoate(vechi)
+            welford.scoate(vechi)
+        istoric.append(valoare)
+        med.adauga(valoare)
+        welford.adauga(valoare)
+        yield list(istoric), med, welford
+
+
+@pytest.mark.parametrize("valori", [[1.0], [3.0, 1.0], [2.0, 2.0, 1.0, 2.0], [5.0, -1.0, 0.5, 0.5, 7.0, 3.0]])
+def test_mediana(valori):
+    assert mediana(valori) == statistics.median(valori)
+
+
+def test_mediana_glisanta_goala():
+    assert math.isnan(MedianaGlisanta().mediana())
+
+
+@pytest.mark.parametrize("fereastra", [1, 2, 5, 20])
+@pytest.mark.parametrize("generator", ["gauss", "duplicate", "constant"])
+def test_mediana_glisanta_ca_statistics(fereastra, generator):
+    rng = random.Random(fereastra)
+    if generator == "gauss":
+        valori = [rng.gauss(20.0, 3.0) for _ in range(5000)]
+    elif generator == "duplicate":
+        # putine valori distincte: multe stergeri lenese ale aceleiasi chei
+        valori = [float(rng.randint(0, 3)) for _ in range(5000)]
+    else:
+        valori = [21.5] * 500 + [float(rng.randint(20, 22)) for _ in range(500)] + [21.5] * 500
+    for fereastra_curenta, med, _ in glisare(valori, fereastra):
+        assert med.mediana() == statistics.median(fereastra_curenta)
+
+
+@pytest.mark.parametrize("fereastra", [5, 20])
+def test_mediana_glisanta_memorie_marginita(fereastra):
+    # pe o rulare lunga, valorile sterse lenes nu se aduna la nesfarsit in heap-uri
+    rng = random.Random(fereastra)
+    valori = [rng.gauss(20.0, 3.0) for _ in range(200000)]
+    maxim = 0
+    for _, med, _ in glisare(valori, fereastra):
+        maxim = max(maxim, len(med.mici) + len(med.mari))
+    assert maxim <= 2 * fereastra + 17
+    assert med.numar_mici + med.numar_mari == fereastra
+
+
+@pytest.mark.parametrize("fereastra", [2, 5, 20])
+def test_welford_glisant_ca_statistics(fereastra):
+    rng = random.Random(fereastra)
+    valori = [1000.0 + rng.gauss(0.0, 0.1) for _ in range(50000)]
+    valori += [float(rng.randint(0, 2)) for _ in range(2000)]
+    for i, (fereastra_curenta, _, welford) in enumerate(glisare(valori, fereastra)):
+        if i % 97 and i < len(valori) - fereastra:
+            continue
+        # erorile absolute de rotunjire scaleaza cu marimea valorilor trecute (~1000), nu cu a celor curente
+        assert welford.numar == len(fereastra_curenta)
+        assert welford.medie == pytest.approx(statistics.fmean(fereastra_curenta), rel=1e-9, abs=1e-8)
+        if len(fereastra_curenta) > 1:
+            assert welford.varianta() == pytest.approx(statistics.variance(fereastra_curenta), rel=1e-6, abs=1e-6)
+        assert max(welford.m2, 0.0) / welford.numar == pytest.approx(
+            statistics.pvariance(fereastra_curenta), rel=1e-6, abs=1e-6)
+
+
+def test_welford_glisant_revine_la_zero_pe_valoare_constanta():
+    # dupa o rulare lunga cu zgomot, o fereastra constanta trebuie sa dea varianta ~0 ("blocat" depinde de asta)
+    rng = random.Random(7)
+    valori = [1000.0 + rng.gauss(0.0, 0.1) for _ in range(100000)] + [1000.123] * 20
+    *_, (_, _, welford) = glisare(valori, 20)
+    assert welford.varianta() < 1e-12
+    assert welford.medie == pytest.approx(1000.123, abs=1e-9)
+
+
+def test_welford_glisant_golit():
+    welford = WelfordGlisant()
+    welford.adauga(3.0)
+    welford.scoate(3.0)
+    assert (welford.numar, welford.medie, welford.m2, welford.varianta()) == (0, 0.0, 0.0, 0.0)
+
+
+def cadre(rng, numar, numar_TC=4, temperatura=21.0, zgomot=0.05):
+    for _ in range(numar):
+        yield [temperatura + rng.gauss(0.0, zgomot) for _ in range(numar_TC)]
+
+
+def sanatate(fuziune):
+    return [senzor.sanatate for senzor in fuziune.senzori]
+
+
+def test_fuziune_senzori_sanatosi():
+    rng = random.Random(0)
+    fuziune = FuziuneSenzori(4)
+    for valori in cadre(rng, 100):
+        rezultat = fuziune.actualizeaza(valori)
+        assert rezultat == pytest.approx(statistics.fmean(valori))
+    assert sanatate(fuziune) == ["ok"] * 4
+    assert [r["respinse"] for r in fuziune.raport_sanatate()] == [0] * 4
+
+
+@pytest.mark.parametrize("valoare", [float("nan"), 500.0, -60.0])
+def test_fuziune_deconectat(valoare):
+    rng = random.Random(1)
+    fuziune = FuziuneSenzori(4)
+    for valori in cadre(rng, 30):
+        valori[2] = valoare
+        rezultat = fuziune.actualizeaza(valori)
+        assert rezultat == pytest.approx(statistics.fmean(valori[:2] + valori[3:]))
+    assert sanatate(fuziune) == ["ok", "ok", "deconectat", "ok"]
+    assert fuziune.raport_sanatate()[2]["respinse"] == 30
+
+
+def test_fuziune_toti_deconectati():
+    fuziune = FuziuneSenzori(3)
+    assert math.isnan(fuziune.actualizeaza([float("nan"), 200.0, -100.0]))
+    assert sanatate(fuziune) == ["deconectat"] * 3
+
+
+def test_fuziune_blocat():
+    rng = random.Random(2)
+    fuziune = FuziuneSenzori(4, fereastra=20)
+    for i, valori in enumerate(cadre(rng, 60)):
+        if i >= 30:
+            valori[1] = 21.0
+        rezultat = fuziune.actualizeaza(valori)
+        # senzorul blocat e declarat abia cand fereastra e plina doar cu valoarea inghetata
+        if i < 49:
+            assert fuziune.senzori[1].sanatate == "ok"
+    assert sanatate(fuziune) == ["ok", "blocat", "ok", "ok"]
+    assert rezultat == pytest.approx(statistics.fmean([valori[0], valori[2], valori[3]]))
+
+
+def test_fuziune_deviat():
+    rng = random.Random(3)
+    fuziune = FuziuneSenzori(4)
+    for valori in cadre(rng, 50):
+        valori[3] += 2.0
+        rezultat = fuziune.actualizeaza(valori)
+    assert sanatate(fuziune) == ["ok", "ok", "ok", "deviat"]
+    assert fuziune.raport_sanatate()[3]["abatere_mediana"] > 1.0
+    assert rezultat == pytest.approx(statistics.fmean(valori[:3]))
+
+
+def test_fuziune_varf():
+    rng = random.Random(4)
+    fuziune = FuziuneSenzori(4)
+    for valori in cadre(rng, 30):
+        fuziune.actualizeaza(valori)
+    assert sanatate(fuziune) == ["ok"] * 4
+
+    valori = next(cadre(rng, 1))
+    valori[0] += 3.0
+    rezultat = fuziune.actualizeaza(valori)
+    assert sanatate(fuziune) == ["varf", "ok", "ok", "ok"]
+    assert rezultat == pytest.approx(statistics.fmean(valori[1:]))
+    assert fuziune.raport_sanatate()[0]["respinse"] == 1
+
+    # un singur varf nu muta mediana abaterilor: senzorul revine la "ok" la cadrul urmator
+    fuziune.actualizeaza(next(cadre(rng, 1)))
+    assert sanatate(fuziune) == ["ok"] * 4
+
+
+def test_fuziune_din_configurare():
+    from heating_control import configurare_implicita
+    configurare = configurare_implicita()
+    fuziune = FuziuneSenzori.din_configurare(configurare)
+    assert len(fuziune.senzori) == configurare["numar_TC"]
+    assert fuziune.fereastra == configurare["fereastra_fuziune"]
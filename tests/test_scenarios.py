@@ -0,0 +1,78 @@
+import pytest
+
+import heating_control
+from heating_control import configurare_implicita, simuleaza_virtual
+from heating_scenarios import SCENARII, InregistratorScenariu, ruleaza_scenariu, verifica_golire_comenzi
+
+
+@pytest.mark.parametrize("scenariu", SCENARII, ids=[scenariu[0] for scenariu in SCENARII])
+@pytest.mark.parametrize("seed", (0, 1, 2))
+@pytest.mark.parametrize("supervizor", (False, True), ids=("praguri", "supervizor"))
+def test_scenariu_trece(scenariu, seed, supervizor):
+    rezultat = ruleaza_scenariu(dict(configurare_implicita(), supervizor_presiune=supervizor), scenariu, seed=seed)
+    assert rezultat["erori"] == []
+    # P ruleaza la fiecare perioada_P (sau mai des, cu supervizorul), S afiseaza o data pe secunda
+    durata = scenariu[1]
+    assert len(rezultat["serie_p"]["timp"]) >= durata / configurare_implicita()["perioada_P_maxima"]
+    assert len(rezultat["serie_s"]["timp"]) == pytest.approx(durata, abs=2)
+
+
+def test_golire_comenzi_p():
+    assert verifica_golire_comenzi(configurare_implicita()) == []
+
+
+def test_simulare_reproductibila():
+    _, durata, comenzi, _ = SCENARII[-1]
+    configurare = configurare_implicita()
+    # repr: valorile NaN (presiunea inainte de primul pas P) nu sunt egale cu ele insele
+    assert repr(simuleaza_virtual(configurare, durata, comenzi, seed=7)) == repr(simuleaza_virtual(configurare, durata, comenzi, seed=7))
+
+
+def test_s_nu_ruleaza_dupa_pasii_p(monkeypatch):
+    # ca task_s: S se trezeste la temperaturi (T), comenzi (SW) si la termenul afisarii, nu la fiecare pas P
+    pas_s = heating_control.pas_s
+    apeluri = []
+
+    def pas_s_numarat(*args, **kwargs):
+        apeluri.append(args[-1].acum())
+        return pas_s(*args, **kwargs)
+
+    monkeypatch.setattr(heating_control, "pas_s", pas_s_numarat)
+    configurare = configurare_implicita()
+    afisari = simuleaza_virtual(configurare, 10.0, [(5.0, "m")])
+    activari_t = int(10.0 / configurare["perioada_T"]) + 1
+    # T la 0, 0.5, ..., 10; afisarile S la 0, 1, ..., 10 coincid cu ele; comanda la 5 s coincide si ea
+    assert len(apeluri) == activari_t + len(afisari) + 1
+    assert len(set(apeluri)) == activari_t
+
+
+def test_comenzile_sw_ajung_in_afisari():
+    # "m" si "p 40" la t=60 s: S afiseaza manual 40% de la prima afisare de dupa comenzi, nu mai devreme
+    # (la acelasi moment SW ruleaza dupa T si P, deci afisarea de la t=60 s e inca in automat)
+    afisari = simuleaza_virtual(configurare_implicita(), 120.0, ((60.0, "m"), (60.0, "p 40")))
+    inainte = [a for a in afisari if a["timp"] <= 60.0]
+    dupa = [a for a in afisari if a["timp"] > 60.0]
+    assert inainte and all(a["mod"] == "automat" for a in inainte)
+    assert dupa and all(a["mod"] == "manual" and a["putere"] == 40.0 for a in dupa)
+
+
+def test_presiune_peste_prag_fara_supervizor():
+    # cu un prag de siguranta mai jos, pragurile fixe lasa presiunea peste el la p 100 (InregistratorScenariu o
+    # raporteaza), iar supervizorul o tine sub prag
+    scenariu = next(s for s in SCENARII if s[0] == "presiune_p100")
+    configurare = dict(configurare_implicita(), presiune_maxima_siguranta=3.3)
+    fara = ruleaza_scenariu(configurare, scenariu)["erori"]
+    cu = ruleaza_scenariu(dict(configurare, supervizor_presiune=True), scenariu)["erori"]
+    assert fara and all("presiunea sta peste 3.3" in eroare for eroare in fara)
+    assert cu == []
+
+
+def test_inregistratorul_prinde_puterea_manuala_gresita():
+    class Instantaneu:
+        mod = "manual"
+        putere_manual = 40.0
+
+    inregistrator = InregistratorScenariu(configurare_implicita())
+    memorie_p = {"presiune": 3.0, "putere_aplicata": 35.0, "actiune_valva": 0.0, "comanda_aplicata": None}
+    inregistrator(1.0, Instantaneu(), memorie_p)
+    assert len(inregistrator.erori) == 1 and "in manual P aplica 35.0%" in inregistrator.erori[0]
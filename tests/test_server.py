@@ -0,0 +1,97 @@
+import asyncio
+import json
+import queue
+
+from heating_control import StarePartajata, Trezire, configurare_implicita, memorie_initiala_s, proceseaza_evenimente_sw
+from heating_server import CameraControlata, server_control
+
+
+def camera_noua():
+    return CameraControlata(StarePartajata(), queue.Queue(), Trezire(), memorie_initiala_s())
+
+
+async def porneste_server(camere, stop_event):
+    pornit = asyncio.get_running_loop().create_future()
+    server = asyncio.ensure_future(server_control(configurare_implicita(), camere, stop_event, "127.0.0.1:0", pornit))
+    host, _, port = (await pornit).rpartition(":")
+    reader, writer = await asyncio.open_connection(host, int(port))
+    return server, reader, writer
+
+
+async def cerere(reader, writer, linie):
+    writer.write(linie.encode() + b"\n")
+    await writer.drain()
+    return json.loads(await asyncio.wait_for(reader.readline(), 5.0))
+
+
+def test_comanda_confirmata_dupa_aplicare():
+    async def scenariu():
+        camera = camera_noua()
+        stop_event = asyncio.Event()
+        server, reader, writer = await porneste_server([camera], stop_event)
+
+        # S-ul camerei aplica evenimentele de cum apar in coada
+        async def s():
+            while not stop_event.is_set():
+                proceseaza_evenimente_sw(camera.q_evenimente_sw, camera.stare, stop_event)
+                await asyncio.sleep(0.001)
+
+        task_s = asyncio.ensure_future(s())
+        raspuns = await cerere(reader, writer, "m; p 40; stare")
+        stop_event.set()
+        writer.close()
+        await asyncio.gather(server, task_s)
+        return raspuns, camera.stare.citeste()
+
+    raspuns, instantaneu = asyncio.run(scenariu())
+    assert raspuns["ok"] and raspuns["aplicate"] == 2
+    assert raspuns["stare"][0]["mod"] == "manual" and raspuns["stare"][0]["putere_manual"] == 40.0
+    assert instantaneu.putere_manual == 40.0
+
+
+def test_confirmari_ramase_primesc_oprit_la_oprire():
+    # S-ul camerei 1 nu mai ruleaza: comanda pentru ea ramane in coada, iar la oprire clientul primeste "oprit"
+    async def scenariu():
+        camere = [camera_noua(), camera_noua()]
+        stop_event = asyncio.Event()
+        server, reader, writer = await porneste_server(camere, stop_event)
+        raspuns = asyncio.ensure_future(cerere(reader, writer, "camere 1 p 40; stare 1"))
+        await asyncio.sleep(0.05)
+        assert not raspuns.done()
+        stop_event.set()
+        rezultat = await raspuns
+        # dupa oprire, comenzile noi nu mai asteapta nimic
+        dupa = await cerere(reader, writer, "p 10")
+        writer.close()
+        await server
+        return rezultat, dupa
+
+    rezultat, dupa = asyncio.run(scenariu())
+    assert rezultat == {"ok": False, "eroare": "oprit"}
+    assert dupa == {"ok": False, "eroare": "oprit"}
+
+
+def test_abonare_si_deconectare_la_oprire():
+    # fluxul abonarii se opreste cu "dezabonare"; la oprire serverul inchide si conexiunile inca deschise
+    async def scenariu():
+        camera = camera_noua()
+        stop_event = asyncio.Event()
+        server, reader, writer = await porneste_server([camera], stop_event)
+        raspuns = await cerere(reader, writer, "abonare 0.01")
+        flux = [json.loads(await asyncio.wait_for(reader.readline(), 5.0)) for _ in range(3)]
+        writer.write(b"dezabonare\n")
+        await writer.drain()
+        # dupa dezabonare mai pot veni cel mult liniile de flux trimise deja, apoi raspunsul
+        while "flux" in (linie := json.loads(await asyncio.wait_for(reader.readline(), 5.0))):
+            pass
+        stop_event.set()
+        await asyncio.wait_for(server, 5.0)
+        rest = await asyncio.wait_for(reader.read(), 5.0)
+        writer.close()
+        return raspuns, flux, linie, rest
+
+    raspuns, flux, dezabonare, rest = asyncio.run(scenariu())
+    assert raspuns == {"ok": True, "aplicate": 0, "abonare": 0.01}
+    assert all(linie["flux"][0]["camera"] == 0 for linie in flux)
+    assert dezabonare == {"ok": True, "aplicate": 0}
+    assert rest == b""
@@ -0,0 +1,24 @@
+from heating_control import StatisticiTask, formateaza_statistici, programeaza_urmatoarea_activare
+
+
+def test_depasiri_fata_de_perioada_activarii():
+    statistici = StatisticiTask("P", 0.2)
+    # perioada scurtata dupa o declansare: 80 ms de executie depasesc o activare de 50 ms, nu una de 200 ms;
+    # 300 ms nu depasesc o activare de 500 ms, desi sunt peste perioada nominala
+    programeaza_urmatoarea_activare(0.0, 0.05, 0.0, 0.08, "recupereaza", statistici)
+    programeaza_urmatoarea_activare(1.0, 0.2, 1.0, 1.08, "recupereaza", statistici)
+    programeaza_urmatoarea_activare(2.0, 0.5, 2.0, 2.3, "recupereaza", statistici)
+    assert statistici.depasiri == 1
+    assert statistici.termene_ratate == 1
+
+    instantaneu = statistici.instantaneu()
+    assert (instantaneu["perioada_min"], instantaneu["perioada_max"]) == (0.05, 0.5)
+    assert "perioada=50-500 ms" in formateaza_statistici(instantaneu)
+
+
+def test_perioada_fixa():
+    statistici = StatisticiTask("T", 0.5)
+    assert "perioada=500 ms" in formateaza_statistici(statistici.instantaneu())
+    statistici.inregistreaza(0.0, 0.001, False)
+    assert statistici.depasiri == 0
+    assert "perioada=500 ms" in formateaza_statistici(statistici.instantaneu())